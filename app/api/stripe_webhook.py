@@ -12,9 +12,10 @@ Or integrate into bot via run_webhook_server()
 import os
 import logging
 
+import orjson
 import stripe
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
 from app.services.subscription_service import SubscriptionService
 
@@ -25,16 +26,18 @@ app = FastAPI(
     version="1.0.0",
     docs_url=None,
     redoc_url=None,
+    default_response_class=ORJSONResponse,
 )
 
-# Initialized on startup
+# Initialized on startup, or shared by the bot via run_webhook_server(service=...)
 subscription_service: SubscriptionService | None = None
 
 
 @app.on_event("startup")
 async def startup():
     global subscription_service
-    subscription_service = SubscriptionService()
+    if subscription_service is None:
+        subscription_service = SubscriptionService()
     logger.info("✅ Stripe webhook server started")
 
 
@@ -66,7 +69,7 @@ async def stripe_webhook(request: Request):
         logger.warning("STRIPE_WEBHOOK_SECRET not configured, skipping signature verification")
         try:
             event = stripe.Event.construct_from(
-                stripe.util.json.loads(payload), stripe.api_key
+                orjson.loads(payload), stripe.api_key
             )
         except Exception as e:
             logger.error(f"Failed to parse webhook payload: {e}")
@@ -95,20 +98,31 @@ async def stripe_webhook(request: Request):
     except Exception as e:
         logger.error(f"❌ Error processing {event_type}: {e}")
         # Return 200 anyway to prevent Stripe retries on our errors
-        return JSONResponse(status_code=200, content={"status": "error", "detail": str(e)})
+        return ORJSONResponse(status_code=200, content={"status": "error", "detail": str(e)})
 
-    return JSONResponse(status_code=200, content={"status": "ok"})
+    return ORJSONResponse(status_code=200, content={"status": "ok"})
 
 
-async def run_webhook_server(host: str = "0.0.0.0", port: int = 8000):
+async def run_webhook_server(
+    host: str = "0.0.0.0",
+    port: int = 8000,
+    service: SubscriptionService | None = None,
+):
     """
     Run the webhook server programmatically (for integration with bot).
 
+    Pass the bot's SubscriptionService as `service` so that handled events
+    invalidate the plan cache the bot actually reads.
+
     Usage in bot's main():
-        asyncio.create_task(run_webhook_server(port=8000))
+        asyncio.create_task(run_webhook_server(port=8000, service=subscription_service))
     """
     import uvicorn
 
+    global subscription_service
+    if service is not None:
+        subscription_service = service
+
     config = uvicorn.Config(
         app,
         host=host,
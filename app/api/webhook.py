@@ -4,13 +4,17 @@ Handles search requests from N8N workflow
 """
 
 from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.middleware.gzip import GZipMiddleware
 from datetime import datetime
-from typing import Optional, List, Dict, Set, Any
+from typing import Optional, List, Dict, Set, Any, AsyncIterator, Callable, Iterator, Sequence, Tuple
+import importlib.util
 import logging
 import httpx
 import asyncio
+import gzip
+import time
+import orjson
 
 from app.models.search import (
     SearchRequest,
@@ -25,43 +29,185 @@ from app.models.search import (
     SearchResult
 )
 from app.services.search_service import search_service
+from app.config.settings import settings
 
-# Configure logging
+# Configure logging (production skips asctime formatting; the process
+# supervisor already timestamps each line)
 logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    level=settings.LOG_LEVEL,
+    format=(
+        '%(levelname)s - %(name)s - %(message)s'
+        if settings.ENVIRONMENT == "production"
+        else '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
 )
 logger = logging.getLogger(__name__)
 
+# Shared HTTP client for webhook/callback delivery (created on startup)
+_HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+# Pool size; every connection may stay idle so bursts of callbacks to the
+# same N8N host reuse sockets instead of reopening TCP/TLS
+_HTTP_MAX_CONNECTIONS = 100
+# HTTP/2 multiplexes concurrent callbacks over one connection; needs the
+# optional h2 package (httpx[http2]), otherwise stay on HTTP/1.1
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Return the app-lifetime HTTP client, creating it if startup has not run"""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None or _HTTP_CLIENT.is_closed:
+        _HTTP_CLIENT = httpx.AsyncClient(
+            timeout=30.0,
+            http2=_HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=_HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=30
+            )
+        )
+    return _HTTP_CLIENT
+
+
+_JSON_HEADERS = {"content-type": "application/json"}
+_GZIP_JSON_HEADERS = {"content-type": "application/json", "content-encoding": "gzip"}
+_GZIP_MIN_SIZE = 1024
+# Above this size (large multi-source result sets) zlib time dominates, so use
+# the fastest level: NDJSON-like repetitive JSON still shrinks several times
+_GZIP_FAST_SIZE = 256 * 1024
+
+
+def _dump_json(data: Any) -> bytes:
+    """Serialize an outgoing payload with orjson"""
+    return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z)
+
+
+def _encode_outgoing(data: Any) -> Tuple[bytes, Dict[str, str]]:
+    """Serialize a webhook/callback body, gzipping it when it is worth it
+
+    Already-serialized JSON bytes are passed through as is
+    """
+    body = data if isinstance(data, bytes) else _dump_json(data)
+    if len(body) < _GZIP_MIN_SIZE:
+        return body, _JSON_HEADERS
+    level = 1 if len(body) >= _GZIP_FAST_SIZE else 5
+    return gzip.compress(body, compresslevel=level), _GZIP_JSON_HEADERS
+
+
+# Cap concurrent background searches so bursts queue instead of exhausting
+# backend connections
+_MAX_BACKGROUND_SEARCHES = 32
+_SEARCH_SEM = asyncio.Semaphore(_MAX_BACKGROUND_SEARCHES)
+_pending_searches = 0
+
+
+class FastCORSMiddleware:
+    """
+    Minimal pure-ASGI CORS layer.
+
+    Same policy as the previous CORSMiddleware(allow_origins=["*"],
+    allow_credentials=True, allow_methods=["*"], allow_headers=["*"]): the
+    request Origin is echoed with Access-Control-Allow-Credentials, and
+    requests without an Origin header pass through untouched. Answers
+    preflight requests directly, without building Starlette Request/Response
+    objects per call.
+    """
+
+    _PREFLIGHT_HEADERS = [
+        (b"access-control-allow-methods", b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"),
+        (b"access-control-max-age", b"600"),
+        (b"access-control-allow-credentials", b"true"),
+        (b"content-type", b"text/plain; charset=utf-8"),
+        (b"content-length", b"2"),
+    ]
+    _CREDENTIALS_HEADER = (b"access-control-allow-credentials", b"true")
+    _VARY_HEADER = (b"vary", b"Origin")
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = None
+        request_method = None
+        requested_headers = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                requested_headers = value
+
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        origin_headers = [
+            (b"access-control-allow-origin", origin),
+            self._CREDENTIALS_HEADER,
+            self._VARY_HEADER,
+        ]
+
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            headers = [origin_headers[0], self._VARY_HEADER] + self._PREFLIGHT_HEADERS
+            if requested_headers:
+                headers.append((b"access-control-allow-headers", requested_headers))
+            await send({"type": "http.response.start", "status": 200, "headers": headers})
+            await send({"type": "http.response.body", "body": b"OK"})
+            return
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                message = {
+                    **message,
+                    "headers": list(message.get("headers", [])) + origin_headers,
+                }
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+
 # Create FastAPI app
 app = FastAPI(
     title="TuExpertoFiscal API",
     description="AI-powered Spanish tax assistant API for N8N integration",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, specify exact origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Configure CORS (pure ASGI, in production specify exact origin)
+app.add_middleware(FastCORSMiddleware)
+app.add_middleware(GZipMiddleware, minimum_size=_GZIP_MIN_SIZE, compresslevel=5)
 
 
-# Dependency to get search service
-def get_search_service():
-    """Dependency to get initialized search service"""
-    if not search_service.initialized:
-        logger.info("Initializing search service...")
-        if not search_service.initialize():
-            raise HTTPException(
-                status_code=503,
-                detail="Search service initialization failed"
-            )
+# Serializes lazy initialization when startup init failed
+_SEARCH_INIT_LOCK = asyncio.Lock()
+
+
+# Dependency to get search service (async so FastAPI skips the threadpool)
+async def get_search_service():
+    """Dependency to get initialized search service
+
+    The blocking initialize() runs in a worker thread, once at a time; a
+    failed attempt raises 503 and the next request retries
+    """
+    if search_service.initialized:
+        return search_service
+
+    async with _SEARCH_INIT_LOCK:
+        if not search_service.initialized:
+            logger.info("Initializing search service...")
+            if not await asyncio.to_thread(search_service.initialize):
+                raise HTTPException(
+                    status_code=503,
+                    detail="Search service initialization failed"
+                )
     return search_service
 
 
@@ -69,6 +215,7 @@ def get_search_service():
 async def startup_event():
     """Initialize services on startup"""
     logger.info("Starting TuExpertoFiscal API...")
+    _get_http_client()
     
     try:
         if not search_service.initialized:
@@ -78,7 +225,7 @@ async def startup_event():
             else:
                 logger.error("❌ Failed to initialize services")
     except Exception as e:
-        logger.error(f"❌ Error during startup: {e}")
+        logger.error("❌ Error during startup: %s", e)
 
 
 @app.on_event("shutdown")
@@ -87,9 +234,14 @@ async def shutdown_event():
     logger.info("Shutting down TuExpertoFiscal API...")
     try:
         search_service.close()
+        if _CALLBACK_TASKS:
+            # Let scheduled callback deliveries finish before closing the client
+            await asyncio.gather(*_CALLBACK_TASKS, return_exceptions=True)
+        if _HTTP_CLIENT is not None:
+            await _HTTP_CLIENT.aclose()
         logger.info("✅ Services closed successfully")
     except Exception as e:
-        logger.error(f"Error during shutdown: {e}")
+        logger.error("Error during shutdown: %s", e)
 
 
 @app.get("/", tags=["Root"])
@@ -107,33 +259,72 @@ async def root():
 async def process_search_and_send(request: SearchRequest, service, webhook_url: str):
     """
     Background task: process search and send results to n8n webhook
+
+    At most _MAX_BACKGROUND_SEARCHES run at once; the rest wait for a slot.
     """
+    global _pending_searches
+    _pending_searches += 1
+    try:
+        await _SEARCH_SEM.acquire()
+    finally:
+        _pending_searches -= 1
+
     try:
-        logger.info(f"Background task: processing search for query '{request.query_text}'")
-        
         # Execute search
         response = await service.search(request)
         
         # Log results
         if response.success:
-            total_results = (len(response.telegram_results) + len(response.pdf_results) + 
-                           len(response.calendar_results) + len(response.news_results))
-            logger.info(f"Search successful: {total_results} results (telegram: {len(response.telegram_results)}, "
-                       f"pdf: {len(response.pdf_results)}, calendar: {len(response.calendar_results)}, "
-                       f"news: {len(response.news_results)}), {response.processing_time_ms}ms")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Search successful: telegram=%d pdf=%d calendar=%d news=%d, %sms",
+                    len(response.telegram_results),
+                    len(response.pdf_results),
+                    len(response.calendar_results),
+                    len(response.news_results),
+                    response.processing_time_ms
+                )
         else:
-            logger.warning(f"Search failed: {response.error_message}")
+            logger.warning("Search failed: %s", response.error_message)
         
         # Send results to n8n webhook
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            webhook_response = await client.post(
-                webhook_url,
-                json=response.model_dump()
-            )
-            logger.info(f"Results sent to webhook: {webhook_response.status_code}")
+        # pydantic-core writes JSON straight from the model, no intermediate dict
+        body, headers = _encode_outgoing(response.model_dump_json().encode())
+        webhook_response = await _get_http_client().post(
+            webhook_url,
+            content=body,
+            headers=headers
+        )
+        logger.info("Results sent to webhook: %s", webhook_response.status_code)
             
     except Exception as e:
-        logger.error(f"Error in background search task: {e}", exc_info=True)
+        logger.exception("Error in background search task: %s", e)
+    finally:
+        _SEARCH_SEM.release()
+
+
+# Short-lived copy of service.health_check() shared by /health and /stats
+_HEALTH_TTL = 2.0
+_HEALTH_CACHE: Tuple[float, Dict[str, Any]] = (0.0, {})
+_HEALTH_LOCK = asyncio.Lock()
+
+
+async def _get_cached_health(service) -> Dict[str, Any]:
+    """Return service health, refreshing at most once per _HEALTH_TTL seconds"""
+    global _HEALTH_CACHE
+    checked_at, health = _HEALTH_CACHE
+    if health and time.monotonic() - checked_at < _HEALTH_TTL:
+        return health
+
+    async with _HEALTH_LOCK:
+        # Another request may have refreshed it while we waited
+        checked_at, health = _HEALTH_CACHE
+        if health and time.monotonic() - checked_at < _HEALTH_TTL:
+            return health
+
+        health = service.health_check()
+        _HEALTH_CACHE = (time.monotonic(), health)
+        return health
 
 
 @app.get("/health", response_model=HealthCheckResponse, tags=["Health"])
@@ -144,7 +335,7 @@ async def health_check(service = Depends(get_search_service)):
     Returns status of all services (Elasticsearch, Supabase, LLM)
     """
     try:
-        health = service.health_check()
+        health = await _get_cached_health(service)
         
         # Service is healthy if initialized (even in mock mode)
         all_healthy = health.get("search_service_initialized", False)
@@ -159,13 +350,13 @@ async def health_check(service = Depends(get_search_service)):
             timestamp=datetime.now()
         )
         
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status_code,
             content=response.model_dump(mode='json')
         )
         
     except Exception as e:
-        logger.error(f"Health check error: {e}")
+        logger.error("Health check error: %s", e)
         
         response_data = HealthCheckResponse(
             status="error",
@@ -175,7 +366,7 @@ async def health_check(service = Depends(get_search_service)):
             timestamp=datetime.now()
         )
         
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=503,
             content={
                 **response_data.model_dump(mode='json'),
@@ -230,15 +421,19 @@ async def search_endpoint(
     ```
     """
     try:
-        logger.info(f"Search request from {request.user_context.channel_type}:{request.user_context.channel_user_id}")
-        logger.info(f"Query: {request.query_text}")
-        logger.info(f"Webhook URL: {request.webhook_url}")
+        logger.info(
+            "Search request from %s:%s (query_len=%d, webhook=%s)",
+            request.user_context.channel_type,
+            request.user_context.channel_user_id,
+            len(request.query_text),
+            request.webhook_url
+        )
         
         # Add background task to process search and send to webhook
         background_tasks.add_task(process_search_and_send, request, service, request.webhook_url)
         
         # Return 200 OK immediately
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "status": "accepted", 
@@ -249,17 +444,15 @@ async def search_endpoint(
         )
         
     except Exception as e:
-        logger.error(f"Error in search endpoint: {e}", exc_info=True)
+        logger.exception("Error in search endpoint: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 def _build_filters_for_source(base_filters: Optional[SearchFilters], source: SourceType) -> SearchFilters:
-    filters_data: Dict[str, Any] = {}
-    if base_filters:
-        filters_data = base_filters.model_dump(mode="python")
-    filters_data.pop("source_types", None)
-    filters_data["source_types"] = [source]
-    return SearchFilters(**filters_data)
+    if base_filters is None:
+        return SearchFilters(source_types=[source])
+    # base_filters is already validated; model_copy clones without re-running validators
+    return base_filters.model_copy(update={"source_types": [source]})
 
 
 _DEDUP_KEYS = (
@@ -272,49 +465,135 @@ _DEDUP_KEYS = (
 )
 
 
-def _result_dedup_key(metadata: Dict[str, Any], text: str) -> str:
+def _result_dedup_key(metadata: Dict[str, Any], text: str) -> Tuple[str, Any]:
+    # Bind the bound method once; most keys are absent, so a get() miss
+    # is cheaper than an itemgetter raising KeyError
+    get = metadata.get
     for key in _DEDUP_KEYS:
-        value = metadata.get(key)
+        value = get(key)
         if value:
-            return f"{key}:{value}"
-    return f"text:{hash(text)}"
+            return (key, value)
+    return ("text", text)
 
 
 def _deduplicate_results(results: List[SearchResult]) -> List[SearchResult]:
-    unique: List[SearchResult] = []
-    seen: Set[str] = set()
-
+    # First result per key wins; dict keeps insertion order
+    unique: Dict[Tuple[str, Any], SearchResult] = {}
     for result in results:
-        metadata = result.metadata or {}
-        key = _result_dedup_key(metadata, result.text)
-        if key in seen:
-            continue
-        seen.add(key)
-        unique.append(result)
-
-    return unique
+        unique.setdefault(_result_dedup_key(result.metadata or {}, result.text), result)
+    return list(unique.values())
 
 
-_DEFAULT_SOURCES: List[SourceType] = [
-    source for source in SourceType if source not in {SourceType.ALL}
-]
+_DEFAULT_SOURCES: Tuple[SourceType, ...] = tuple(
+    source for source in SourceType if source is not SourceType.ALL
+)
 
 
-def _normalise_sources(requested: Optional[List[SourceType]]) -> List[SourceType]:
+def _normalise_sources(requested: Optional[List[SourceType]]) -> Sequence[SourceType]:
     if not requested or SourceType.ALL in requested:
-        return list(_DEFAULT_SOURCES)
+        return _DEFAULT_SOURCES
+
+    # dict preserves insertion order, so this de-duplicates in one pass
+    return tuple(dict.fromkeys(requested))
+
 
-    seen: Set[SourceType] = set()
-    ordered: List[SourceType] = []
-    for source in requested:
-        if source in seen:
-            continue
-        seen.add(source)
-        ordered.append(source)
-    return ordered
+async def _search_sources_concurrently(
+    service,
+    sources: Sequence[SourceType],
+    make_request: Callable[[SourceType], SearchRequest]
+) -> List[SearchResponse]:
+    """Run one search per source concurrently so latency is max(per-source), not the sum."""
+    requests_by_source = [(source, make_request(source)) for source in sources]
+
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                (source, tg.create_task(service.search(search_request)))
+                for source, search_request in requests_by_source
+            ]
+    except ExceptionGroup as exc_group:
+        exc = exc_group.exceptions[0]
+        logger.error("n8n search failed: %s", exc)
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
 
+    return [task.result() for _, task in tasks]
 
-@app.post("/n8n/search", response_model=N8NSearchResponse, tags=["Search"])
+
+# Strong references to in-flight fire-and-forget callback deliveries
+_CALLBACK_TASKS: Set[asyncio.Task] = set()
+
+
+async def _deliver_callback(callback_url: str, body: bytes, headers: Dict[str, str]) -> str:
+    """POST an encoded payload to the N8N callback and return its delivery status"""
+    try:
+        callback_response = await _get_http_client().post(
+            callback_url,
+            content=body,
+            headers=headers,
+            timeout=10
+        )
+    except Exception as exc:
+        logger.error("Failed to POST results to N8N callback: %s", exc)
+        return f"failed:{exc}"
+
+    if callback_response.status_code < 400:
+        return f"delivered:{callback_response.status_code}"
+
+    logger.warning("N8N callback returned %s", callback_response.status_code)
+    return f"failed:{callback_response.status_code}"
+
+
+# Payloads with more results than this are streamed result by result
+_STREAM_MIN_RESULTS = 50
+
+
+def _iter_result_list(results: List[SearchResult]) -> Iterator[bytes]:
+    """Yield a JSON list of results, exporting one result at a time"""
+    yield b"["
+    for index, result in enumerate(results):
+        if index:
+            yield b","
+        yield _dump_json(result.model_dump(mode="json"))
+    yield b"]"
+
+
+def _iter_n8n_payload(response: N8NSearchResponse) -> Iterator[bytes]:
+    """Yield the N8N response as JSON straight from the result models
+
+    Same document as _dump_json(response.model_dump(mode="json")), but each
+    result dict is created and dropped in turn instead of all at once
+    """
+    head = response.model_dump(mode="json", exclude={"aggregated_results", "sources"})
+    yield _dump_json(head)[:-1]
+
+    yield b',"aggregated_results":'
+    if response.aggregated_results is None:
+        yield b"null"
+    else:
+        yield from _iter_result_list(response.aggregated_results)
+
+    yield b',"sources":['
+    for index, block in enumerate(response.sources):
+        if index:
+            yield b","
+        yield b'{"source":' + _dump_json(block.source) + b',"results":'
+        yield from _iter_result_list(block.results)
+        yield b"}"
+    yield b"]}"
+
+
+async def _stream_n8n_payload(response: N8NSearchResponse) -> AsyncIterator[bytes]:
+    """Async wrapper so StreamingResponse does not hop to a thread per chunk"""
+    for chunk in _iter_n8n_payload(response):
+        yield chunk
+
+
+@app.post(
+    "/n8n/search",
+    response_class=ORJSONResponse,
+    responses={200: {"model": N8NSearchResponse}},
+    tags=["Search"]
+)
 async def n8n_search_endpoint(
     request: N8NSearchRequest,
     service = Depends(get_search_service)
@@ -327,26 +606,22 @@ async def n8n_search_endpoint(
         channel_user_id=request.request_id or "n8n"
     )
 
-    source_groups: List[SourceResults] = []
-
-    for source in sources:
-        filters = _build_filters_for_source(request.filters, source)
-        search_request = SearchRequest(
+    def _make_req(source: SourceType) -> SearchRequest:
+        return SearchRequest(
             user_context=user_context,
             query_text=request.query_text,
-            filters=filters,
+            filters=_build_filters_for_source(request.filters, source),
             top_k=request.top_k_per_source,
             generate_response=False
         )
 
-        try:
-            search_response = await service.search(search_request)
-        except Exception as exc:
-            logger.error("n8n search failed for source %s: %s", source.value, exc)
-            raise HTTPException(status_code=500, detail=str(exc)) from exc
+    search_responses = await _search_sources_concurrently(service, sources, _make_req)
+    results_by_source = [search_response.results for search_response in search_responses]
 
-        unique_results = _deduplicate_results(search_response.results)
-        source_groups.append(SourceResults(source=source, results=unique_results))
+    source_groups: List[SourceResults] = [
+        SourceResults(source=source, results=_deduplicate_results(results))
+        for source, results in zip(sources, results_by_source)
+    ]
 
     aggregated: Optional[List[SearchResult]] = None
     if request.aggregate_results:
@@ -366,24 +641,25 @@ async def n8n_search_endpoint(
     )
 
     if request.callback_url:
-        callback_status = None
-        try:
-            async with httpx.AsyncClient(timeout=10) as http_client:
-                callback_response = await http_client.post(
-                    str(request.callback_url),
-                    json=response_payload.model_dump(mode="json")
-                )
-            if callback_response.status_code < 400:
-                callback_status = f"delivered:{callback_response.status_code}"
-            else:
-                callback_status = f"failed:{callback_response.status_code}"
-        except Exception as exc:
-            logger.error("Failed to POST results to N8N callback: %s", exc)
-            callback_status = f"failed:{exc}"
+        # Serialized straight from the models, without a full model_dump dict
+        body, headers = _encode_outgoing(b"".join(_iter_n8n_payload(response_payload)))
+        if request.await_callback:
+            response_payload.callback_status = await _deliver_callback(
+                str(request.callback_url), body, headers
+            )
+        else:
+            task = asyncio.create_task(_deliver_callback(str(request.callback_url), body, headers))
+            _CALLBACK_TASKS.add(task)
+            task.add_done_callback(_CALLBACK_TASKS.discard)
+            response_payload.callback_status = "scheduled"
 
-        response_payload = response_payload.model_copy(update={"callback_status": callback_status})
+    total_results = sum(len(block.results) for block in source_groups)
+    if aggregated:
+        total_results += len(aggregated)
+    if total_results > _STREAM_MIN_RESULTS:
+        return StreamingResponse(_stream_n8n_payload(response_payload), media_type="application/json")
 
-    return response_payload
+    return ORJSONResponse(response_payload.model_dump(mode="json"))
 
 
 
@@ -393,15 +669,19 @@ async def get_stats(service = Depends(get_search_service)):
     Get service statistics (optional endpoint for monitoring)
     """
     try:
-        health = service.health_check()
+        health = await _get_cached_health(service)
         
         return {
             "status": "operational",
             "services": health,
+            "background_searches": {
+                "limit": _MAX_BACKGROUND_SEARCHES,
+                "pending": _pending_searches
+            },
             "timestamp": datetime.now().isoformat()
         }
     except Exception as e:
-        logger.error(f"Error getting stats: {e}")
+        logger.error("Error getting stats: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -409,8 +689,8 @@ async def get_stats(service = Depends(get_search_service)):
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """Handle HTTP exceptions"""
-    logger.error(f"HTTP error {exc.status_code}: {exc.detail}")
-    return JSONResponse(
+    logger.error("HTTP error %s: %s", exc.status_code, exc.detail)
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "success": False,
@@ -423,8 +703,8 @@ async def http_exception_handler(request, exc):
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     """Handle general exceptions"""
-    logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
+    logger.error("Unhandled exception: %s", exc, exc_info=exc)
+    return ORJSONResponse(
         status_code=500,
         content={
             "success": False,
@@ -443,5 +723,9 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=True,
-        log_level="info"
+        log_level="info",
+        loop="uvloop",
+        http="httptools",
+        limit_concurrency=1000,
+        timeout_keep_alive=30
     )
@@ -6,11 +6,16 @@ Bot: @tax_spaine_bot
 """
 import os
 import re
+import atexit
+import queue
 import asyncio
 import logging
-from typing import Optional
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
 
+import orjson
 from aiogram import Bot, Dispatcher, Router, F
+from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.filters import Command, CommandStart
 from aiogram.types import Message, BotCommand, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.enums import ParseMode, ChatAction
@@ -29,12 +34,28 @@ from app.prompts import (
 
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
-logging.basicConfig(level=logging.INFO)
+# Логи пишутся в stdout фоновым потоком: обработчики в event loop только
+# кладут запись в очередь и не ждут синхронный flush stdout
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, logging.StreamHandler())
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(_log_queue)])
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logger = logging.getLogger(__name__)
 
 # Router для обработки сообщений
 router = Router()
 
+# Кириллица (определение языка пользователя): один C-level поиск regex
+# вместо генератора по каждому символу
+_CYRILLIC_RE = re.compile('[\u0400-\u04FF]')
+
+
+def _has_cyrillic(text: Optional[str]) -> bool:
+    """Есть ли в тексте кириллица"""
+    return bool(text) and _CYRILLIC_RE.search(text) is not None
+
 
 def _subscribe_keyboard(is_russian: bool) -> InlineKeyboardMarkup:
     """Кнопка 'Подписаться' на всю ширину для бесплатных пользователей"""
@@ -137,7 +158,7 @@ async def cmd_subscribe(message: Message):
 
     user = message.from_user
     current_plan = await subscription_service.get_user_plan(user.id)
-    is_russian = any('\u0400' <= c <= '\u04FF' for c in (user.first_name or ''))
+    is_russian = _has_cyrillic(user.first_name)
 
     # Проверяем аргумент: /subscribe basic или /subscribe pro
     args = message.text.split()
@@ -257,7 +278,7 @@ async def callback_subscribe(callback: CallbackQuery):
 
     chosen_plan = callback.data.split(":")[1]  # "basic" or "pro"
     user = callback.from_user
-    is_russian = any('\u0400' <= c <= '\u04FF' for c in (user.first_name or ''))
+    is_russian = _has_cyrillic(user.first_name)
 
     await callback.answer()  # убираем "часики" на кнопке
 
@@ -296,7 +317,7 @@ async def callback_show_plans(callback: CallbackQuery):
         return
 
     user = callback.from_user
-    is_russian = any('\u0400' <= c <= '\u04FF' for c in (user.first_name or ''))
+    is_russian = _has_cyrillic(user.first_name)
     current_plan = await subscription_service.get_user_plan(user.id)
 
     await callback.answer()
@@ -341,7 +362,7 @@ async def cmd_status(message: Message):
 
     user = message.from_user
     plan = await subscription_service.get_user_plan(user.id)
-    is_russian = any('\u0400' <= c <= '\u04FF' for c in (user.first_name or ''))
+    is_russian = _has_cyrillic(user.first_name)
 
     remaining = plan.messages_remaining if plan.messages_remaining is not None else 0
     remaining_text = "∞" if plan.daily_limit is None else str(remaining)
@@ -395,7 +416,8 @@ async def handle_message(message: Message):
     logger.info(f"Query from {user.id} ({user.username}): {query[:100]}")
 
     # Определяем язык пользователя
-    is_russian = any('\u0400' <= c <= '\u04FF' for c in query) or any('\u0400' <= c <= '\u04FF' for c in (user.first_name or ''))
+    query_is_russian = _has_cyrillic(query)
+    is_russian = query_is_russian or _has_cyrillic(user.first_name)
 
     # Проверяем лимиты подписки
     user_plan = None
@@ -428,16 +450,27 @@ async def handle_message(message: Message):
             except Exception:
                 pass
 
-    try:
-        # Инкрементируем счётчик использования
-        if subscription_service:
-            await subscription_service.increment_usage(user.id)
+    async def show_partial(text: str):
+        # Черновик ответа во время стриминга: без Markdown (разметка может быть
+        # незакрытой), финальный ответ придёт отдельным сообщением
+        try:
+            await status_msg.edit_text(text[:4000] + " …")
+        except Exception:
+            pass
 
+    # Инкрементируем счётчик использования параллельно с работой агента:
+    # это независимый запрос в Supabase, дожидаемся его в finally
+    usage_task = None
+    if subscription_service:
+        usage_task = asyncio.create_task(subscription_service.increment_usage(user.id))
+
+    try:
         # Обрабатываем запрос через агента
         response = await agent.process_query(
             query=query,
             user_id=str(user.id),
-            progress_callback=update_status
+            progress_callback=update_status,
+            partial_callback=show_partial
         )
 
         # Удаляем статус-сообщение
@@ -451,7 +484,7 @@ async def handle_message(message: Message):
 
         # Добавляем метаданные (опционально)
         if response.confidence < 0.5:
-            if any('\u0400' <= c <= '\u04FF' for c in query):
+            if query_is_russian:
                 reply_text += LOW_CONFIDENCE_WARNING_RU
             else:
                 reply_text += LOW_CONFIDENCE_WARNING_ES
@@ -501,6 +534,12 @@ async def handle_message(message: Message):
         await message.answer(
             "Lo siento, ha ocurrido un error. Por favor, inténtalo de nuevo."
         )
+    finally:
+        if usage_task:
+            try:
+                await usage_task
+            except Exception as e:
+                logger.error("Error incrementing usage for %s: %s", user.id, e)
 
 
 # ============================================================
@@ -520,6 +559,11 @@ async def set_bot_commands(bot: Bot):
     await bot.set_my_commands(commands)
 
 
+def _orjson_dumps(value: Any) -> str:
+    """json_dumps для aiogram сессии (ожидается str, orjson отдаёт bytes)"""
+    return orjson.dumps(value).decode()
+
+
 async def main():
     """Запуск бота + Stripe webhook сервера"""
     global agent, subscription_service
@@ -530,7 +574,10 @@ async def main():
         logger.error("TELEGRAM_BOT_TOKEN not set!")
         return
 
-    bot = Bot(token=bot_token)
+    # orjson вместо stdlib json для всех запросов к Bot API: разбор
+    # getUpdates при polling и сериализация отправляемых сообщений
+    session = AiohttpSession(json_loads=orjson.loads, json_dumps=_orjson_dumps)
+    bot = Bot(token=bot_token, session=session)
     dp = Dispatcher()
     dp.include_router(router)
 
@@ -556,7 +603,10 @@ async def main():
     from app.api.stripe_webhook import run_webhook_server
     webhook_port = int(os.getenv("WEBHOOK_PORT", "8000"))
     logger.info(f"🔗 Starting Stripe webhook server on port {webhook_port}...")
-    webhook_task = asyncio.create_task(run_webhook_server(port=webhook_port))
+    # Тот же SubscriptionService: оплата сбрасывает кэш планов, который читает бот
+    webhook_task = asyncio.create_task(
+        run_webhook_server(port=webhook_port, service=subscription_service)
+    )
 
     # Запуск polling
     logger.info("🚀 Bot started! @tax_spaine_bot")
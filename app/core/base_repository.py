@@ -1,59 +1,217 @@
 """
 Базовый класс для работы с Supabase
 """
-from typing import List, Dict, Any, Optional
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Iterator, List, Dict, Any, Optional, Set
+import numpy as np
+import orjson
+from postgrest.types import ReturnMethod
 from supabase import Client, create_client
-from app.config.settings import Settings
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def get_supabase_client(url: str, key: str) -> Client:
+    """
+    Общий Supabase клиент на процесс для пары (url, key)
+
+    Каждый create_client поднимает свой HTTP пул соединений к PostgREST.
+    Репозитории и сервисы создаются во многих местах (поиск, инструменты
+    агента, бот), поэтому клиент переиспользуется: соединения остаются
+    тёплыми (keep-alive), без повторных TCP/TLS рукопожатий
+    """
+    return create_client(url, key)
+
+
+# RPC функции из необязательных миграций (007, 008, 010), которых нет в БД:
+# имя -> time.monotonic(), после которого пробуем снова. Без этого каждый
+# запрос сначала делает заведомо неудачный RPC и только потом fallback
+MISSING_RPC_RETRY_SECONDS = 300.0
+_missing_rpc_until: Dict[str, float] = {}
+MISSING_FUNCTION_RE = re.compile(r'\bfunction [\w."]+\([^)]*\) does not exist')
+
+
+def rpc_available(name: str) -> bool:
+    """False, если RPC недавно не нашлась в БД (см. mark_rpc_missing)"""
+    until = _missing_rpc_until.get(name)
+    return until is None or time.monotonic() >= until
+
+
+def mark_rpc_missing(name: str, error: Exception) -> None:
+    """
+    Запомнить, что RPC не развёрнута (PostgREST PGRST202), на
+    MISSING_RPC_RETRY_SECONDS. Прочие ошибки (таймауты, сеть) не кэшируются
+    """
+    if is_missing_rpc_error(error):
+        _missing_rpc_until[name] = time.monotonic() + MISSING_RPC_RETRY_SECONDS
+
+
+def is_missing_rpc_error(error: Exception) -> bool:
+    """
+    Ошибка "функция не найдена": PostgREST PGRST202 или Postgres
+    "function name(args) does not exist". Отсутствующие колонки, таблицы и
+    типы (в том числе внутри существующей функции) сюда не относятся
+    """
+    message = str(error)
+    return 'PGRST202' in message or MISSING_FUNCTION_RE.search(message) is not None
+
+
+# Источники, поиск по которым в текущем запросе прошёл с ошибкой (RPC упал,
+# сработал fallback). Множество заводит вызывающий код через
+# collect_search_failures(); задачи asyncio и asyncio.to_thread копируют
+# контекст, поэтому репозитории пишут в тот же объект. Без него - no-op
+_search_failures: ContextVar[Optional[Set[str]]] = ContextVar('search_failures', default=None)
+
+
+@contextmanager
+def collect_search_failures() -> Iterator[Set[str]]:
+    """Собрать источники с ошибками поиска для всего, что запущено внутри блока"""
+    failures: Set[str] = set()
+    token = _search_failures.set(failures)
+    try:
+        yield failures
+    finally:
+        _search_failures.reset(token)
+
+
+def report_search_failure(source: str) -> None:
+    """Отметить, что поиск по источнику вернул неполный результат из-за ошибки"""
+    failures = _search_failures.get()
+    if failures is not None:
+        failures.add(source)
+
+
+# Точность вектора запроса в литерале: float32, округлённый до 1e-5
+# (точнее halfvec индекса), литерал 1536d ~13KB вместо ~33KB, косинусная
+# схожесть меняется в 8-м знаке
+QUERY_VECTOR_DECIMALS = 5
+
+
+def encode_vector(value: Any, decimals: Optional[int] = QUERY_VECTOR_DECIMALS) -> Any:
+    """
+    Сериализация вектора (list/ndarray) в литерал pgvector "[...]" через orjson
+
+    Готовый литерал (str) возвращается как есть: один и тот же embedding
+    запроса, уходящий в несколько RPC, можно сериализовать один раз.
+    Вектор округляется до decimals знаков; decimals=None - полная точность
+    (эмбеддинги, которые записываются в таблицы)
+    """
+    if value is None or isinstance(value, str):
+        return value
+    if decimals is not None:
+        value = np.round(np.asarray(value, dtype=np.float32), decimals)
+    return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY).decode()
 
 
 class BaseRepository:
     """Базовый репозиторий для работы с таблицами Supabase"""
 
+    # Колонки pgvector: отправляем их как текстовый литерал "[...]",
+    # сериализованный orjson, вместо списка float для stdlib json
+    VECTOR_COLUMNS = ("content_embedding",)
+
+    # Колонки для чтения строк (select). Таблицы с эмбеддингами перечисляют
+    # всё, кроме content_embedding: вектор в JSON ответе это ~10-20KB на строку
+    ROW_COLUMNS = '*'
+
     def __init__(self, table_name: str):
         self.table_name = table_name
-        self.settings = Settings()
+        self.settings = settings
         self.client: Client = self._init_client()
 
     def _init_client(self) -> Client:
-        """Инициализация Supabase клиента"""
-        return create_client(
+        """Получение общего Supabase клиента"""
+        return get_supabase_client(
             self.settings.SUPABASE_URL,
             self.settings.SUPABASE_KEY
         )
 
+    @staticmethod
+    def _encode_vector(value: Any) -> Any:
+        """Сериализация одного вектора (list/ndarray) в литерал pgvector через orjson"""
+        return encode_vector(value)
+
+    def _encode_vectors(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Сериализация embedding-колонок записи в литерал pgvector через orjson"""
+        encoded = None
+        for column in self.VECTOR_COLUMNS:
+            value = row.get(column)
+            if value is None or isinstance(value, str):
+                continue
+            if encoded is None:
+                encoded = dict(row)
+            encoded[column] = encode_vector(value, decimals=None)
+        return encoded if encoded is not None else row
+
     def insert(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Вставка одной записи"""
-        result = self.client.table(self.table_name).insert(data).execute()
+        result = self.client.table(self.table_name).insert(self._encode_vectors(data)).execute()
         return result.data[0] if result.data else None
 
-    def insert_many(self, data: List[Dict[str, Any]], batch_size: int = 100) -> int:
+    def _insert_batch(self, batch_number: int, batch: List[Dict[str, Any]]) -> int:
+        """Вставка одного батча, возвращает количество вставленных записей"""
+        try:
+            rows = [self._encode_vectors(row) for row in batch]
+            # returning=minimal: PostgREST не отправляет вставленные строки
+            # (вместе с эмбеддингами) обратно, при ошибке будет исключение
+            self.client.table(self.table_name).insert(rows, returning=ReturnMethod.minimal).execute()
+            inserted = len(rows)
+            logger.info("✅ Вставлено %d записей (батч %d)", inserted, batch_number)
+            return inserted
+        except Exception as e:
+            logger.error("❌ Ошибка при вставке батча %d: %s", batch_number, e)
+            return 0
+
+    def insert_many(
+        self,
+        data: List[Dict[str, Any]],
+        batch_size: int = 100,
+        concurrency: int = 4
+    ) -> int:
         """
         Вставка множества записей батчами
 
+        Батчи отправляются параллельно через общий клиент (пул соединений
+        httpx потокобезопасен), поэтому время загрузки не растёт линейно
+        с количеством батчей.
+
         Args:
             data: Список записей для вставки
             batch_size: Размер батча (по умолчанию 100)
+            concurrency: Сколько батчей отправлять одновременно (1 = последовательно)
 
         Returns:
             Количество вставленных записей
         """
-        total_inserted = 0
+        batches = [
+            (i // batch_size + 1, data[i:i + batch_size])
+            for i in range(0, len(data), batch_size)
+        ]
 
-        for i in range(0, len(data), batch_size):
-            batch = data[i:i + batch_size]
-            try:
-                result = self.client.table(self.table_name).insert(batch).execute()
-                total_inserted += len(result.data) if result.data else 0
-                print(f"✅ Вставлено {len(result.data)} записей (батч {i//batch_size + 1})")
-            except Exception as e:
-                print(f"❌ Ошибка при вставке батча {i//batch_size + 1}: {e}")
-                continue
+        if concurrency <= 1 or len(batches) <= 1:
+            return sum(self._insert_batch(number, batch) for number, batch in batches)
 
-        return total_inserted
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(batches))) as executor:
+            return sum(executor.map(lambda item: self._insert_batch(*item), batches))
 
-    def select_all(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Получение всех записей"""
-        query = self.client.table(self.table_name).select('*')
+    def select_all(self, limit: Optional[int] = None, columns: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Получение всех записей
+
+        Args:
+            limit: Лимит результатов
+            columns: Список колонок для PostgREST select (по умолчанию ROW_COLUMNS).
+                Передавайте только нужные колонки, чтобы не тянуть лишнее
+        """
+        query = self.client.table(self.table_name).select(columns or self.ROW_COLUMNS)
 
         if limit:
             query = query.limit(limit)
@@ -63,12 +221,12 @@ class BaseRepository:
 
     def select_by_id(self, record_id: str) -> Optional[Dict[str, Any]]:
         """Получение записи по ID"""
-        result = self.client.table(self.table_name).select('*').eq('id', record_id).execute()
+        result = self.client.table(self.table_name).select(self.ROW_COLUMNS).eq('id', record_id).execute()
         return result.data[0] if result.data else None
 
     def count(self) -> int:
-        """Подсчет количества записей в таблице"""
-        result = self.client.table(self.table_name).select('id', count='exact').limit(0).execute()
+        """Подсчет количества записей в таблице (HEAD-запрос, без тела ответа)"""
+        result = self.client.table(self.table_name).select('id', count='exact', head=True).execute()
         return result.count or 0
 
     def delete_all(self) -> int:
@@ -77,8 +235,8 @@ class BaseRepository:
         Используйте только для очистки при миграции
         """
         # Supabase не поддерживает удаление всех записей одной командой
-        # Поэтому сначала получаем все ID
-        records = self.select_all()
+        # Поэтому сначала получаем все ID (только колонку id, без контента и эмбеддингов)
+        records = self.select_all(columns='id')
         deleted_count = 0
 
         for record in records:
@@ -86,11 +244,11 @@ class BaseRepository:
                 self.client.table(self.table_name).delete().eq('id', record['id']).execute()
                 deleted_count += 1
             except Exception as e:
-                print(f"⚠️ Ошибка при удалении записи {record['id']}: {e}")
+                logger.warning("⚠️ Ошибка при удалении записи %s: %s", record['id'], e)
 
         return deleted_count
 
     def upsert(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Вставка или обновление записи"""
-        result = self.client.table(self.table_name).upsert(data).execute()
+        result = self.client.table(self.table_name).upsert(self._encode_vectors(data)).execute()
         return result.data[0] if result.data else None
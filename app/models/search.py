@@ -3,11 +3,20 @@ Data models for search requests and responses
 """
 
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field, AnyHttpUrl
+from pydantic import BaseModel, ConfigDict, Field, AnyHttpUrl
 from datetime import datetime
 from enum import Enum
 
 
+# Shared settings for search payload models: unknown fields are dropped,
+# assignments are not re-validated and enums are stored as their values
+SEARCH_MODEL_CONFIG = ConfigDict(
+    extra="ignore",
+    validate_assignment=False,
+    use_enum_values=True
+)
+
+
 class SourceType(str, Enum):
     """Types of knowledge sources"""
     TELEGRAM = "telegram"
@@ -21,6 +30,8 @@ class SourceType(str, Enum):
 
 class SearchFilters(BaseModel):
     """Filters for search queries"""
+    model_config = SEARCH_MODEL_CONFIG
+
     source_types: Optional[List[SourceType]] = Field(
         default=None,
         description="Filter by source types (telegram, pdf, news, etc.)"
@@ -101,8 +112,9 @@ class SearchRequest(BaseModel):
         description="n8n webhook URL to send results to"
     )
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        **SEARCH_MODEL_CONFIG,
+        json_schema_extra={
             "example": {
                 "user_context": {
                     "channel_type": "telegram",
@@ -122,10 +134,13 @@ class SearchRequest(BaseModel):
                 "generate_response": True
             }
         }
+    )
 
 
 class SearchResult(BaseModel):
     """Single search result"""
+    model_config = SEARCH_MODEL_CONFIG
+
     text: str = Field(
         ...,
         description="Retrieved text chunk"
@@ -191,8 +206,9 @@ class SearchResponse(BaseModel):
         description="Total processing time in milliseconds"
     )
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        **SEARCH_MODEL_CONFIG,
+        json_schema_extra={
             "example": {
                 "success": True,
                 "query_text": "¿Cuándo tengo que presentar el modelo 303?",
@@ -216,16 +232,21 @@ class SearchResponse(BaseModel):
                 "processing_time_ms": 150
             }
         }
+    )
 
 
 class SourceResults(BaseModel):
     """Results grouped by source for N8N integration"""
+    model_config = SEARCH_MODEL_CONFIG
+
     source: SourceType
     results: List[SearchResult]
 
 
 class N8NSearchRequest(BaseModel):
     """Request payload for N8N multi-source search"""
+    model_config = SEARCH_MODEL_CONFIG
+
     query_text: str = Field(
         ...,
         min_length=1,
@@ -250,6 +271,10 @@ class N8NSearchRequest(BaseModel):
         default=None,
         description="Optional N8N webhook URL to POST the results to"
     )
+    await_callback: bool = Field(
+        default=False,
+        description="Wait for callback delivery and report its status instead of sending it in the background"
+    )
     request_id: Optional[str] = Field(
         default=None,
         description="External request identifier for tracing"
@@ -270,6 +295,8 @@ class N8NSearchRequest(BaseModel):
 
 class N8NSearchResponse(BaseModel):
     """Response payload for N8N multi-source search"""
+    model_config = SEARCH_MODEL_CONFIG
+
     success: bool = Field(default=True)
     query_text: str
     request_id: Optional[str] = None
@@ -278,7 +305,7 @@ class N8NSearchResponse(BaseModel):
     sources: List[SourceResults]
     callback_status: Optional[str] = Field(
         default=None,
-        description="Status of callback delivery (if callback_url provided)"
+        description="Status of callback delivery (if callback_url provided): scheduled, delivered:<code> or failed:<reason>"
     )
 
 
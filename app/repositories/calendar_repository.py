@@ -1,9 +1,13 @@
 """
 Репозиторий для работы с налоговым календарем
 """
+import asyncio
+import logging
 from typing import List, Dict, Any, Optional
 from datetime import date
-from app.core.base_repository import BaseRepository
+from app.core.base_repository import BaseRepository, report_search_failure
+
+logger = logging.getLogger(__name__)
 
 
 class CalendarRepository(BaseRepository):
@@ -70,7 +74,10 @@ class CalendarRepository(BaseRepository):
         date_to: Optional[date] = None
     ) -> List[Dict[str, Any]]:
         """
-        Keyword поиск по календарю (full-text search по description и tax_model)
+        Keyword поиск по календарю (по description, tax_model и tax_type)
+
+        Сначала ищутся строки, где нашлось каждое слово запроса; если таких
+        нет, поиск ослабляется до любого слова
 
         Args:
             query_text: Текст запроса
@@ -84,53 +91,67 @@ class CalendarRepository(BaseRepository):
             Список дедлайнов, отсортированных по релевантности и дате
         """
         try:
-            # Используем .ilike() для case-insensitive поиска
-            query = self.client.table(self.table_name)\
-                .select('*')
-
-            # Фильтры
-            if tax_type:
-                query = query.eq('tax_type', tax_type)
-
-            if applies_to:
-                query = query.contains('applies_to', applies_to)
-
-            if date_from:
-                query = query.gte('deadline_date', date_from.isoformat())
-
-            if date_to:
-                query = query.lte('deadline_date', date_to.isoformat())
-
-            # Keyword search - ищем каждое значимое слово в одном OR
+            # Keyword search: по каждому значимому слову (>2 символов) группа
+            # description/tax_model/tax_type через .ilike() (case-insensitive)
+            word_filters = []
             if query_text:
-                # Извлекаем значимые слова (>2 символов), убираем запятые
                 words = [
                     w.strip('.,;:!?()') for w in query_text.split()
                     if len(w.strip('.,;:!?()')) > 2
                 ]
-                # Строим один or_ запрос со всеми словами по всем полям
-                or_conditions = []
                 for word in words[:5]:  # Макс 5 слов
                     pattern = f'%{word}%'
-                    or_conditions.append(f'description.ilike.{pattern}')
-                    or_conditions.append(f'tax_model.ilike.{pattern}')
-                    or_conditions.append(f'tax_type.ilike.{pattern}')
-
-                if or_conditions:
-                    query = query.or_(','.join(or_conditions))
-
-            query = query.order('deadline_date').limit(limit)
-
-            result = query.execute()
+                    word_filters.append(
+                        f'or(description.ilike.{pattern},'
+                        f'tax_model.ilike.{pattern},'
+                        f'tax_type.ilike.{pattern})'
+                    )
+
+            def build_query(keyword_filter: Optional[str]):
+                query = self.client.table(self.table_name)\
+                    .select('*')
+
+                # Фильтры
+                if tax_type:
+                    query = query.eq('tax_type', tax_type)
+
+                if applies_to:
+                    query = query.contains('applies_to', applies_to)
+
+                if date_from:
+                    query = query.gte('deadline_date', date_from.isoformat())
+
+                if date_to:
+                    query = query.lte('deadline_date', date_to.isoformat())
+
+                if keyword_filter:
+                    query = query.or_(keyword_filter)
+
+                return query.order('deadline_date').limit(limit)
+
+            # Сначала все слова сразу (каждое - в любом из полей): частые
+            # слова вроде "modelo" по OR совпадают почти со всеми строками
+            if len(word_filters) > 1:
+                result = await asyncio.to_thread(
+                    build_query(f"and({','.join(word_filters)})").execute
+                )
+                if result.data:
+                    return result.data
+
+            # Одно слово или нет строк со всеми словами - любое слово (OR)
+            result = await asyncio.to_thread(
+                build_query(','.join(word_filters)).execute
+            )
             return result.data if result.data else []
 
         except Exception as e:
-            print(f"⚠️ Ошибка при search_by_query в Calendar: {e}")
+            logger.warning("⚠️ Ошибка при search_by_query в Calendar: %s", e)
+            report_search_failure('calendar')
             # Fallback: просто возвращаем ближайшие дедлайны
-            from datetime import date as date_type
-            return self.get_upcoming_deadlines(
-                start_date=date_from or date_type.today(),
-                end_date=date_to or date_type(2026, 12, 31)
+            return await asyncio.to_thread(
+                self.get_upcoming_deadlines,
+                start_date=date_from or date.today(),
+                end_date=date_to or date(2026, 12, 31)
             )
 
     def get_next_deadline_for_model(self, tax_model: str) -> Optional[Dict[str, Any]]:
@@ -1,14 +1,25 @@
 """
 Репозиторий для работы с новостями
 """
+import asyncio
+import logging
 from typing import List, Dict, Any, Optional
-from datetime import datetime, date
-from app.core.base_repository import BaseRepository
+from datetime import datetime, date, timedelta
+from app.core.base_repository import BaseRepository, report_search_failure
+
+logger = logging.getLogger(__name__)
 
 
 class NewsRepository(BaseRepository):
     """Репозиторий для таблицы news_articles_content"""
 
+    # Все колонки, кроме content_embedding
+    ROW_COLUMNS = (
+        'id, article_url, article_title, content, summary, news_source, author, '
+        'published_at, categories, keywords, tax_related, relevance_score, metadata, '
+        'created_at, updated_at'
+    )
+
     def __init__(self):
         super().__init__('news_articles_content')
 
@@ -44,7 +55,7 @@ class NewsRepository(BaseRepository):
             # Вызов RPC функции search_news_hybrid
             params = {
                 'query_text': query_text,
-                'query_embedding': query_embedding,
+                'query_embedding': self._encode_vector(query_embedding),
                 'match_limit': limit,
                 'similarity_threshold': similarity_threshold
             }
@@ -59,13 +70,18 @@ class NewsRepository(BaseRepository):
             if categories:
                 params['filter_categories'] = categories
 
-            result = self.client.rpc('search_news_hybrid', params).execute()
+            # supabase-py синхронный: выполняем запрос в потоке, чтобы не блокировать
+            # event loop и дать параллельным поискам по источникам идти одновременно
+            result = await asyncio.to_thread(self.client.rpc('search_news_hybrid', params).execute)
             return result.data if result.data else []
 
         except Exception as e:
-            print(f"⚠️ Ошибка при hybrid search в News: {e}")
+            logger.warning("⚠️ Ошибка при hybrid search в News: %s", e)
+            report_search_failure('news')
             # Fallback: векторный поиск без BM25
-            return self._vector_search_fallback(query_embedding, limit, similarity_threshold)
+            return await asyncio.to_thread(
+                self._vector_search_fallback, query_embedding, limit, similarity_threshold
+            )
 
     def _vector_search_fallback(
         self,
@@ -80,13 +96,13 @@ class NewsRepository(BaseRepository):
             # Простой векторный поиск (временная реализация)
             # В будущем можно использовать match_documents для news
             result = self.client.table(self.table_name)\
-                .select('*')\
+                .select(self.ROW_COLUMNS)\
                 .limit(limit)\
                 .execute()
 
             return result.data if result.data else []
         except Exception as e:
-            print(f"⚠️ Fallback vector search также не сработал: {e}")
+            logger.warning("⚠️ Fallback vector search также не сработал: %s", e)
             return []
 
     def get_recent_news(
@@ -104,11 +120,10 @@ class NewsRepository(BaseRepository):
         Returns:
             Список новостей
         """
-        from datetime import timedelta
         date_from = datetime.now() - timedelta(days=days)
 
         result = self.client.table(self.table_name)\
-            .select('*')\
+            .select(self.ROW_COLUMNS)\
             .gte('published_at', date_from.isoformat())\
             .order('published_at', desc=True)\
             .limit(limit)\
@@ -132,7 +147,7 @@ class NewsRepository(BaseRepository):
             Список новостей
         """
         query = self.client.table(self.table_name)\
-            .select('*')\
+            .select(self.ROW_COLUMNS)\
             .eq('news_source', news_source)\
             .order('published_at', desc=True)
 
@@ -158,7 +173,7 @@ class NewsRepository(BaseRepository):
             Список новостей
         """
         query = self.client.table(self.table_name)\
-            .select('*')\
+            .select(self.ROW_COLUMNS)\
             .contains('categories', [category])\
             .order('published_at', desc=True)
 
@@ -182,7 +197,7 @@ class NewsRepository(BaseRepository):
             Список налоговых новостей
         """
         query = self.client.table(self.table_name)\
-            .select('*')\
+            .select(self.ROW_COLUMNS)\
             .eq('tax_related', True)\
             .order('published_at', desc=True)
 
@@ -1,13 +1,26 @@
 """
 Репозиторий для работы с PDF документами
 """
+import asyncio
+import logging
 from typing import List, Dict, Any, Optional
-from app.core.base_repository import BaseRepository
+from app.core.base_repository import (
+    BaseRepository, is_missing_rpc_error, mark_rpc_missing, report_search_failure, rpc_available
+)
+
+logger = logging.getLogger(__name__)
 
 
 class PDFRepository(BaseRepository):
     """Репозиторий для таблицы pdf_documents_content"""
 
+    # Все колонки, кроме content_embedding
+    ROW_COLUMNS = (
+        'id, document_id, document_title, chunk_index, content, document_type, '
+        'document_number, categories, page_number, section_title, source_url, region, '
+        'language, publication_date, metadata, created_at, updated_at'
+    )
+
     def __init__(self):
         super().__init__('pdf_documents_content')
 
@@ -41,7 +54,7 @@ class PDFRepository(BaseRepository):
             # Вызов RPC функции search_pdf_hybrid
             params = {
                 'query_text': query_text,
-                'query_embedding': query_embedding,
+                'query_embedding': self._encode_vector(query_embedding),
                 'match_limit': limit,
                 'similarity_threshold': similarity_threshold
             }
@@ -51,16 +64,152 @@ class PDFRepository(BaseRepository):
                 params['filter_document_type'] = document_type
             if region:
                 params['filter_region'] = region
-            if categories:
-                params['filter_categories'] = categories
 
-            result = self.client.rpc('search_pdf_hybrid', params).execute()
+            # supabase-py синхронный: выполняем запрос в потоке, чтобы не блокировать
+            # event loop и дать параллельным поискам по источникам идти одновременно
+            result = await self._rpc_with_categories(
+                'search_pdf_hybrid', params, 'filter_categories', categories
+            )
             return result.data if result.data else []
 
         except Exception as e:
-            print(f"⚠️ Ошибка при hybrid search в PDF: {e}")
+            logger.warning("⚠️ Ошибка при hybrid search в PDF: %s", e)
+            report_search_failure('pdf')
             # Fallback: векторный поиск без BM25
-            return self._vector_search_fallback(query_embedding, limit, similarity_threshold)
+            return await asyncio.to_thread(
+                self._vector_search_fallback, query_embedding, limit, similarity_threshold
+            )
+
+    async def hybrid_search_with_news(
+        self,
+        query_text: str,
+        query_embedding: List[float],
+        limit: int = 10,
+        similarity_threshold: float = 0.5,
+        pdf_categories: Optional[List[str]] = None
+    ) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """
+        Гибридный поиск по PDF и новостям одним RPC вызовом
+
+        PDF и News используют один и тот же 1536d embedding, поэтому
+        search_pdf_news_hybrid (migration 007) выполняет оба поиска за
+        один запрос к PostgREST вместо двух.
+
+        Args:
+            query_text: Текст запроса для keyword поиска
+            query_embedding: Вектор запроса для semantic поиска (1536d)
+            limit: Количество результатов на источник
+            similarity_threshold: Порог схожести (0.0-1.0)
+            pdf_categories: Фильтр PDF по категориям (irpf, iva, etc.)
+
+        Returns:
+            {'pdf': [...], 'news': [...]} или None, если RPC недоступна
+            (тогда вызывающий код ищет по источникам отдельно)
+        """
+        if not rpc_available('search_pdf_news_hybrid'):
+            return None
+
+        try:
+            params = {
+                'query_text': query_text,
+                'query_embedding': self._encode_vector(query_embedding),
+                'match_limit': limit,
+                'similarity_threshold': similarity_threshold
+            }
+            result = await self._rpc_with_categories(
+                'search_pdf_news_hybrid', params, 'pdf_categories', pdf_categories
+            )
+            data = result.data or {}
+            return {'pdf': data.get('pdf') or [], 'news': data.get('news') or []}
+
+        except Exception as e:
+            logger.warning("⚠️ Ошибка при совместном hybrid search PDF + News: %s", e)
+            mark_rpc_missing('search_pdf_news_hybrid', e)
+            return None
+
+    async def hybrid_search_all_sources(
+        self,
+        query_text: str,
+        query_embedding: List[float],
+        telegram_query_text: str,
+        telegram_embedding: List[float],
+        limit: int = 10,
+        similarity_threshold: float = 0.5,
+        pdf_categories: Optional[List[str]] = None
+    ) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """
+        Гибридный поиск по Telegram, PDF и новостям одним RPC вызовом
+
+        search_sources_hybrid (migration 010) выполняет поиск по PDF и News
+        (OpenAI, 1536d) и по Telegram (HuggingFace, 1024d, свой текст
+        запроса) за один запрос к PostgREST вместо двух.
+
+        Args:
+            query_text: Текст запроса для keyword поиска по PDF и News
+            query_embedding: Вектор запроса для PDF и News (1536d)
+            telegram_query_text: Текст запроса для Telegram (оригинальный)
+            telegram_embedding: Вектор запроса для Telegram (1024d)
+            limit: Количество результатов на источник
+            similarity_threshold: Порог схожести (0.0-1.0)
+            pdf_categories: Фильтр PDF по категориям (irpf, iva, etc.)
+
+        Returns:
+            {'telegram': [...], 'pdf': [...], 'news': [...]} или None, если
+            RPC недоступна (тогда вызывающий код ищет по источникам отдельно)
+        """
+        if not rpc_available('search_sources_hybrid'):
+            return None
+
+        try:
+            params = {
+                'query_text': query_text,
+                'query_embedding': self._encode_vector(query_embedding),
+                'telegram_query_text': telegram_query_text,
+                'telegram_embedding': self._encode_vector(telegram_embedding),
+                'match_limit': limit,
+                'similarity_threshold': similarity_threshold
+            }
+            result = await self._rpc_with_categories(
+                'search_sources_hybrid', params, 'pdf_categories', pdf_categories
+            )
+            data = result.data or {}
+            return {
+                'telegram': data.get('telegram') or [],
+                'pdf': data.get('pdf') or [],
+                'news': data.get('news') or []
+            }
+
+        except Exception as e:
+            logger.warning("⚠️ Ошибка при совместном hybrid search Telegram + PDF + News: %s", e)
+            mark_rpc_missing('search_sources_hybrid', e)
+            return None
+
+    async def _rpc_with_categories(
+        self,
+        name: str,
+        params: Dict[str, Any],
+        category_param: str,
+        categories: Optional[List[str]]
+    ):
+        """
+        RPC с фильтром PDF по категориям (параметр из migration 014)
+
+        Если в БД ещё сигнатура без этого параметра (PGRST202), повторяем
+        вызов без фильтра и запоминаем это для варианта с категориями, а не
+        для всей функции: иначе она отключилась бы для всех запросов
+        """
+        variant = f'{name}:{category_param}'
+        if categories and rpc_available(variant):
+            try:
+                return await asyncio.to_thread(
+                    self.client.rpc(name, {**params, category_param: categories}).execute
+                )
+            except Exception as e:
+                if not is_missing_rpc_error(e):
+                    raise
+                logger.warning("⚠️ %s без параметра %s, ищем без фильтра категорий: %s", name, category_param, e)
+                mark_rpc_missing(variant, e)
+        return await asyncio.to_thread(self.client.rpc(name, params).execute)
 
     def _vector_search_fallback(
         self,
@@ -74,13 +223,13 @@ class PDFRepository(BaseRepository):
         try:
             # Простой векторный поиск через match_documents (если есть)
             result = self.client.rpc('match_documents', {
-                'query_embedding': query_embedding,
+                'query_embedding': self._encode_vector(query_embedding),
                 'match_count': limit
             }).execute()
 
             return result.data if result.data else []
         except Exception as e:
-            print(f"⚠️ Fallback vector search также не сработал: {e}")
+            logger.warning("⚠️ Fallback vector search также не сработал: %s", e)
             return []
 
     def get_by_document_title(self, document_title: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
@@ -95,7 +244,7 @@ class PDFRepository(BaseRepository):
             Список чанков документа
         """
         query = self.client.table(self.table_name)\
-            .select('*')\
+            .select(self.ROW_COLUMNS)\
             .eq('document_title', document_title)\
             .order('chunk_number')
 
@@ -121,7 +270,7 @@ class PDFRepository(BaseRepository):
             Список документов
         """
         query = self.client.table(self.table_name)\
-            .select('*')\
+            .select(self.ROW_COLUMNS)\
             .contains('categories', [category])\
             .order('document_title')
 
@@ -147,7 +296,7 @@ class PDFRepository(BaseRepository):
             Список документов
         """
         query = self.client.table(self.table_name)\
-            .select('*')\
+            .select(self.ROW_COLUMNS)\
             .eq('region', region)\
             .order('document_title')
 
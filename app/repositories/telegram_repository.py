@@ -1,13 +1,24 @@
 """
 Репозиторий для работы с Telegram тредами
 """
+import asyncio
+import logging
 from typing import List, Dict, Any, Optional
-from app.core.base_repository import BaseRepository
+from app.core.base_repository import BaseRepository, report_search_failure
+
+logger = logging.getLogger(__name__)
 
 
 class TelegramRepository(BaseRepository):
     """Репозиторий для таблицы telegram_threads_content"""
 
+    # Все колонки, кроме content_embedding
+    ROW_COLUMNS = (
+        'id, thread_id, group_name, content, first_message, last_message, '
+        'message_count, topics, keywords, quality_score, tax_related, visa_related, '
+        'business_related, first_message_date, last_updated, metadata, created_at, updated_at'
+    )
+
     def __init__(self):
         super().__init__('telegram_threads_content')
 
@@ -39,7 +50,7 @@ class TelegramRepository(BaseRepository):
             # Вызов RPC функции search_telegram_hybrid
             params = {
                 'query_text': query_text,
-                'query_embedding': query_embedding,
+                'query_embedding': self._encode_vector(query_embedding),
                 'match_limit': limit,
                 'similarity_threshold': similarity_threshold
             }
@@ -50,13 +61,18 @@ class TelegramRepository(BaseRepository):
             if quality_score_min:
                 params['filter_quality_min'] = quality_score_min
 
-            result = self.client.rpc('search_telegram_hybrid', params).execute()
+            # supabase-py синхронный: выполняем запрос в потоке, чтобы не блокировать
+            # event loop и дать параллельным поискам по источникам идти одновременно
+            result = await asyncio.to_thread(self.client.rpc('search_telegram_hybrid', params).execute)
             return result.data if result.data else []
 
         except Exception as e:
-            print(f"⚠️ Ошибка при hybrid search в Telegram: {e}")
+            logger.warning("⚠️ Ошибка при hybrid search в Telegram: %s", e)
+            report_search_failure('telegram')
             # Fallback: векторный поиск без BM25
-            return self._vector_search_fallback(query_embedding, limit, similarity_threshold)
+            return await asyncio.to_thread(
+                self._vector_search_fallback, query_embedding, limit, similarity_threshold
+            )
 
     def _vector_search_fallback(
         self,
@@ -70,13 +86,13 @@ class TelegramRepository(BaseRepository):
         try:
             # Используем match_documents если hybrid search не работает
             result = self.client.rpc('match_documents', {
-                'query_embedding': query_embedding,
+                'query_embedding': self._encode_vector(query_embedding),
                 'match_count': limit
             }).execute()
 
             return result.data if result.data else []
         except Exception as e:
-            print(f"⚠️ Fallback vector search также не сработал: {e}")
+            logger.warning("⚠️ Fallback vector search также не сработал: %s", e)
             return []
 
     def get_by_group(self, group_name: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
@@ -91,7 +107,7 @@ class TelegramRepository(BaseRepository):
             Список тредов
         """
         query = self.client.table(self.table_name)\
-            .select('*')\
+            .select(self.ROW_COLUMNS)\
             .eq('group_name', group_name)\
             .order('first_message_date', desc=True)
 
@@ -101,6 +117,23 @@ class TelegramRepository(BaseRepository):
         result = query.execute()
         return result.data if result.data else []
 
+    def count_by_group(self, group_name: str) -> int:
+        """
+        Подсчет тредов в группе (HEAD-запрос, строки не передаются)
+
+        Args:
+            group_name: Название группы
+
+        Returns:
+            Количество тредов
+        """
+        result = self.client.table(self.table_name)\
+            .select('id', count='exact', head=True)\
+            .eq('group_name', group_name)\
+            .execute()
+
+        return result.count or 0
+
     def get_by_thread_id(self, thread_id: int) -> Optional[Dict[str, Any]]:
         """
         Получение треда по thread_id
@@ -112,7 +145,7 @@ class TelegramRepository(BaseRepository):
             Данные треда или None
         """
         result = self.client.table(self.table_name)\
-            .select('*')\
+            .select(self.ROW_COLUMNS)\
             .eq('thread_id', thread_id)\
             .execute()
 
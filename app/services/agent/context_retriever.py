@@ -4,15 +4,18 @@ ContextRetriever - адаптивный поиск контекста по ти
 Координирует поиск по всем источникам через UnifiedSearchService,
 переводит запросы для Calendar/PDF, применяет адаптивные веса.
 """
+import logging
 import time
-from typing import Optional, List
+from typing import Callable, Optional, List
 
 from app.models.agent import (
     QueryType, Context, SearchSource, ClassificationResult
 )
-from app.services.search.unified_search_service import UnifiedSearchService
+from app.services.search.unified_search_service import UnifiedSearchService, unified_search_service
 from app.services.agent.query_classifier import QueryClassifier
 
+logger = logging.getLogger(__name__)
+
 
 class ContextRetriever:
     """
@@ -30,7 +33,7 @@ class ContextRetriever:
         search_service: Optional[UnifiedSearchService] = None,
         classifier: Optional[QueryClassifier] = None
     ):
-        self.search_service = search_service or UnifiedSearchService()
+        self.search_service = search_service or unified_search_service
         self.classifier = classifier or QueryClassifier()
 
     async def retrieve(
@@ -39,7 +42,9 @@ class ContextRetriever:
         query_type: Optional[QueryType] = None,
         top_k: int = 10,
         similarity_threshold: float = 0.4,
-        sources: Optional[List[SearchSource]] = None
+        sources: Optional[List[SearchSource]] = None,
+        query_embedding: Optional[List[float]] = None,
+        on_classified: Optional[Callable[[ClassificationResult], None]] = None
     ) -> tuple[Context, ClassificationResult]:
         """
         Получение контекста для генерации ответа
@@ -50,6 +55,10 @@ class ContextRetriever:
             top_k: Количество результатов
             similarity_threshold: Минимальный порог схожести
             sources: Конкретные источники (None = все)
+            query_embedding: HuggingFace embedding оригинального запроса ("query: "),
+                если уже посчитан (например, для семантического кэша)
+            on_classified: Вызывается сразу после классификации, до поиска
+                (например, чтобы запустить инструменты параллельно с поиском)
 
         Returns:
             Tuple[Context, ClassificationResult]
@@ -69,6 +78,9 @@ class ContextRetriever:
             # Классифицируем и получаем ключевые слова на испанском
             classification, search_query = await self.classifier.classify_with_translation(query)
 
+        if on_classified:
+            on_classified(classification)
+
         # Шаг 2: Поиск по всем источникам с адаптивными весами
         # Передаем оригинальный запрос для Telegram, переведённый - для Calendar/PDF/News
         context = await self.search_service.search_all(
@@ -77,7 +89,8 @@ class ContextRetriever:
             top_k=top_k,
             similarity_threshold=similarity_threshold,
             sources=sources,
-            original_query=query  # Оригинальный запрос для Telegram
+            original_query=query,  # Оригинальный запрос для Telegram
+            telegram_query_embedding=query_embedding
         )
 
         # Шаг 3: Если нашли мало результатов, пробуем оригинальный запрос везде
@@ -88,16 +101,19 @@ class ContextRetriever:
                 top_k=top_k,
                 similarity_threshold=similarity_threshold,
                 sources=sources,
-                original_query=query
+                original_query=query,
+                telegram_query_embedding=query_embedding
             )
             # Берем лучший результат
             if fallback_context.total_results > context.total_results:
                 context = fallback_context
 
-        processing_time = (time.time() - start_time) * 1000
-        print(f"📚 Context retrieved in {processing_time:.0f}ms: "
-              f"{context.total_results} results, "
-              f"confidence={context.confidence_score:.2f}, "
-              f"type={classification.query_type}")
+        if logger.isEnabledFor(logging.INFO):
+            processing_time = (time.time() - start_time) * 1000
+            logger.info(
+                "📚 Context retrieved in %.0fms: %d results, confidence=%.2f, type=%s",
+                processing_time, context.total_results,
+                context.confidence_score, classification.query_type
+            )
 
         return context, classification
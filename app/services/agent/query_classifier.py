@@ -4,13 +4,17 @@ QueryClassifier - классификация запросов пользоват
 Определяет тип запроса для адаптивного поиска и генерации ответа.
 Использует GPT-4o-mini для быстрой и дешевой классификации.
 """
+import logging
 import time
-from typing import Optional
+from collections import OrderedDict
+from typing import Optional, Tuple
 
 from app.models.agent import QueryType, ClassificationResult
 from app.services.llm.llm_service import LLMService
 from app.prompts import CLASSIFICATION_SYSTEM_PROMPT
 
+logger = logging.getLogger(__name__)
+
 
 class QueryClassifier:
     """
@@ -20,6 +24,9 @@ class QueryClassifier:
     Поддерживает мультиязычные запросы (ES, RU, UK, EN).
     """
 
+    # Максимум запросов в LRU кэше классификации + перевода
+    TRANSLATION_CACHE_SIZE = 10000
+
     def __init__(self, llm_service: Optional[LLMService] = None):
         """
         Args:
@@ -37,6 +44,10 @@ class QueryClassifier:
             )
             self.llm_service.initialize()
 
+        # Кэш classify_with_translation: нормализованный запрос -> (raw_type, keywords_es).
+        # Повторные вопросы не платят за LLM round-trip (~0.5s)
+        self._translation_cache: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+
     async def classify(self, query: str) -> ClassificationResult:
         """
         Классификация запроса пользователя
@@ -74,7 +85,7 @@ class QueryClassifier:
 
         except Exception as e:
             classification_time = (time.time() - start_time) * 1000
-            print(f"⚠️ Classification error: {e}, falling back to GENERAL_INFO")
+            logger.warning("⚠️ Classification error: %s, falling back to GENERAL_INFO", e)
 
             return ClassificationResult(
                 query_type=QueryType.GENERAL_INFO,
@@ -120,6 +131,19 @@ class QueryClassifier:
         """
         start_time = time.time()
 
+        cache_key = " ".join(query.lower().split())
+        cached = self._translation_cache.get(cache_key)
+        if cached is not None:
+            self._translation_cache.move_to_end(cache_key)
+            raw_type, keywords_es = cached
+            classification = ClassificationResult(
+                query_type=self._parse_query_type(raw_type),
+                confidence=0.85,
+                reasoning=f"Type: {raw_type}, Keywords: {keywords_es} (cached)",
+                classification_time_ms=(time.time() - start_time) * 1000
+            )
+            return classification, keywords_es
+
         combined_prompt = f"""Analiza esta consulta fiscal y responde en formato:
 TIPO: [una de: tax_calendar, tax_calculation, legal_interpretation, practical_advice, news_update, general_info]
 KEYWORDS_ES: [palabras clave fiscales en español, separadas por comas]
@@ -136,17 +160,28 @@ Consulta: {query}"""
             lines = response.strip().split('\n')
             raw_type = "general_info"
             keywords_es = query  # Fallback - оригинальный запрос
+            parsed = False
 
             for line in lines:
                 line = line.strip()
                 if line.upper().startswith("TIPO:"):
                     raw_type = line.split(":", 1)[1].strip().lower()
+                    parsed = True
                 elif line.upper().startswith("KEYWORDS_ES:"):
                     keywords_es = line.split(":", 1)[1].strip()
+                    parsed = True
 
             query_type = self._parse_query_type(raw_type)
             classification_time = (time.time() - start_time) * 1000
 
+            # generate_async не бросает исключений, а возвращает "Error: ...":
+            # fallback (general_info + исходный запрос) в кэш не кладём, иначе
+            # после сбоя LLM запрос так и останется неверно классифицированным
+            if parsed and not response.startswith("Error:"):
+                self._translation_cache[cache_key] = (raw_type, keywords_es)
+                if len(self._translation_cache) > self.TRANSLATION_CACHE_SIZE:
+                    self._translation_cache.popitem(last=False)
+
             classification = ClassificationResult(
                 query_type=query_type,
                 confidence=0.85,
@@ -158,7 +193,7 @@ Consulta: {query}"""
 
         except Exception as e:
             classification_time = (time.time() - start_time) * 1000
-            print(f"⚠️ classify_with_translation error: {e}")
+            logger.warning("⚠️ classify_with_translation error: %s", e)
 
             classification = ClassificationResult(
                 query_type=QueryType.GENERAL_INFO,
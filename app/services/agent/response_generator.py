@@ -5,9 +5,9 @@ ResponseGenerator - генерация ответов на основе конт
 интегрирует контекст из поиска и историю диалога.
 """
 import time
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Awaitable
 
-from app.models.agent import QueryType, Context, AgentResponse, ToolResult
+from app.models.agent import QueryType, Context, AgentResponse, ToolResult, SearchResult
 from app.services.llm.llm_service import LLMService
 from app.prompts import (
     BASE_SYSTEM_PROMPT,
@@ -30,6 +30,22 @@ QUERY_TYPE_PROMPTS: Dict[QueryType, str] = {
     QueryType.GENERAL_INFO: GENERAL_INFO_PROMPT
 }
 
+# Полные системные промпты собираются один раз при импорте. Строка для
+# каждого типа побайтово одинакова между запросами и идёт первой в
+# сообщениях, поэтому провайдер (OpenAI/Anthropic) может кэшировать префикс
+SYSTEM_PROMPTS: Dict[QueryType, str] = {
+    query_type: f"{BASE_SYSTEM_PROMPT}\n\n{type_prompt}"
+    for query_type, type_prompt in QUERY_TYPE_PROMPTS.items()
+}
+
+# Поля метаданных, которые попадают в prompt, и их подписи (в порядке вывода)
+CONTEXT_METADATA_LABELS = (
+    ('group_name', 'Grupo'),
+    ('document_title', 'Documento'),
+    ('deadline_date', 'Fecha'),
+    ('article_title', 'Artículo'),
+)
+
 
 class ResponseGenerator:
     """
@@ -43,6 +59,15 @@ class ResponseGenerator:
     - Мультиязычная поддержка
     """
 
+    # Бюджет контекста в prompt: стоимость и латентность LLM линейны по токенам
+    MAX_CONTEXT_RESULTS = 8
+    # Столько же отдают batch RPC поиска (migration 011): при изменении - обновить SQL
+    MAX_CHARS_PER_RESULT = 500
+    # Результаты с релевантностью ниже этой доли от лучшего не попадают в prompt
+    MIN_RELATIVE_RELEVANCE = 0.5
+    # Как часто отдавать накопленный текст при стриминге (лимиты Telegram на edit)
+    PARTIAL_INTERVAL = 1.5
+
     def __init__(self, llm_service: Optional[LLMService] = None):
         if llm_service:
             self.llm_service = llm_service
@@ -57,7 +82,8 @@ class ResponseGenerator:
         query_type: QueryType,
         tools_results: Optional[List[ToolResult]] = None,
         session_history: Optional[List[Dict[str, str]]] = None,
-        max_tokens: int = 1500
+        max_tokens: int = 1500,
+        partial_callback: Optional[Callable[[str], Awaitable[None]]] = None
     ) -> AgentResponse:
         """
         Генерация ответа агента
@@ -69,6 +95,8 @@ class ResponseGenerator:
             tools_results: Результаты инструментов
             session_history: История диалога
             max_tokens: Максимальное количество токенов
+            partial_callback: Если указан, ответ стримится, и callback получает
+                накопленный текст не чаще раза в PARTIAL_INTERVAL секунд
 
         Returns:
             AgentResponse с текстом, источниками, confidence
@@ -87,11 +115,27 @@ class ResponseGenerator:
         )
 
         # Генерируем ответ через LLM
-        response_text = await self.llm_service.generate_async(
-            prompt=user_prompt,
-            system_prompt=system_prompt,
-            max_tokens=max_tokens
-        )
+        if partial_callback:
+            # Стриминг: пользователь видит начало ответа, не дожидаясь конца
+            chunks: List[str] = []
+            last_partial = time.monotonic()
+            async for chunk in self.llm_service.generate_stream(
+                prompt=user_prompt,
+                system_prompt=system_prompt,
+                max_tokens=max_tokens
+            ):
+                chunks.append(chunk)
+                now = time.monotonic()
+                if now - last_partial >= self.PARTIAL_INTERVAL:
+                    last_partial = now
+                    await partial_callback("".join(chunks))
+            response_text = "".join(chunks)
+        else:
+            response_text = await self.llm_service.generate_async(
+                prompt=user_prompt,
+                system_prompt=system_prompt,
+                max_tokens=max_tokens
+            )
 
         processing_time = (time.time() - start_time) * 1000
 
@@ -110,9 +154,8 @@ class ResponseGenerator:
         )
 
     def _build_system_prompt(self, query_type: QueryType) -> str:
-        """Собрать системный промпт из базового + специфичного для типа"""
-        type_prompt = QUERY_TYPE_PROMPTS.get(query_type, QUERY_TYPE_PROMPTS[QueryType.GENERAL_INFO])
-        return f"{BASE_SYSTEM_PROMPT}\n\n{type_prompt}"
+        """Системный промпт: базовый + специфичный для типа (заранее собранный)"""
+        return SYSTEM_PROMPTS.get(query_type, SYSTEM_PROMPTS[QueryType.GENERAL_INFO])
 
     def _build_user_prompt(
         self,
@@ -125,22 +168,20 @@ class ResponseGenerator:
         parts = []
 
         # Контекст из поиска
-        if context.results:
+        context_results = self._select_context_results(context)
+        if context_results:
             parts.append("## Contexto de la base de conocimientos:\n")
-            for i, result in enumerate(context.results[:8], 1):  # Макс 8 результатов
+            for i, result in enumerate(context_results, 1):
                 source_label = self._get_source_label(result.source)
-                content_preview = result.content[:500]  # Ограничиваем длину
+                content_preview = result.content[:self.MAX_CHARS_PER_RESULT]  # Ограничиваем длину
+                get = result.metadata.get
 
                 parts.append(f"### Fuente {i} ({source_label}):")
-                # Добавляем метаданные
-                if result.metadata.get('group_name'):
-                    parts.append(f"Grupo: {result.metadata['group_name']}")
-                if result.metadata.get('document_title'):
-                    parts.append(f"Documento: {result.metadata['document_title']}")
-                if result.metadata.get('deadline_date'):
-                    parts.append(f"Fecha: {result.metadata['deadline_date']}")
-                if result.metadata.get('article_title'):
-                    parts.append(f"Artículo: {result.metadata['article_title']}")
+                # Добавляем метаданные: одно обращение к словарю на поле
+                for key, label in CONTEXT_METADATA_LABELS:
+                    value = get(key)
+                    if value:
+                        parts.append(f"{label}: {value}")
 
                 parts.append(f"{content_preview}\n")
 
@@ -166,6 +207,23 @@ class ResponseGenerator:
 
         return "\n".join(parts)
 
+    def _select_context_results(self, context: Context) -> List[SearchResult]:
+        """
+        Отбор результатов для prompt: топ по relevance_score с отсечкой слабых
+
+        Результаты уже отсортированы UnifiedSearchService по убыванию релевантности
+        """
+        results = context.results[:self.MAX_CONTEXT_RESULTS]
+        if not results:
+            return results
+
+        top_score = results[0].relevance_score
+        if not top_score:
+            return results
+
+        min_score = top_score * self.MIN_RELATIVE_RELEVANCE
+        return [r for r in results if (r.relevance_score or 0) >= min_score]
+
     def _get_source_label(self, source: str) -> str:
         """Метка источника для отображения"""
         labels = {
@@ -0,0 +1,113 @@
+"""
+SemanticCache - кэш ответов агента по смысловой близости запросов
+
+Ключ - нормализованный embedding запроса, поиск - косинусная схожесть
+(скалярное произведение нормализованных векторов) по всем записям.
+Почти одинаковые вопросы ("¿cuándo se presenta el modelo 303?" и
+"cuando presentar modelo 303") получают готовый ответ без поиска и LLM.
+"""
+import time
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    In-memory семантический кэш с TTL
+
+    Записи хранятся в кольцевом буфере фиксированного размера: put() за O(1)
+    перезаписывает самую старую запись, lookup() - одно умножение матрицы
+    на вектор (BLAS, без GIL) по заполненной части буфера в заранее
+    выделенные массивы. Для нескольких тысяч записей этого достаточно без FAISS.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        ttl_seconds: float = 3600.0,
+        max_entries: int = 1000
+    ):
+        """
+        Args:
+            threshold: Минимальная косинусная схожесть для попадания в кэш
+            ttl_seconds: Время жизни записи (ответы про сроки устаревают)
+            max_entries: Размер кольцевого буфера
+        """
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._vectors: Optional[np.ndarray] = None  # (max_entries, dim), создаётся при первом put
+        self._expires_at = np.zeros(max_entries, dtype=np.float64)  # 0 = пустой слот
+        self._values: List[Any] = [None] * max_entries
+        self._next_slot = 0
+        self._size = 0  # Заполненные слоты [0, _size): пустой хвост буфера не сканируем
+
+        # Буферы lookup(), чтобы не аллоцировать массивы на каждый запрос
+        self._scores = np.empty(max_entries, dtype=np.float32)
+        self._expired = np.empty(max_entries, dtype=bool)
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> Optional[np.ndarray]:
+        """L2-нормализация, чтобы скалярное произведение равнялось косинусу"""
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        if not norm:
+            return None
+        return v / norm
+
+    def lookup(self, vector: Sequence[float]) -> Optional[Any]:
+        """
+        Поиск ближайшего непросроченного запроса
+
+        Returns:
+            Сохранённое значение или None, если схожесть ниже порога
+        """
+        if self._vectors is None:
+            return None
+
+        v = self._normalize(vector)
+        if v is None or v.shape[0] != self._vectors.shape[1]:
+            return None
+
+        n = self._size
+        if not n:
+            return None
+
+        # Матрично-векторное произведение (BLAS) только по заполненным слотам
+        scores = self._scores[:n]
+        np.dot(self._vectors[:n], v, out=scores)
+        expired = self._expired[:n]
+        np.less_equal(self._expires_at[:n], time.time(), out=expired)
+        scores[expired] = -np.inf
+
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        return self._values[best]
+
+    def put(self, vector: Sequence[float], value: Any) -> None:
+        """Сохранение значения, вытесняет самую старую запись"""
+        v = self._normalize(vector)
+        if v is None:
+            return
+
+        if self._vectors is None:
+            self._vectors = np.zeros((self.max_entries, v.shape[0]), dtype=np.float32)
+        elif v.shape[0] != self._vectors.shape[1]:
+            return
+
+        slot = self._next_slot
+        self._vectors[slot] = v
+        self._values[slot] = value
+        self._expires_at[slot] = time.time() + self.ttl_seconds
+        self._next_slot = (slot + 1) % self.max_entries
+        self._size = max(self._size, slot + 1)
+
+    def clear(self) -> None:
+        """Очистка кэша"""
+        self._expires_at[:] = 0
+        self._values = [None] * self.max_entries
+        self._next_slot = 0
+        self._size = 0
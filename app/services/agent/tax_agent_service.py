@@ -7,24 +7,35 @@ TaxAgentService - главный оркестратор AI налогового
 3. Генерация ответа (специализированные промпты)
 4. Управление сессиями
 """
+import asyncio
+import re
 import time
 import logging
-from typing import Optional, List, Dict, Callable, Awaitable
+from collections import OrderedDict
+from itertools import islice
+from typing import Optional, List, Dict, Set, Tuple, Callable, Awaitable
 
 from app.models.agent import (
     QueryType, AgentRequest, AgentResponse, Context,
-    ToolResult, SearchSource
+    ToolResult, SearchSource, ClassificationResult
 )
 from app.services.agent.query_classifier import QueryClassifier
 from app.services.agent.context_retriever import ContextRetriever
 from app.services.agent.response_generator import ResponseGenerator
 from app.services.agent.tool_executor import ToolExecutor
-from app.services.search.unified_search_service import UnifiedSearchService
+from app.services.agent.semantic_cache import SemanticCache
+from app.services.search.unified_search_service import unified_search_service
 from app.services.llm.llm_service import LLMService
-from app.services.supabase_service import SupabaseService
+from app.services.supabase_service import supabase_service
 
 logger = logging.getLogger(__name__)
 
+# Кириллица в запросе -> сообщения на русском
+CYRILLIC_RE = re.compile('[\u0400-\u04FF]')
+# Суммы, номера моделей, годы: семантически близкие запросы с разными
+# числами ("modelo 303" / "modelo 130") не должны делить ответ
+QUERY_NUMBERS_RE = re.compile(r'\d+(?:[.,]\d+)*')
+
 
 class TaxAgentService:
     """
@@ -38,13 +49,25 @@ class TaxAgentService:
     5. Session manager saves interaction to history
     """
 
+    # Точный кэш ответов: время жизни и размер
+    EXACT_CACHE_TTL = 600.0
+    EXACT_CACHE_MAX_SIZE = 10_000
+
+    # Ответы по расчётам и срокам зависят от чисел и текущей даты в запросе,
+    # а не только от его смысла: такие ответы не кэшируются
+    UNCACHEABLE_QUERY_TYPES = frozenset({QueryType.TAX_CALCULATION, QueryType.TAX_CALENDAR})
+
+    # Сколько источников ответа сохраняется в messages.sources
+    HISTORY_SOURCES_LIMIT = 5
+
     def __init__(self):
         # LLM Service (gpt-4.1 for responses)
         self.llm_service = LLMService()
         self.llm_service.initialize()
 
-        # Search Service
-        self.search_service = UnifiedSearchService()
+        # Search Service: модульный экземпляр уже создан при импорте
+        # (LLMService + модель HuggingFace), второй не загружаем
+        self.search_service = unified_search_service
 
         # Agent Components
         self.classifier = QueryClassifier()  # gpt-4.1-mini for classification
@@ -55,8 +78,22 @@ class TaxAgentService:
         self.generator = ResponseGenerator(llm_service=self.llm_service)
         self.tool_executor = ToolExecutor()  # Tools: calculator, calendar, documents
 
-        # Database service for sessions/users
-        self.db = SupabaseService()
+        # Семантический кэш ответов: почти одинаковые вопросы без истории
+        # диалога не проходят заново классификацию, поиск и генерацию.
+        # Схожесть multilingual-e5 сжата примерно в 0.7-1.0, поэтому порог высокий
+        self.response_cache = SemanticCache(threshold=0.95, ttl_seconds=3600)
+        # Семантический кэш поиска (контекст + классификация) для запросов с
+        # историей диалога, где готовый ответ переиспользовать нельзя
+        self.context_cache = SemanticCache(threshold=0.95, ttl_seconds=600)
+        # Точный кэш по нормализованному тексту запроса: проверяется до embedding
+        self._exact_cache: "OrderedDict[str, Tuple[float, AgentResponse]]" = OrderedDict()
+
+        # Database service for sessions/users: общий модульный экземпляр,
+        # клиент (и его пул HTTP соединений к PostgREST) один на процесс
+        self.db = supabase_service
+
+        # Фоновые записи истории (сильные ссылки, чтобы задачи не собрал GC)
+        self._background_tasks: Set[asyncio.Task] = set()
 
         self._initialized = False
         logger.info("TaxAgentService created")
@@ -65,11 +102,12 @@ class TaxAgentService:
         """Инициализация всех сервисов"""
         try:
             self.db.connect()
+            await self._warm_up()
             self._initialized = True
             logger.info("✅ TaxAgentService initialized")
             return True
         except Exception as e:
-            logger.error(f"❌ TaxAgentService initialization error: {e}")
+            logger.error("❌ TaxAgentService initialization error: %s", e)
             # Работаем и без БД - просто без сессий
             self._initialized = True
             return True
@@ -81,7 +119,8 @@ class TaxAgentService:
         session_id: Optional[str] = None,
         include_tools: bool = True,
         max_context_items: int = 10,
-        progress_callback: Optional[Callable[[str], Awaitable[None]]] = None
+        progress_callback: Optional[Callable[[str], Awaitable[None]]] = None,
+        partial_callback: Optional[Callable[[str], Awaitable[None]]] = None
     ) -> AgentResponse:
         """
         Основной метод обработки запроса пользователя
@@ -92,52 +131,125 @@ class TaxAgentService:
             session_id: ID сессии (если есть)
             include_tools: Использовать инструменты
             max_context_items: Макс. количество контекстных элементов
+            partial_callback: Получает частичный текст ответа во время стриминга
 
         Returns:
             AgentResponse с текстом ответа, источниками и метаданными
         """
         total_start = time.time()
 
-        logger.info(f"Processing query from user {user_id}: {query[:100]}...")
+        logger.info("Processing query from user %s: %.100s...", user_id, query)
+
+        # Ответ зависит только от запроса, если нет истории сессии
+        cache_vector = None
+        exact_key = None
+        query_numbers = self._query_numbers(query)
+        if session_id is None and include_tools:
+            # Сначала дешёвый уровень: побайтово тот же запрос (кнопки, повторы),
+            # без вычисления embedding
+            exact_key = " ".join(query.lower().split())
+            cached = self._get_exact_cached(exact_key)
+            cache_tier = "exact"
+            if cached is None:
+                cache_vector = await self._get_cache_vector(query)
+                entry = self.response_cache.lookup(cache_vector) if cache_vector else None
+                # Совпадение по смыслу засчитывается только с теми же числами
+                if entry is not None and entry[0] == query_numbers:
+                    cached = entry[1]
+                cache_tier = "semantic"
+            if cached is not None:
+                total_time = (time.time() - total_start) * 1000
+                response = cached.model_copy(update={
+                    "processing_time_ms": total_time,
+                    "metadata": {**cached.metadata, "cache_hit": cache_tier}
+                })
+                self._schedule_save_interaction(
+                    user_id=user_id,
+                    session_id=session_id,
+                    query=query,
+                    response=response
+                )
+
+                logger.info("✅ Response served from %s cache in %.0fms", cache_tier, total_time)
+                return response
+
+        # С историей ответ не кэшируется, но поиск от неё не зависит: для
+        # почти того же вопроса берём уже найденный контекст и классификацию
+        cached_context = None
+        if session_id is not None:
+            cache_vector = await self._get_cache_vector(query)
+            entry = self.context_cache.lookup(cache_vector) if cache_vector else None
+            # Как и для ответов: "modelo 303" и "modelo 130" ищут разное
+            if entry is not None and entry[0] == query_numbers:
+                cached_context = entry[1:]
+
+        # История диалога не зависит от поиска: загружаем её параллельно
+        history_task = None
+        if session_id:
+            history_task = asyncio.create_task(self._get_session_history(
+                user_id=user_id,
+                session_id=session_id
+            ))
+
+        # Инструментам нужен только тип запроса: запускаем их сразу после
+        # классификации, параллельно с поиском контекста
+        tools_task = None
+
+        def start_tools(classification: ClassificationResult):
+            nonlocal tools_task
+            if include_tools:
+                tools_task = asyncio.create_task(self.tool_executor.execute_tools(
+                    query=query,
+                    query_type=classification.query_type
+                ))
 
         try:
             # Шаг 1: Классификация + поиск контекста
             if progress_callback:
                 await progress_callback("search")
-            context, classification = await self.retriever.retrieve(
-                query=query,
-                top_k=max_context_items,
-                similarity_threshold=0.4
-            )
+            if cached_context is not None:
+                context, classification = cached_context
+                start_tools(classification)
+            else:
+                context, classification = await self.retriever.retrieve(
+                    query=query,
+                    # В prompt попадает не больше MAX_CONTEXT_RESULTS, лишние строки
+                    # только расширяют выборку кандидатов в каждом RPC (match_limit * 2)
+                    top_k=min(max_context_items, self.generator.MAX_CONTEXT_RESULTS),
+                    similarity_threshold=0.4,
+                    query_embedding=cache_vector,  # Тот же "query: " embedding, что и для Telegram
+                    on_classified=start_tools
+                )
+                # Контекст расчётов и сроков не переиспользуем, как и ответы
+                if (
+                    cache_vector
+                    and context.results
+                    and classification.query_type not in self.UNCACHEABLE_QUERY_TYPES
+                ):
+                    self.context_cache.put(cache_vector, (query_numbers, context, classification))
 
             logger.info(
-                f"Classification: {classification.query_type} "
-                f"(confidence={classification.confidence:.2f}, "
-                f"time={classification.classification_time_ms:.0f}ms)"
+                "Classification: %s (confidence=%.2f, time=%.0fms)",
+                classification.query_type,
+                classification.confidence,
+                classification.classification_time_ms
             )
 
-            # Шаг 2: Выполнение инструментов
+            # Шаг 2: Результаты инструментов (запущены после классификации)
             tools_results = []
-            if include_tools:
+            if tools_task:
                 if progress_callback:
                     await progress_callback("tools")
-                tools_results = await self.tool_executor.execute_tools(
-                    query=query,
-                    query_type=classification.query_type
-                )
+                tools_results = await tools_task
                 if tools_results:
                     logger.info(
-                        f"Tools executed: {len(tools_results)} results, "
-                        f"{sum(1 for t in tools_results if t.success)} successful"
+                        "Tools executed: %d results, %d successful",
+                        len(tools_results),
+                        sum(1 for t in tools_results if t.success)
                     )
 
             # Шаг 3: Получение истории диалога (если есть сессия)
-            session_history = None
-            if session_id:
-                session_history = await self._get_session_history(
-                    user_id=user_id,
-                    session_id=session_id
-                )
+            session_history = await history_task if history_task else None
 
             # Шаг 4: Генерация ответа
             if progress_callback:
@@ -147,35 +259,49 @@ class TaxAgentService:
                 context=context,
                 query_type=classification.query_type,
                 tools_results=tools_results if tools_results else None,
-                session_history=session_history
+                session_history=session_history,
+                partial_callback=partial_callback
             )
 
             # Шаг 5: Сохранение в историю (async, не блокирует)
             total_time = (time.time() - total_start) * 1000
             response.processing_time_ms = total_time
 
-            try:
-                await self._save_interaction(
-                    user_id=user_id,
-                    session_id=session_id,
-                    query=query,
-                    response=response
-                )
-            except Exception as e:
-                logger.warning(f"Failed to save interaction: {e}")
+            # Ответ с результатами инструментов (расчёт по суммам запроса,
+            # ближайшие сроки) нельзя отдавать на другой, пусть и похожий, запрос
+            cacheable = (
+                exact_key is not None
+                and not response.text.startswith("Error:")
+                and not tools_results
+                and classification.query_type not in self.UNCACHEABLE_QUERY_TYPES
+            )
+            if cacheable:
+                self._put_exact_cached(exact_key, response)
+                if cache_vector:
+                    self.response_cache.put(cache_vector, (query_numbers, response))
+
+            self._schedule_save_interaction(
+                user_id=user_id,
+                session_id=session_id,
+                query=query,
+                response=response
+            )
 
             logger.info(
-                f"✅ Response generated in {total_time:.0f}ms "
-                f"(type={classification.query_type}, "
-                f"confidence={response.confidence:.2f}, "
-                f"sources={len(context.results)})"
+                "✅ Response generated in %.0fms (type=%s, confidence=%.2f, sources=%d)",
+                total_time,
+                classification.query_type,
+                response.confidence,
+                len(context.results)
             )
 
             return response
 
         except Exception as e:
+            if tools_task and not tools_task.done():
+                tools_task.cancel()
             total_time = (time.time() - total_start) * 1000
-            logger.error(f"❌ Error processing query: {e}")
+            logger.error("❌ Error processing query: %s", e)
 
             return AgentResponse(
                 text=self._get_error_message(query),
@@ -192,6 +318,66 @@ class TaxAgentService:
                 metadata={"error": str(e)}
             )
 
+    @staticmethod
+    def _query_numbers(query: str) -> Tuple[str, ...]:
+        """Числа из запроса (суммы, номера моделей) для проверки семантического кэша"""
+        return tuple(QUERY_NUMBERS_RE.findall(query))
+
+    def _get_exact_cached(self, key: str) -> Optional[AgentResponse]:
+        """Ответ из точного кэша, если он ещё не устарел"""
+        entry = self._exact_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at <= time.monotonic():
+            del self._exact_cache[key]
+            return None
+        self._exact_cache.move_to_end(key)
+        return response
+
+    def _put_exact_cached(self, key: str, response: AgentResponse):
+        """Положить ответ в точный кэш (LRU с TTL)"""
+        self._exact_cache[key] = (time.monotonic() + self.EXACT_CACHE_TTL, response)
+        self._exact_cache.move_to_end(key)
+        if len(self._exact_cache) > self.EXACT_CACHE_MAX_SIZE:
+            self._exact_cache.popitem(last=False)
+
+    async def _warm_up(self):
+        """
+        Прогрев моделей и клиентов холостыми вызовами при старте
+
+        Первый вызов SentenceTransformer платит за ленивую инициализацию torch,
+        первые запросы к OpenAI и Supabase - за TLS handshake и пул соединений.
+        Без прогрева всё это ложится на первый запрос пользователя.
+        """
+        warm_ups = [
+            self.llm_service.generate_async("hi", max_tokens=1),
+            self.classifier.llm_service.generate_async("hi", max_tokens=1),
+            asyncio.to_thread(self.search_service.llm_service.generate_embedding, "warm up"),
+        ]
+        hf_embeddings = self.search_service.hf_embeddings
+        if hf_embeddings:
+            warm_ups.append(asyncio.to_thread(hf_embeddings.generate, "warm up", "query: "))
+        if self.db.client:
+            warm_ups.append(asyncio.to_thread(
+                self.db.client.table('users').select('id').limit(1).execute
+            ))
+
+        for result in await asyncio.gather(*warm_ups, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.warning("Warm-up call failed: %s", result)
+
+    async def _get_cache_vector(self, query: str) -> Optional[List[float]]:
+        """Embedding запроса для семантического кэша (локальная модель, без API)"""
+        hf_embeddings = self.search_service.hf_embeddings
+        if not hf_embeddings:
+            return None
+        try:
+            return await asyncio.to_thread(hf_embeddings.generate, query, "query: ")
+        except Exception as e:
+            logger.warning("Failed to embed query for semantic cache: %s", e)
+            return None
+
     async def _get_session_history(
         self,
         user_id: str,
@@ -199,7 +385,10 @@ class TaxAgentService:
     ) -> Optional[List[Dict[str, str]]]:
         """Получить историю сессии из БД"""
         try:
-            messages = self.db.get_user_messages(user_id, limit=6)
+            # Для prompt нужны только тексты: без sources JSON и join на dialogue_sessions
+            messages = await asyncio.to_thread(
+                self.db.get_user_messages, user_id, limit=6, columns='query_text, response_text'
+            )
             if not messages:
                 return None
 
@@ -213,9 +402,15 @@ class TaxAgentService:
             return history if history else None
 
         except Exception as e:
-            logger.warning(f"Failed to get session history: {e}")
+            logger.warning("Failed to get session history: %s", e)
             return None
 
+    def _schedule_save_interaction(self, **kwargs):
+        """Запустить сохранение в историю в фоне: ответ отдаётся, не дожидаясь записи в БД"""
+        task = asyncio.create_task(self._save_interaction(**kwargs))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
     async def _save_interaction(
         self,
         user_id: str,
@@ -225,15 +420,17 @@ class TaxAgentService:
     ):
         """Сохранить запрос и ответ в историю"""
         try:
+            # Один проход по топу результатов без промежуточного среза списка
             sources = [
                 {
                     "source": r.source,
                     "similarity": r.similarity_score
                 }
-                for r in response.context.results[:5]
+                for r in islice(response.context.results, self.HISTORY_SOURCES_LIMIT)
             ]
 
-            self.db.save_message(
+            await asyncio.to_thread(
+                self.db.save_message,
                 user_id=user_id,
                 session_id=session_id or "default",
                 query_text=query,
@@ -242,11 +439,11 @@ class TaxAgentService:
                 is_relevant=response.confidence > 0.5
             )
         except Exception as e:
-            logger.warning(f"Failed to save message: {e}")
+            logger.warning("Failed to save message: %s", e)
 
     def _get_error_message(self, query: str) -> str:
         """Сообщение об ошибке на языке пользователя"""
-        if any('\u0400' <= c <= '\u04FF' for c in query):
+        if CYRILLIC_RE.search(query):
             return (
                 "Извините, произошла ошибка при обработке вашего запроса. "
                 "Пожалуйста, попробуйте переформулировать вопрос или "
@@ -1,11 +1,24 @@
 """
 BaseTool - интерфейс для инструментов агента
 """
+import re
 from abc import ABC, abstractmethod
 from typing import Any, Dict, Optional
 from app.models.agent import ToolType, ToolResult
 
 
+def keyword_pattern(*keywords: str) -> "re.Pattern[str]":
+    """
+    Одно регулярное выражение-альтернатива для набора подстрок
+
+    pattern.search(q) эквивалентно any(kw in q for kw in keywords), но
+    строка сканируется один раз движком regex, а не по разу на ключ
+    """
+    # Длинные ключи первыми, чтобы альтернатива не останавливалась на префиксе
+    ordered = sorted(set(keywords), key=len, reverse=True)
+    return re.compile("|".join(map(re.escape, ordered)))
+
+
 class BaseTool(ABC):
     """Базовый класс для всех инструментов агента"""
 
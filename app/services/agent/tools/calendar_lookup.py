@@ -8,7 +8,7 @@ import time
 from datetime import date, timedelta
 from typing import Optional, List, Dict, Any
 from app.models.agent import ToolType, ToolResult, QueryType
-from app.services.agent.tools.base_tool import BaseTool
+from app.services.agent.tools.base_tool import BaseTool, keyword_pattern
 from app.repositories.calendar_repository import CalendarRepository
 
 
@@ -37,6 +37,14 @@ QUARTER_MONTHS = {
     'первого': (1, 3), 'второго': (4, 6), 'третьего': (7, 9), 'четвёртого': (10, 12),
 }
 
+# Ключевые слова запросов о сроках (одна regex-альтернатива, собирается при импорте)
+CALENDAR_KEYWORDS_RE = keyword_pattern(
+    'plazo', 'fecha', 'vencimiento', 'presentar', 'declaración',
+    'trimestre', 'cuándo', 'cuando', 'deadline', 'calendario',
+    'срок', 'дедлайн', 'подавать', 'подать', 'когда', 'квартал',
+    'modelo 3', 'modelo 1', 'modelo 2',
+)
+
 
 class CalendarLookup(BaseTool):
     """Инструмент для поиска налоговых дедлайнов"""
@@ -50,14 +58,7 @@ class CalendarLookup(BaseTool):
         if query_type == QueryType.TAX_CALENDAR:
             return True
 
-        q = query.lower()
-        calendar_keywords = [
-            'plazo', 'fecha', 'vencimiento', 'presentar', 'declaración',
-            'trimestre', 'cuándo', 'cuando', 'deadline', 'calendario',
-            'срок', 'дедлайн', 'подавать', 'подать', 'когда', 'квартал',
-            'modelo 3', 'modelo 1', 'modelo 2',
-        ]
-        return any(kw in q for kw in calendar_keywords)
+        return CALENDAR_KEYWORDS_RE.search(query.lower()) is not None
 
     async def execute(self, **kwargs) -> ToolResult:
         """Поиск дедлайнов"""
@@ -128,9 +129,12 @@ class CalendarLookup(BaseTool):
         if not deadlines:
             return f"No he encontrado plazos para {tax_model} en el calendario."
 
-        today = date.today()
-        upcoming = [d for d in deadlines if d.get('deadline_date', '') >= today.isoformat()]
-        past = [d for d in deadlines if d.get('deadline_date', '') < today.isoformat()]
+        # Один проход: делим дедлайны на будущие и прошедшие (ISO даты
+        # сравниваются как строки, сегодняшнюю считаем один раз)
+        today_iso = date.today().isoformat()
+        upcoming, past = [], []
+        for d in deadlines:
+            (upcoming if d.get('deadline_date', '') >= today_iso else past).append(d)
 
         lines = [f"**Plazos para {tax_model}:**", ""]
 
@@ -184,6 +188,8 @@ class CalendarLookup(BaseTool):
 
         lines = [f"**Plazos del {quarter} {year}:**", ""]
 
+        today_iso = today.isoformat()
+        soon_iso = (today + timedelta(days=7)).isoformat()
         for d in q_deadlines:
             deadline_date = d.get('deadline_date', 'N/A')
             model = d.get('tax_model', '')
@@ -192,9 +198,9 @@ class CalendarLookup(BaseTool):
             applies = ', '.join(d.get('applies_to', []))
 
             status = ""
-            if deadline_date < today.isoformat():
+            if deadline_date < today_iso:
                 status = " ~~(pasado)~~"
-            elif deadline_date <= (today + timedelta(days=7)).isoformat():
+            elif deadline_date <= soon_iso:
                 status = " ⚠️ **¡Próximo!**"
 
             lines.append(
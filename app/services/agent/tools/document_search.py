@@ -4,13 +4,35 @@ DocumentSearch - инструмент для целевого поиска в д
 Используется когда нужен более глубокий поиск по конкретной теме
 в PDF документах, законодательной базе, или новостях
 """
+import asyncio
 import time
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from app.models.agent import ToolType, ToolResult, QueryType
-from app.services.agent.tools.base_tool import BaseTool
+from app.services.agent.tools.base_tool import BaseTool, keyword_pattern
+from app.core.base_repository import encode_vector
 from app.repositories.pdf_repository import PDFRepository
 from app.repositories.news_repository import NewsRepository
 from app.services.embeddings.huggingface_embeddings import HuggingFaceEmbeddings
+from app.config.settings import settings
+from app.services.llm._clients import get_openai_embeddings
+
+
+# Наборы для проверок, собираются один раз при импорте, а не на каждый запрос
+DOC_QUERY_TYPES = frozenset({QueryType.LEGAL_INTERPRETATION, QueryType.NEWS_UPDATE})
+DOC_KEYWORDS_RE = keyword_pattern(
+    'ley', 'artículo', 'articulo', 'normativa', 'reglamento',
+    'boe', 'dogv', 'real decreto', 'orden ministerial',
+    'закон', 'статья', 'норматив', 'документ',
+    'sentencia', 'jurisprudencia', 'tribunal',
+    'noticia', 'actualidad', 'cambio', 'novedad', 'nuevo',
+    'новост', 'изменение', 'обновление',
+)
+NEWS_ONLY_KEYWORDS_RE = keyword_pattern('noticia', 'новост', 'actualidad', 'cambio reciente')
+PDF_ONLY_KEYWORDS_RE = keyword_pattern('ley', 'artículo', 'boe', 'закон', 'статья')
+PDF_SEARCH_TYPES = frozenset({'pdf', 'all'})
+NEWS_SEARCH_TYPES = frozenset({'news', 'all'})
+SEARCH_LIMIT = 5
+SIMILARITY_THRESHOLD = 0.35
 
 
 class DocumentSearch(BaseTool):
@@ -21,22 +43,16 @@ class DocumentSearch(BaseTool):
         self.pdf_repo = PDFRepository()
         self.news_repo = NewsRepository()
         self.embeddings = HuggingFaceEmbeddings()
+        # OpenAI embeddings (1536d) для PDF/News, общий клиент на процесс
+        self.openai_embeddings = get_openai_embeddings(settings.OPENAI_API_KEY)
 
     def should_run(self, query: str, query_type: str) -> bool:
         """Запускать для юридических вопросов и поиска в законах"""
-        if query_type in [QueryType.LEGAL_INTERPRETATION, QueryType.NEWS_UPDATE]:
+        if query_type in DOC_QUERY_TYPES:
             return True
 
         q = query.lower()
-        doc_keywords = [
-            'ley', 'artículo', 'articulo', 'normativa', 'reglamento',
-            'boe', 'dogv', 'real decreto', 'orden ministerial',
-            'закон', 'статья', 'норматив', 'документ',
-            'sentencia', 'jurisprudencia', 'tribunal',
-            'noticia', 'actualidad', 'cambio', 'novedad', 'nuevo',
-            'новост', 'изменение', 'обновление',
-        ]
-        return any(kw in q for kw in doc_keywords)
+        return DOC_KEYWORDS_RE.search(q) is not None
 
     async def execute(self, **kwargs) -> ToolResult:
         """Поиск в документах"""
@@ -49,30 +65,52 @@ class DocumentSearch(BaseTool):
             results = []
 
             # Определяем что искать
-            should_search_pdf = search_type in ['pdf', 'all']
-            should_search_news = search_type in ['news', 'all']
+            should_search_pdf = search_type in PDF_SEARCH_TYPES
+            should_search_news = search_type in NEWS_SEARCH_TYPES
 
             # Если в запросе есть "noticia", "новость" - только новости
-            if any(kw in q for kw in ['noticia', 'новост', 'actualidad', 'cambio reciente']):
+            if NEWS_ONLY_KEYWORDS_RE.search(q):
                 should_search_pdf = False
                 should_search_news = True
 
             # Если упомянуты законы/статьи - только PDF
-            if any(kw in q for kw in ['ley', 'artículo', 'boe', 'закон', 'статья']):
+            if PDF_ONLY_KEYWORDS_RE.search(q):
                 should_search_pdf = True
                 should_search_news = False
 
-            # Поиск в PDF документах
-            if should_search_pdf:
-                pdf_results = await self._search_pdfs(query)
-                if pdf_results:
-                    results.append(pdf_results)
+            if should_search_pdf or should_search_news:
+                # Эмбеддинг для запроса (OpenAI, 1536d) - один на PDF и новости
+                embedding = await self.openai_embeddings.aembed_query(query)
+                # Литерал pgvector строим один раз для всех RPC ниже
+                embedding = encode_vector(embedding)
+
+            # PDF и новости одним RPC вызовом; None - функция не развёрнута,
+            # тогда каждый источник ищется своим запросом
+            shared_rows = None
+            if should_search_pdf and should_search_news:
+                shared_rows = await self.pdf_repo.hybrid_search_with_news(
+                    query_text=query,
+                    query_embedding=embedding,
+                    limit=SEARCH_LIMIT,
+                    similarity_threshold=SIMILARITY_THRESHOLD
+                )
 
-            # Поиск в новостях
+            # Поиск в PDF документах и в новостях параллельно: без общего RPC
+            # это два независимых запроса к БД (плюс get_recent_news для новостей)
+            searches = []
+            if should_search_pdf:
+                searches.append(self._search_pdfs(
+                    query, embedding, shared_rows['pdf'] if shared_rows else None
+                ))
             if should_search_news:
-                news_results = await self._search_news(query)
-                if news_results:
-                    results.append(news_results)
+                searches.append(self._search_news(
+                    query, embedding, shared_rows['news'] if shared_rows else None
+                ))
+
+            # Оба метода сами перехватывают ошибки, порядок: PDF, затем новости
+            for section in await asyncio.gather(*searches):
+                if section:
+                    results.append(section)
 
             if not results:
                 return self._success(
@@ -87,21 +125,22 @@ class DocumentSearch(BaseTool):
         except Exception as e:
             return self._error(str(e), (time.time() - start) * 1000)
 
-    async def _search_pdfs(self, query: str) -> Optional[str]:
-        """Поиск в PDF документах"""
+    async def _search_pdfs(
+        self,
+        query: str,
+        embedding: str,
+        results: Optional[List[Dict[str, Any]]] = None
+    ) -> Optional[str]:
+        """Поиск в PDF документах (results - уже полученные строки, если есть)"""
         try:
-            # Генерируем эмбеддинг для запроса (OpenAI для PDF)
-            from app.services.embeddings.openai_embeddings import OpenAIEmbeddings
-            openai_emb = OpenAIEmbeddings()
-            embedding = await openai_emb.embed_query(query)
-
             # Гибридный поиск
-            results = await self.pdf_repo.hybrid_search(
-                query_text=query,
-                query_embedding=embedding,
-                match_limit=5,
-                similarity_threshold=0.35
-            )
+            if results is None:
+                results = await self.pdf_repo.hybrid_search(
+                    query_text=query,
+                    query_embedding=embedding,
+                    limit=SEARCH_LIMIT,
+                    similarity_threshold=SIMILARITY_THRESHOLD
+                )
 
             if not results:
                 return None
@@ -132,25 +171,26 @@ class DocumentSearch(BaseTool):
         except Exception as e:
             return f"Error buscando en documentos PDF: {e}"
 
-    async def _search_news(self, query: str) -> Optional[str]:
-        """Поиск в новостях"""
+    async def _search_news(
+        self,
+        query: str,
+        embedding: str,
+        results: Optional[List[Dict[str, Any]]] = None
+    ) -> Optional[str]:
+        """Поиск в новостях (results - уже полученные строки, если есть)"""
         try:
-            # Генерируем эмбеддинг для запроса (OpenAI для News)
-            from app.services.embeddings.openai_embeddings import OpenAIEmbeddings
-            openai_emb = OpenAIEmbeddings()
-            embedding = await openai_emb.embed_query(query)
-
             # Гибридный поиск
-            results = await self.news_repo.hybrid_search(
-                query_text=query,
-                query_embedding=embedding,
-                match_limit=5,
-                similarity_threshold=0.35
-            )
+            if results is None:
+                results = await self.news_repo.hybrid_search(
+                    query_text=query,
+                    query_embedding=embedding,
+                    limit=SEARCH_LIMIT,
+                    similarity_threshold=SIMILARITY_THRESHOLD
+                )
 
             if not results:
                 # Пробуем получить последние новости
-                results = await self.news_repo.get_recent_news(limit=3)
+                results = await asyncio.to_thread(self.news_repo.get_recent_news, limit=3)
 
             if not results:
                 return None
@@ -11,7 +11,7 @@ import re
 import time
 from typing import Optional
 from app.models.agent import ToolType, ToolResult, QueryType
-from app.services.agent.tools.base_tool import BaseTool
+from app.services.agent.tools.base_tool import BaseTool, keyword_pattern
 
 
 # ============================================================
@@ -62,6 +62,21 @@ TIPO_SOCIEDADES_GENERAL = 0.25
 TIPO_SOCIEDADES_REDUCIDO = 0.23  # Para entidades con cifra de negocios < 1M€
 TIPO_SOCIEDADES_EMPRENDEDORES = 0.15  # Primeros 2 años
 
+# ============================================================
+# Ключевые слова (regex-альтернативы, собираются один раз при импорте)
+# ============================================================
+NUMBER_RE = re.compile(r'\d+[\.,]?\d*')
+TAX_KEYWORDS_RE = keyword_pattern(
+    'irpf', 'iva', 'impuesto', 'cuota', 'autónomo', 'autonomo',
+    'calcul', 'cuánto', 'cuanto', 'pagar', 'pago',
+    'сколько', 'налог', 'расчет', 'рассчит', 'платить',
+    'sociedades', 'retención', 'retencion',
+)
+IRPF_KEYWORDS_RE = keyword_pattern('irpf', 'renta', 'ирпф', 'подоходн')
+IVA_KEYWORDS_RE = keyword_pattern('iva', 'ива', 'ндс')
+AUTONOMO_KEYWORDS_RE = keyword_pattern('autónomo', 'autonomo', 'cuota', 'автоном', 'квота')
+SOCIEDADES_KEYWORDS_RE = keyword_pattern('sociedades', 'sociedad', 'empresa')
+
 
 class TaxCalculator(BaseTool):
     """Калькулятор налогов Испании"""
@@ -76,15 +91,7 @@ class TaxCalculator(BaseTool):
 
         q = query.lower()
         # Проверяем наличие числа + налогового термина
-        has_number = bool(re.search(r'\d+[\.,]?\d*', q))
-        tax_keywords = [
-            'irpf', 'iva', 'impuesto', 'cuota', 'autónomo', 'autonomo',
-            'calcul', 'cuánto', 'cuanto', 'pagar', 'pago',
-            'сколько', 'налог', 'расчет', 'рассчит', 'платить',
-            'sociedades', 'retención', 'retencion',
-        ]
-        has_tax = any(kw in q for kw in tax_keywords)
-        return has_number and has_tax
+        return NUMBER_RE.search(q) is not None and TAX_KEYWORDS_RE.search(q) is not None
 
     async def execute(self, **kwargs) -> ToolResult:
         """Выполнить расчёт на основе запроса"""
@@ -108,18 +115,16 @@ class TaxCalculator(BaseTool):
             main_amount = amounts[0]
 
             # Определяем тип расчёта
-            if any(kw in q for kw in ['irpf', 'renta', 'ирпф', 'подоходн']):
+            if IRPF_KEYWORDS_RE.search(q):
                 results.append(self.calculate_irpf(main_amount))
 
-            if any(kw in q for kw in ['iva', 'ива', 'ндс']):
+            if IVA_KEYWORDS_RE.search(q):
                 results.append(self.calculate_iva(main_amount))
 
-            if any(kw in q for kw in [
-                'autónomo', 'autonomo', 'cuota', 'автоном', 'квота'
-            ]):
+            if AUTONOMO_KEYWORDS_RE.search(q):
                 results.append(self.calculate_autonomo_cuota(main_amount))
 
-            if any(kw in q for kw in ['sociedades', 'sociedad', 'empresa']):
+            if SOCIEDADES_KEYWORDS_RE.search(q):
                 results.append(self.calculate_sociedades(main_amount))
 
             # Если тип не определён, делаем IRPF (самый частый запрос)
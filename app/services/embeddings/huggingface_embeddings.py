@@ -2,22 +2,49 @@
 Генерация embeddings через локальную модель HuggingFace
 Модель: intfloat/multilingual-e5-large (1024 dimensions)
 """
-from typing import List, Optional
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 from sentence_transformers import SentenceTransformer
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 
 class HuggingFaceEmbeddings:
     """Генерация embeddings через локальную модель sentence-transformers"""
 
+    # Загруженные модели, общие для всех экземпляров класса:
+    # UnifiedSearchService создаётся в нескольких местах, и каждый
+    # экземпляр не должен заново грузить ~2 ГБ весов в память
+    _models: Dict[str, SentenceTransformer] = {}
+    _models_lock = threading.Lock()
+
+    # LRU кэш embedding поисковых запросов ("query: "), общий для всех
+    # экземпляров: один и тот же вопрос считается для семантического кэша,
+    # поиска по Telegram и повторных запросов. generate() вызывается из
+    # потоков (asyncio.to_thread), поэтому доступ под блокировкой
+    QUERY_CACHE_SIZE = 512
+    _query_cache: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+    _query_cache_lock = threading.Lock()
+
     def __init__(self):
         self.model_name = "intfloat/multilingual-e5-large"
         self.dimension = 1024
-
-        print(f"⏳ Загрузка модели {self.model_name}...")
-        # Загружаем модель локально (кэшируется после первого раза)
-        self.model = SentenceTransformer(self.model_name)
-        print(f"✅ Модель загружена!")
+        self.model = self._load_model(self.model_name)
+
+    @classmethod
+    def _load_model(cls, model_name: str) -> SentenceTransformer:
+        """Загрузка модели один раз на процесс"""
+        with cls._models_lock:
+            model = cls._models.get(model_name)
+            if model is None:
+                logger.info("⏳ Загрузка модели %s...", model_name)
+                model = SentenceTransformer(model_name)
+                cls._models[model_name] = model
+                logger.info("✅ Модель загружена!")
+            return model
 
     def generate(self, text: str, prefix: str = "query: ") -> Optional[List[float]]:
         """
@@ -31,9 +58,19 @@ class HuggingFaceEmbeddings:
             Вектор embedding (1024 dimensions) или None
         """
         if not text or not text.strip():
-            print("⚠️ Пустой текст, пропускаем")
+            logger.warning("⚠️ Пустой текст, пропускаем")
             return None
 
+        # Документы индексируются один раз, кэшируем только запросы
+        cache_key = (self.model_name, text)
+        use_cache = prefix == "query: "
+        if use_cache:
+            with self._query_cache_lock:
+                cached = self._query_cache.get(cache_key)
+                if cached is not None:
+                    self._query_cache.move_to_end(cache_key)
+                    return cached
+
         # E5 модели требуют префикс
         # "query: " для поисковых запросов
         # "passage: " для документов в базе
@@ -47,13 +84,20 @@ class HuggingFaceEmbeddings:
             embedding_list = embedding.tolist()
 
             if len(embedding_list) == self.dimension:
+                if use_cache:
+                    with self._query_cache_lock:
+                        self._query_cache[cache_key] = embedding_list
+                        if len(self._query_cache) > self.QUERY_CACHE_SIZE:
+                            self._query_cache.popitem(last=False)
                 return embedding_list
             else:
-                print(f"⚠️ Неверная размерность: {len(embedding_list)}, ожидалось {self.dimension}")
+                logger.warning(
+                    "⚠️ Неверная размерность: %d, ожидалось %d", len(embedding_list), self.dimension
+                )
                 return None
 
         except Exception as e:
-            print(f"❌ Ошибка при генерации embedding: {e}")
+            logger.error("❌ Ошибка при генерации embedding: %s", e)
             return None
 
     def generate_batch(
@@ -93,7 +137,7 @@ class HuggingFaceEmbeddings:
             return embeddings_list
 
         except Exception as e:
-            print(f"❌ Ошибка при батч-генерации: {e}")
+            logger.error("❌ Ошибка при батч-генерации: %s", e)
             return [None] * len(texts)
 
 
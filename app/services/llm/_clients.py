@@ -0,0 +1,39 @@
+"""
+Shared LangChain client factories
+Every LLMService instance and tool that needs OpenAI goes through these
+so equal configurations reuse one client (and its HTTP connection pool)
+"""
+
+from functools import lru_cache
+from typing import Optional
+
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+DEFAULT_OPENAI_EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+@lru_cache(maxsize=None)
+def get_openai_embeddings(
+    api_key: Optional[str],
+    model: str = DEFAULT_OPENAI_EMBEDDING_MODEL
+) -> OpenAIEmbeddings:
+    """Return a process-wide OpenAIEmbeddings client for the given key and model"""
+    return OpenAIEmbeddings(model=model, api_key=api_key)
+
+
+@lru_cache(maxsize=None)
+def get_chat_openai(
+    model: str,
+    temperature: float,
+    api_key: Optional[str],
+    base_url: Optional[str] = None
+) -> ChatOpenAI:
+    """Return a process-wide ChatOpenAI client (also used for OpenRouter via base_url)"""
+    if base_url:
+        return ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            api_key=api_key,
+            base_url=base_url
+        )
+    return ChatOpenAI(model=model, temperature=temperature, api_key=api_key)
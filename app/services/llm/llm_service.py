@@ -3,12 +3,13 @@ LLM Service using LangChain
 Provides unified interface for working with different LLM providers
 """
 
-from typing import List, Optional, Tuple
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
-from langchain_anthropic import ChatAnthropic
+import logging
+from typing import AsyncIterator, List, Optional, Tuple
 from langchain_core.messages import HumanMessage, SystemMessage
 from app.config.settings import settings
+from app.services.llm._clients import get_chat_openai, get_openai_embeddings
+
+logger = logging.getLogger(__name__)
 
 
 class LLMService:
@@ -40,17 +41,18 @@ class LLMService:
         try:
             # Initialize chat model based on provider
             if self.provider == "openai":
-                self.chat_model = ChatOpenAI(
-                    model=self.model,
-                    temperature=self.temperature,
-                    api_key=settings.OPENAI_API_KEY
-                )
-                self.embeddings_model = OpenAIEmbeddings(
-                    model="text-embedding-3-small",
-                    api_key=settings.OPENAI_API_KEY
+                self.chat_model = get_chat_openai(
+                    self.model,
+                    self.temperature,
+                    settings.OPENAI_API_KEY
                 )
+                self.embeddings_model = get_openai_embeddings(settings.OPENAI_API_KEY)
                 
             elif self.provider == "google":
+                # Provider SDKs are imported on demand: the default OpenAI setup
+                # should not pay for loading the Google/Anthropic client stacks
+                from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+
                 self.chat_model = ChatGoogleGenerativeAI(
                     model=self.model,
                     temperature=self.temperature,
@@ -62,39 +64,35 @@ class LLMService:
                 )
                 
             elif self.provider == "anthropic":
+                from langchain_anthropic import ChatAnthropic
+
                 self.chat_model = ChatAnthropic(
                     model=self.model,
                     temperature=self.temperature,
                     anthropic_api_key=settings.ANTHROPIC_API_KEY
                 )
                 # Anthropic doesn't have embeddings, fallback to OpenAI
-                self.embeddings_model = OpenAIEmbeddings(
-                    model="text-embedding-3-small",
-                    api_key=settings.OPENAI_API_KEY
-                )
+                self.embeddings_model = get_openai_embeddings(settings.OPENAI_API_KEY)
                 
             elif self.provider == "openrouter":
                 # OpenRouter uses OpenAI-compatible API
-                self.chat_model = ChatOpenAI(
-                    model=self.model,
-                    temperature=self.temperature,
-                    api_key=settings.OPENROUTER_API_KEY,
+                self.chat_model = get_chat_openai(
+                    self.model,
+                    self.temperature,
+                    settings.OPENROUTER_API_KEY,
                     base_url="https://openrouter.ai/api/v1"
                 )
                 # OpenRouter doesn't have embeddings, fallback to OpenAI
-                self.embeddings_model = OpenAIEmbeddings(
-                    model="text-embedding-3-small",
-                    api_key=settings.OPENAI_API_KEY
-                )
+                self.embeddings_model = get_openai_embeddings(settings.OPENAI_API_KEY)
                 
             else:
                 raise ValueError(f"Unsupported provider: {self.provider}")
             
-            print(f"✅ LLM Service initialized: {self.provider} / {self.model}")
+            logger.info("✅ LLM Service initialized: %s / %s", self.provider, self.model)
             return True
             
         except Exception as e:
-            print(f"❌ Failed to initialize LLM Service: {e}")
+            logger.error("❌ Failed to initialize LLM Service: %s", e)
             return False
     
     def generate(
@@ -134,7 +132,7 @@ class LLMService:
             return response.content
             
         except Exception as e:
-            print(f"Error generating response: {e}")
+            logger.error("Error generating response: %s", e)
             return f"Error: {str(e)}"
     
     async def generate_async(
@@ -163,9 +161,41 @@ class LLMService:
             return response.content
             
         except Exception as e:
-            print(f"Error generating response: {e}")
+            logger.error("Error generating response: %s", e)
             return f"Error: {str(e)}"
     
+    async def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream the response as text chunks as the model produces them
+
+        Errors are yielded as a single "Error: ..." chunk, like generate_async
+        """
+        messages = []
+
+        if system_prompt:
+            messages.append(SystemMessage(content=system_prompt))
+
+        messages.append(HumanMessage(content=prompt))
+
+        try:
+            if max_tokens:
+                stream = self.chat_model.astream(messages, max_tokens=max_tokens)
+            else:
+                stream = self.chat_model.astream(messages)
+
+            async for chunk in stream:
+                if chunk.content:
+                    yield chunk.content
+
+        except Exception as e:
+            logger.error("Error streaming response: %s", e)
+            yield f"Error: {str(e)}"
+    
     def generate_embedding(self, text: str) -> List[float]:
         """
         Generate embedding vector for text
@@ -180,7 +210,7 @@ class LLMService:
             embedding = self.embeddings_model.embed_query(text)
             return embedding
         except Exception as e:
-            print(f"Error generating embedding: {e}")
+            logger.error("Error generating embedding: %s", e)
             return []
     
     def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
@@ -197,7 +227,7 @@ class LLMService:
             embeddings = self.embeddings_model.embed_documents(texts)
             return embeddings
         except Exception as e:
-            print(f"Error generating batch embeddings: {e}")
+            logger.error("Error generating batch embeddings: %s", e)
             return []
     
     def get_info(self) -> dict:
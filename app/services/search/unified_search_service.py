@@ -2,10 +2,16 @@
 Unified Search Service - координирует поиск по всем источникам данных
 """
 import asyncio
-from typing import List, Dict, Any, Optional
+import logging
+import re
+import time
+from collections import OrderedDict
+from operator import itemgetter
+from typing import Awaitable, List, Dict, Any, Optional, Tuple
 from datetime import datetime, date
 
 from app.models.agent import SearchSource, SearchResult, Context, QueryType, SOURCE_WEIGHTS
+from app.core.base_repository import collect_search_failures, encode_vector, report_search_failure
 from app.repositories.telegram_repository import TelegramRepository
 from app.repositories.pdf_repository import PDFRepository
 from app.repositories.calendar_repository import CalendarRepository
@@ -13,6 +19,30 @@ from app.repositories.news_repository import NewsRepository
 from app.services.llm.llm_service import LLMService
 from app.services.embeddings.huggingface_embeddings import HuggingFaceEmbeddings
 
+logger = logging.getLogger(__name__)
+
+# У календаря нет similarity score, используем фиксированный
+CALENDAR_SIMILARITY = 0.7
+
+# Категории PDF корпуса (законы по налогам) и их упоминания в запросе.
+# Целые слова: "iva" не должно срабатывать на "activa" или "deriva"
+PDF_CATEGORY_PATTERNS = (
+    ('irpf', re.compile(r'\b(?:irpf|renta)\b', re.IGNORECASE)),
+    ('iva', re.compile(r'\biva\b', re.IGNORECASE)),
+    ('sociedades', re.compile(r'\bsociedades\b', re.IGNORECASE)),
+)
+
+
+def pdf_category_hint(query: str) -> Optional[List[str]]:
+    """
+    Категория PDF для предварительной фильтрации поиска
+
+    Только если запрос упоминает ровно один налог: при нескольких (или ни
+    одном) фильтр мог бы отсечь нужные законы, ищем по всем
+    """
+    matched = [category for category, pattern in PDF_CATEGORY_PATTERNS if pattern.search(query)]
+    return matched if len(matched) == 1 else None
+
 
 class UnifiedSearchService:
     """
@@ -25,6 +55,15 @@ class UnifiedSearchService:
     - Result merging and ranking
     """
 
+    # Максимум запросов в LRU кэше OpenAI embeddings
+    # (список из 1536 float в Python ~ 50KB на запись, 512 записей ~ 25MB)
+    EMBEDDING_CACHE_SIZE = 512
+
+    # Кэш готовых Context для повторяющихся запросов ("IVA", "modelo 303"):
+    # время жизни и размер
+    RESULT_CACHE_TTL = 300.0
+    RESULT_CACHE_SIZE = 512
+
     def __init__(self):
         """Initialize repositories and embedding services"""
         # Repositories
@@ -41,10 +80,20 @@ class UnifiedSearchService:
         try:
             self.hf_embeddings = HuggingFaceEmbeddings()
         except Exception as e:
-            print(f"⚠️ HuggingFace embeddings not available: {e}")
+            logger.warning("⚠️ HuggingFace embeddings not available: %s", e)
             self.hf_embeddings = None
 
-        print("✅ UnifiedSearchService initialized")
+        # Кэш OpenAI embeddings: текст запроса -> вектор. Переведённые ключевые
+        # слова повторяются (классификатор тоже кэширует перевод), а каждый
+        # embed_query - это платный API round-trip
+        self._embedding_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+
+        # Кэш результатов поиска: (запросы, тип, параметры) -> (срок, Context)
+        self._result_cache: "OrderedDict[Tuple, Tuple[float, Context]]" = OrderedDict()
+        self._result_cache_hits = 0
+        self._result_cache_misses = 0
+
+        logger.info("✅ UnifiedSearchService initialized")
 
     async def search_all(
         self,
@@ -53,7 +102,8 @@ class UnifiedSearchService:
         top_k: int = 10,
         similarity_threshold: float = 0.5,
         sources: Optional[List[SearchSource]] = None,
-        original_query: Optional[str] = None
+        original_query: Optional[str] = None,
+        telegram_query_embedding: Optional[List[float]] = None
     ) -> Context:
         """
         Поиск по всем источникам с адаптивными весами
@@ -65,6 +115,8 @@ class UnifiedSearchService:
             similarity_threshold: Минимальный порог схожести
             sources: Конкретные источники для поиска (None = все)
             original_query: Оригинальный запрос пользователя (для Telegram на русском)
+            telegram_query_embedding: Уже посчитанный HuggingFace embedding запроса
+                для Telegram ("query: " + original_query), чтобы не считать его повторно
 
         Returns:
             Context с результатами, confidence score, sources used
@@ -74,88 +126,219 @@ class UnifiedSearchService:
         # Получаем веса источников для данного типа запроса
         source_weights = SOURCE_WEIGHTS.get(query_type, SOURCE_WEIGHTS[QueryType.GENERAL_INFO])
 
-        # Фильтруем источники если указаны
-        if sources:
-            source_weights = {src: weight for src, weight in source_weights.items() if src in sources}
-
-        # Фильтруем источники с нулевым весом
-        active_sources = {src: weight for src, weight in source_weights.items() if weight > 0}
+        # Фильтруем источники (если указаны) и источники с нулевым весом за один проход
+        wanted = frozenset(sources) if sources else None
+        active_sources = {
+            src: weight for src, weight in source_weights.items()
+            if weight > 0 and (wanted is None or src in wanted)
+        }
 
         # Используем оригинальный запрос для Telegram (русский), переведённый для остальных
         telegram_query = original_query if original_query else query
 
-        # Параллельный поиск по всем активным источникам
-        search_tasks = []
-        for source, weight in active_sources.items():
-            if source == SearchSource.TELEGRAM:
-                search_tasks.append(self._search_telegram(telegram_query, top_k, similarity_threshold))
-            elif source == SearchSource.PDF:
-                search_tasks.append(self._search_pdf(query, top_k, similarity_threshold))
-            elif source == SearchSource.CALENDAR:
-                search_tasks.append(self._search_calendar(query, top_k))
-            elif source == SearchSource.NEWS:
-                search_tasks.append(self._search_news(query, top_k, similarity_threshold))
-
-        # Выполняем все поиски параллельно
-        search_results = await asyncio.gather(*search_tasks, return_exceptions=True)
-
-        # Обрабатываем результаты
-        all_results: List[SearchResult] = []
+        # Тот же запрос с теми же параметрами недавно уже искали
+        cache_key = (
+            " ".join(query.lower().split()),
+            " ".join(telegram_query.lower().split()),
+            query_type,
+            top_k,
+            similarity_threshold,
+            frozenset(active_sources)
+        )
+        cached = self._get_cached_result(cache_key)
+        if cached is not None:
+            return cached
+
+        # Сбои отдельных источников (ошибка, пустой fallback) не видны по
+        # результату: helper'ы и репозитории отмечают их здесь
+        with collect_search_failures() as failed_sources:
+            # PDF и News ищут по одному и тому же запросу с одной моделью (1536d):
+            # считаем embedding один раз и делим его между обоими поисками
+            openai_embedding = None
+            if SearchSource.PDF in active_sources or SearchSource.NEWS in active_sources:
+                openai_embedding = asyncio.ensure_future(self._generate_openai_embedding(query))
+
+            # Вопрос про один налог - PDF ищем только по законам этой категории
+            pdf_categories = pdf_category_hint(query)
+
+            # Если нужны PDF и News - один RPC вместо двух, строки делятся между
+            # ними; вместе с Telegram - один RPC на все три источника
+            pdf_news_rows = None
+            telegram_rows = None
+            if SearchSource.PDF in active_sources and SearchSource.NEWS in active_sources:
+                if SearchSource.TELEGRAM in active_sources:
+                    pdf_news_rows = telegram_rows = asyncio.ensure_future(self._fetch_all_source_rows(
+                        query, telegram_query, top_k, similarity_threshold,
+                        openai_embedding, telegram_query_embedding, pdf_categories
+                    ))
+                else:
+                    pdf_news_rows = asyncio.ensure_future(self._fetch_pdf_news_rows(
+                        query, top_k, similarity_threshold, openai_embedding, pdf_categories
+                    ))
+
+            # Параллельный поиск по всем активным источникам
+            search_tasks = []
+            for source, weight in active_sources.items():
+                if source == SearchSource.TELEGRAM:
+                    search_tasks.append(self._search_telegram(
+                        telegram_query, top_k, similarity_threshold, telegram_query_embedding,
+                        telegram_rows
+                    ))
+                elif source == SearchSource.PDF:
+                    search_tasks.append(self._search_pdf(
+                        query, top_k, similarity_threshold, openai_embedding, pdf_news_rows,
+                        pdf_categories
+                    ))
+                elif source == SearchSource.CALENDAR:
+                    search_tasks.append(self._search_calendar(query, top_k))
+                elif source == SearchSource.NEWS:
+                    search_tasks.append(self._search_news(
+                        query, top_k, similarity_threshold, openai_embedding, pdf_news_rows
+                    ))
+
+            # Выполняем все поиски параллельно
+            search_results = await asyncio.gather(*search_tasks, return_exceptions=True)
+
+        # Обрабатываем результаты: ранжируем сырые строки, SearchResult
+        # создаём только для тех, что попали в топ-K
+        scored_rows: List[Tuple[float, SearchSource, Dict[str, Any]]] = []
         sources_used: List[SearchSource] = []
 
         for i, (source, weight) in enumerate(active_sources.items()):
-            results = search_results[i]
+            rows = search_results[i]
 
             # Проверяем на ошибки
-            if isinstance(results, Exception):
-                print(f"⚠️ Error searching {source}: {results}")
+            if isinstance(rows, Exception):
+                logger.warning("⚠️ Error searching %s: %s", source, rows)
+                failed_sources.add(source.value)
                 continue
 
-            if results:
+            if rows:
                 sources_used.append(source)
 
                 # Применяем веса к relevance score
-                for result in results:
-                    result.relevance_score = (result.similarity_score or 0.5) * weight
-                    all_results.append(result)
-
-        # Сортируем по relevance score
-        all_results.sort(key=lambda x: x.relevance_score or 0, reverse=True)
-
-        # Берем топ-K результатов
-        top_results = all_results[:top_k]
+                if source == SearchSource.CALENDAR:
+                    # Для календаря similarity фиксированный (см. _calendar_result)
+                    scored_rows.extend((CALENDAR_SIMILARITY * weight, source, row) for row in rows)
+                else:
+                    scored_rows.extend(
+                        ((row.get('similarity', 0.5) or 0.5) * weight, source, row) for row in rows
+                    )
+
+        # Сортируем по relevance score (только по числу: строки-словари не сравниваются)
+        scored_rows.sort(key=itemgetter(0), reverse=True)
+
+        # Берем топ-K результатов; сумму similarity для confidence считаем
+        # в том же проходе, а не отдельным обходом списка
+        top_results: List[SearchResult] = []
+        similarity_sum = 0.0
+        for relevance_score, source, row in scored_rows[:top_k]:
+            result = self._RESULT_BUILDERS[source](row)
+            result.relevance_score = relevance_score
+            top_results.append(result)
+            similarity_sum += result.similarity_score or 0.5
 
         # Вычисляем confidence score
-        confidence_score = self._calculate_confidence(top_results, sources_used, active_sources)
+        confidence_score = self._calculate_confidence(
+            similarity_sum, len(top_results), sources_used, active_sources
+        )
 
-        # Создаем контекст
-        context = Context(
+        # Создаем контекст. Все поля посчитаны здесь же (результаты уже
+        # SearchResult, confidence в [0, 1]) - model_construct без повторной
+        # валидации; enum приводим к значениям сами, как сделал бы use_enum_values
+        context = Context.model_construct(
             results=top_results,
-            sources_used=sources_used,
+            sources_used=[source.value for source in sources_used],
             confidence_score=confidence_score,
-            total_results=len(all_results)
+            total_results=len(scored_rows)
         )
 
-        processing_time = (datetime.now() - start_time).total_seconds() * 1000
-        print(f"✅ Search completed in {processing_time:.0f}ms: {len(top_results)} results from {len(sources_used)} sources")
+        # Пустой или неполный (сбой одного из источников) результат не кэшируем,
+        # иначе повтор запроса ещё RESULT_CACHE_TTL получал бы урезанный контекст
+        if top_results and not failed_sources:
+            self._put_cached_result(cache_key, context)
+        elif failed_sources:
+            logger.info("Search result not cached, failed sources: %s", sorted(failed_sources))
+
+        if logger.isEnabledFor(logging.INFO):
+            processing_time = (datetime.now() - start_time).total_seconds() * 1000
+            logger.info(
+                "✅ Search completed in %.0fms: %d results from %d sources",
+                processing_time, len(top_results), len(sources_used)
+            )
 
         return context
 
+    def _get_cached_result(self, key: Tuple) -> Optional[Context]:
+        """Context из кэша результатов, если он ещё не устарел"""
+        entry = self._result_cache.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._result_cache[key]
+            self._result_cache_misses += 1
+            return None
+        self._result_cache.move_to_end(key)
+        self._result_cache_hits += 1
+        return self._copy_context(entry[1])
+
+    def _put_cached_result(self, key: Tuple, context: Context):
+        """Положить Context в кэш результатов (LRU с TTL)"""
+        self._result_cache[key] = (
+            time.monotonic() + self.RESULT_CACHE_TTL, self._copy_context(context)
+        )
+        self._result_cache.move_to_end(key)
+        if len(self._result_cache) > self.RESULT_CACHE_SIZE:
+            self._result_cache.popitem(last=False)
+
+    @staticmethod
+    def _copy_context(context: Context) -> Context:
+        """
+        Копия Context со своим списком и своими SearchResult
+
+        Кэш общий для всех пользователей: вызывающий код может менять
+        results, relevance_score и total_results, не портя запись в кэше
+        """
+        return context.model_copy(update={
+            'results': [result.model_copy() for result in context.results],
+            'sources_used': list(context.sources_used)
+        })
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Статистика кэша результатов поиска"""
+        return {
+            "hits": self._result_cache_hits,
+            "misses": self._result_cache_misses,
+            "size": len(self._result_cache)
+        }
+
     async def _search_telegram(
         self,
         query: str,
         limit: int,
-        similarity_threshold: float
-    ) -> List[SearchResult]:
+        similarity_threshold: float,
+        query_embedding: Optional[List[float]] = None,
+        shared_rows: Optional[Awaitable[Dict[str, List[Dict[str, Any]]]]] = None
+    ) -> List[Dict[str, Any]]:
         """Поиск по Telegram тредам (HuggingFace embeddings, 1024d)"""
         try:
-            if not self.hf_embeddings:
-                print("⚠️ HuggingFace embeddings not available, skipping Telegram search")
-                return []
+            if shared_rows is not None:
+                # Строки уже запрошены общим RPC вместе с PDF и News
+                return (await shared_rows)['telegram']
+
+            if query_embedding is None:
+                if not self.hf_embeddings:
+                    logger.warning("⚠️ HuggingFace embeddings not available, skipping Telegram search")
+                    return []
+
+                # Генерируем embedding через HuggingFace (1024d) в потоке:
+                # encode() нагружает CPU и иначе держит event loop, пока
+                # PDF/News ждут свои OpenAI embedding и RPC
+                query_embedding = await asyncio.to_thread(
+                    self.hf_embeddings.generate, query, "query: "
+                )
 
-            # Генерируем embedding через HuggingFace (1024d)
-            query_embedding = self.hf_embeddings.generate(query, prefix="query: ")
             if not query_embedding:
+                report_search_failure(SearchSource.TELEGRAM.value)
                 return []
 
             # Hybrid search через RPC
@@ -166,75 +349,58 @@ class UnifiedSearchService:
                 similarity_threshold=similarity_threshold
             )
 
-            # Преобразуем в SearchResult
-            search_results = []
-            for result in results:
-                search_results.append(SearchResult(
-                    source=SearchSource.TELEGRAM,
-                    content=result.get('content', ''),
-                    metadata={
-                        'thread_id': result.get('thread_id'),
-                        'group_name': result.get('group_name'),
-                        'quality_score': result.get('quality_score'),
-                        'message_count': result.get('message_count')
-                    },
-                    similarity_score=result.get('similarity', 0.5)
-                ))
-
-            return search_results
+            return results
 
         except Exception as e:
-            print(f"⚠️ Error in Telegram search: {e}")
+            logger.warning("⚠️ Error in Telegram search: %s", e)
+            report_search_failure(SearchSource.TELEGRAM.value)
             return []
 
     async def _search_pdf(
         self,
         query: str,
         limit: int,
-        similarity_threshold: float
-    ) -> List[SearchResult]:
+        similarity_threshold: float,
+        query_embedding_future: Optional[Awaitable[Optional[List[float]]]] = None,
+        shared_rows: Optional[Awaitable[Dict[str, List[Dict[str, Any]]]]] = None,
+        categories: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
         """Поиск по PDF документам (OpenAI embeddings, 1536d)"""
         try:
-            # Генерируем embedding через OpenAI (1536d)
-            query_embedding = await self._generate_openai_embedding(query)
-            if not query_embedding:
-                return []
-
-            # Hybrid search через RPC
-            results = await self.pdf_repo.hybrid_search(
-                query_text=query,
-                query_embedding=query_embedding,
-                limit=limit,
-                similarity_threshold=similarity_threshold
-            )
-
-            # Преобразуем в SearchResult
-            search_results = []
-            for result in results:
-                search_results.append(SearchResult(
-                    source=SearchSource.PDF,
-                    content=result.get('content', ''),
-                    metadata={
-                        'document_title': result.get('document_title'),
-                        'chunk_number': result.get('chunk_number'),
-                        'document_type': result.get('document_type'),
-                        'region': result.get('region'),
-                        'categories': result.get('categories')
-                    },
-                    similarity_score=result.get('similarity', 0.5)
-                ))
-
-            return search_results
+            if shared_rows is not None:
+                # Строки уже запрошены общим RPC вместе с News
+                results = (await shared_rows)['pdf']
+            else:
+                # Генерируем embedding через OpenAI (1536d), если он не посчитан заранее
+                if query_embedding_future is not None:
+                    query_embedding = await query_embedding_future
+                else:
+                    query_embedding = await self._generate_openai_embedding(query)
+                if not query_embedding:
+                    report_search_failure(SearchSource.PDF.value)
+                    return []
+
+                # Hybrid search через RPC
+                results = await self.pdf_repo.hybrid_search(
+                    query_text=query,
+                    query_embedding=query_embedding,
+                    limit=limit,
+                    similarity_threshold=similarity_threshold,
+                    categories=categories
+                )
+
+            return results
 
         except Exception as e:
-            print(f"⚠️ Error in PDF search: {e}")
+            logger.warning("⚠️ Error in PDF search: %s", e)
+            report_search_failure(SearchSource.PDF.value)
             return []
 
     async def _search_calendar(
         self,
         query: str,
         limit: int
-    ) -> List[SearchResult]:
+    ) -> List[Dict[str, Any]]:
         """Поиск по налоговому календарю (keyword search, no embeddings)"""
         try:
             # Keyword search через repository
@@ -243,94 +409,260 @@ class UnifiedSearchService:
                 limit=limit
             )
 
-            # Преобразуем в SearchResult
-            search_results = []
-            for result in results:
-                # Для календаря нет similarity score, используем фиксированный
-                search_results.append(SearchResult(
-                    source=SearchSource.CALENDAR,
-                    content=f"{result.get('description', '')} (Deadline: {result.get('deadline_date')})",
-                    metadata={
-                        'deadline_date': result.get('deadline_date'),
-                        'tax_type': result.get('tax_type'),
-                        'tax_model': result.get('tax_model'),
-                        'applies_to': result.get('applies_to'),
-                        'region': result.get('region')
-                    },
-                    similarity_score=0.7  # Fixed score for calendar results
-                ))
-
-            return search_results
+            return results
 
         except Exception as e:
-            print(f"⚠️ Error in Calendar search: {e}")
+            logger.warning("⚠️ Error in Calendar search: %s", e)
+            report_search_failure(SearchSource.CALENDAR.value)
             return []
 
     async def _search_news(
         self,
         query: str,
         limit: int,
-        similarity_threshold: float
-    ) -> List[SearchResult]:
+        similarity_threshold: float,
+        query_embedding_future: Optional[Awaitable[Optional[List[float]]]] = None,
+        shared_rows: Optional[Awaitable[Dict[str, List[Dict[str, Any]]]]] = None
+    ) -> List[Dict[str, Any]]:
         """Поиск по новостям (OpenAI embeddings, 1536d)"""
         try:
-            # Генерируем embedding через OpenAI (1536d)
-            query_embedding = await self._generate_openai_embedding(query)
-            if not query_embedding:
-                return []
+            if shared_rows is not None:
+                # Строки уже запрошены общим RPC вместе с PDF
+                results = (await shared_rows)['news']
+            else:
+                # Генерируем embedding через OpenAI (1536d), если он не посчитан заранее
+                if query_embedding_future is not None:
+                    query_embedding = await query_embedding_future
+                else:
+                    query_embedding = await self._generate_openai_embedding(query)
+                if not query_embedding:
+                    report_search_failure(SearchSource.NEWS.value)
+                    return []
+
+                # Hybrid search через RPC
+                results = await self.news_repo.hybrid_search(
+                    query_text=query,
+                    query_embedding=query_embedding,
+                    limit=limit,
+                    similarity_threshold=similarity_threshold
+                )
+
+            return results
 
-            # Hybrid search через RPC
-            results = await self.news_repo.hybrid_search(
+        except Exception as e:
+            logger.warning("⚠️ Error in News search: %s", e)
+            report_search_failure(SearchSource.NEWS.value)
+            return []
+
+    @staticmethod
+    def _telegram_result(row: Dict[str, Any]) -> SearchResult:
+        """SearchResult из строки Telegram треда"""
+        get = row.get
+        return SearchResult.model_construct(
+            source=SearchSource.TELEGRAM.value,
+            content=get('content') or '',
+            metadata={
+                'thread_id': get('thread_id'),
+                'group_name': get('group_name'),
+                'quality_score': get('quality_score'),
+                'message_count': get('message_count')
+            },
+            similarity_score=get('similarity', 0.5)
+        )
+
+    @staticmethod
+    def _pdf_result(row: Dict[str, Any]) -> SearchResult:
+        """SearchResult из строки чанка PDF документа"""
+        get = row.get
+        return SearchResult.model_construct(
+            source=SearchSource.PDF.value,
+            content=get('content') or '',
+            metadata={
+                'document_title': get('document_title'),
+                'chunk_number': get('chunk_number'),
+                'document_type': get('document_type'),
+                'region': get('region'),
+                'categories': get('categories')
+            },
+            similarity_score=get('similarity', 0.5)
+        )
+
+    @staticmethod
+    def _calendar_result(row: Dict[str, Any]) -> SearchResult:
+        """SearchResult из строки дедлайна налогового календаря"""
+        get = row.get
+        return SearchResult.model_construct(
+            source=SearchSource.CALENDAR.value,
+            content=f"{get('description', '')} (Deadline: {get('deadline_date')})",
+            metadata={
+                'deadline_date': get('deadline_date'),
+                'tax_type': get('tax_type'),
+                'tax_model': get('tax_model'),
+                'applies_to': get('applies_to'),
+                'region': get('region')
+            },
+            similarity_score=CALENDAR_SIMILARITY
+        )
+
+    @staticmethod
+    def _news_result(row: Dict[str, Any]) -> SearchResult:
+        """SearchResult из строки новостной статьи"""
+        get = row.get
+        return SearchResult.model_construct(
+            source=SearchSource.NEWS.value,
+            content=get('content') or '',
+            metadata={
+                'article_title': get('article_title'),
+                'article_url': get('article_url'),
+                'published_at': get('published_at'),
+                'news_source': get('news_source'),
+                'categories': get('categories')
+            },
+            similarity_score=get('similarity', 0.5)
+        )
+
+    # Сборка SearchResult из строки по источнику. Строки пришли из нашей БД
+    # (схема известна), поэтому model_construct без валидации pydantic;
+    # row.get связывается один раз на строку
+    _RESULT_BUILDERS = {
+        SearchSource.TELEGRAM: _telegram_result,
+        SearchSource.PDF: _pdf_result,
+        SearchSource.CALENDAR: _calendar_result,
+        SearchSource.NEWS: _news_result,
+    }
+
+    async def _fetch_pdf_news_rows(
+        self,
+        query: str,
+        limit: int,
+        similarity_threshold: float,
+        query_embedding_future: Awaitable[Optional[List[float]]],
+        pdf_categories: Optional[List[str]] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Строки PDF и News одним RPC вызовом (search_pdf_news_hybrid)
+
+        Если функция ещё не создана в БД, ищем по источникам отдельно
+        (параллельно, каждый со своим fallback в репозитории)
+        """
+        query_embedding = await query_embedding_future
+        if not query_embedding:
+            report_search_failure(SearchSource.PDF.value)
+            report_search_failure(SearchSource.NEWS.value)
+            return {'pdf': [], 'news': []}
+
+        # Литерал pgvector (~20KB текста) строим один раз: он уходит в общий
+        # RPC, а при его отсутствии - в оба отдельных поиска
+        query_embedding = encode_vector(query_embedding)
+
+        rows = await self.pdf_repo.hybrid_search_with_news(
+            query_text=query,
+            query_embedding=query_embedding,
+            limit=limit,
+            similarity_threshold=similarity_threshold,
+            pdf_categories=pdf_categories
+        )
+        if rows is not None:
+            return rows
+
+        pdf_rows, news_rows = await asyncio.gather(
+            self.pdf_repo.hybrid_search(
+                query_text=query,
+                query_embedding=query_embedding,
+                limit=limit,
+                similarity_threshold=similarity_threshold,
+                categories=pdf_categories
+            ),
+            self.news_repo.hybrid_search(
                 query_text=query,
                 query_embedding=query_embedding,
                 limit=limit,
                 similarity_threshold=similarity_threshold
             )
+        )
+        return {'pdf': pdf_rows, 'news': news_rows}
 
-            # Преобразуем в SearchResult
-            search_results = []
-            for result in results:
-                search_results.append(SearchResult(
-                    source=SearchSource.NEWS,
-                    content=result.get('content', ''),
-                    metadata={
-                        'article_title': result.get('article_title'),
-                        'article_url': result.get('article_url'),
-                        'published_at': result.get('published_at'),
-                        'news_source': result.get('news_source'),
-                        'categories': result.get('categories')
-                    },
-                    similarity_score=result.get('similarity', 0.5)
-                ))
-
-            return search_results
+    async def _fetch_all_source_rows(
+        self,
+        query: str,
+        telegram_query: str,
+        limit: int,
+        similarity_threshold: float,
+        query_embedding_future: Awaitable[Optional[List[float]]],
+        telegram_query_embedding: Optional[List[float]] = None,
+        pdf_categories: Optional[List[str]] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Строки Telegram, PDF и News одним RPC вызовом (search_sources_hybrid)
 
-        except Exception as e:
-            print(f"⚠️ Error in News search: {e}")
-            return []
+        HuggingFace embedding для Telegram считается в потоке параллельно
+        с OpenAI embedding. Если одного из них нет или функция ещё не
+        создана в БД, ищем как раньше: PDF + News общим RPC, Telegram отдельно
+        """
+        if telegram_query_embedding is None and self.hf_embeddings:
+            telegram_query_embedding, query_embedding = await asyncio.gather(
+                asyncio.to_thread(self.hf_embeddings.generate, telegram_query, "query: "),
+                query_embedding_future
+            )
+            # Не удалось посчитать - не пересчитываем в отдельном поиске
+            telegram_query_embedding = telegram_query_embedding or []
+        else:
+            query_embedding = await query_embedding_future
+
+        if telegram_query_embedding and query_embedding:
+            rows = await self.pdf_repo.hybrid_search_all_sources(
+                query_text=query,
+                query_embedding=query_embedding,
+                telegram_query_text=telegram_query,
+                telegram_embedding=telegram_query_embedding,
+                limit=limit,
+                similarity_threshold=similarity_threshold,
+                pdf_categories=pdf_categories
+            )
+            if rows is not None:
+                return rows
+
+        pdf_news_rows, telegram_rows = await asyncio.gather(
+            self._fetch_pdf_news_rows(
+                query, limit, similarity_threshold, query_embedding_future, pdf_categories
+            ),
+            self._search_telegram(telegram_query, limit, similarity_threshold, telegram_query_embedding)
+        )
+        return {'telegram': telegram_rows, **pdf_news_rows}
 
     async def _generate_openai_embedding(self, text: str) -> Optional[List[float]]:
-        """Генерация embedding через OpenAI API (1536d)"""
+        """Генерация embedding через OpenAI API (1536d), с LRU кэшем по тексту"""
         try:
             if not self.llm_service.embeddings_model:
-                print("⚠️ OpenAI embeddings not available")
+                logger.warning("⚠️ OpenAI embeddings not available")
                 return None
 
+            cached = self._embedding_cache.get(text)
+            if cached is not None:
+                self._embedding_cache.move_to_end(text)
+                return cached
+
             # LangChain OpenAIEmbeddings.embed_query() возвращает список
             embedding = await asyncio.to_thread(
                 self.llm_service.embeddings_model.embed_query,
                 text
             )
 
+            if embedding:
+                self._embedding_cache[text] = embedding
+                if len(self._embedding_cache) > self.EMBEDDING_CACHE_SIZE:
+                    self._embedding_cache.popitem(last=False)
+
             return embedding
 
         except Exception as e:
-            print(f"⚠️ Error generating OpenAI embedding: {e}")
+            logger.warning("⚠️ Error generating OpenAI embedding: %s", e)
             return None
 
     def _calculate_confidence(
         self,
-        results: List[SearchResult],
+        similarity_sum: float,
+        results_count: int,
         sources_used: List[SearchSource],
         active_sources: Dict[SearchSource, float]
     ) -> float:
@@ -339,14 +671,14 @@ class UnifiedSearchService:
 
         Факторы:
         - Количество найденных результатов
-        - Similarity scores результатов
+        - Similarity scores результатов (сумма по топ-K, пустые как 0.5)
         - Количество использованных источников
         """
-        if not results:
+        if not results_count:
             return 0.0
 
         # Средний similarity score
-        avg_similarity = sum(r.similarity_score or 0.5 for r in results) / len(results)
+        avg_similarity = similarity_sum / results_count
 
         # Покрытие источников (сколько из активных источников дали результаты)
         source_coverage = len(sources_used) / len(active_sources) if active_sources else 0
@@ -5,15 +5,18 @@ SubscriptionService - управление подписками и лимита
 Проверка лимитов для Free пользователей
 """
 import os
+import time
+import asyncio
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from datetime import datetime
 from dataclasses import dataclass
 
 import stripe
-from supabase import create_client, Client
+from supabase import Client
 
 from app.config.settings import settings
+from app.core.base_repository import get_supabase_client
 
 logger = logging.getLogger(__name__)
 
@@ -146,8 +149,16 @@ class SubscriptionService:
         }
     }
 
+    # Кэш планов: план проверяется на каждое сообщение, а меняется редко.
+    # Счётчики в кэше обновляются локально в increment_usage
+    PLAN_CACHE_TTL = 60.0
+    PLAN_CACHE_MAX_SIZE = 50_000
+
     def __init__(self):
         self.supabase: Optional[Client] = None
+        self._plan_cache: Dict[int, Tuple[float, UserPlan]] = {}
+        # telegram_id -> UUID пользователя: связь не меняется, TTL не нужен
+        self._user_id_cache: Dict[int, str] = {}
         self._init_supabase()
         self._init_stripe()
 
@@ -155,7 +166,7 @@ class SubscriptionService:
         """Инициализация Supabase клиента"""
         try:
             supabase_key = getattr(settings, 'SUPABASE_SERVICE_KEY', None) or settings.SUPABASE_KEY
-            self.supabase = create_client(
+            self.supabase = get_supabase_client(
                 settings.SUPABASE_URL,
                 supabase_key
             )
@@ -173,20 +184,24 @@ class SubscriptionService:
             logger.warning("⚠️ SubscriptionService: STRIPE_SECRET_KEY not set")
 
     async def get_user_plan(self, telegram_id: int) -> UserPlan:
-        """Получить план пользователя"""
+        """Получить план пользователя (с кэшем на PLAN_CACHE_TTL секунд)"""
+        cached = self._plan_cache.get(telegram_id)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
         try:
             if not self.supabase:
                 return self._default_free_plan()
 
             # Вызываем функцию в Supabase
-            result = self.supabase.rpc(
-                'get_user_plan',
-                {'p_telegram_id': telegram_id}
-            ).execute()
+            # Синхронный supabase-py - в потоке, чтобы не блокировать event loop
+            result = await asyncio.to_thread(
+                self.supabase.rpc('get_user_plan', {'p_telegram_id': telegram_id}).execute
+            )
 
             if result.data and len(result.data) > 0:
                 row = result.data[0]
-                return UserPlan(
+                plan = UserPlan(
                     plan_name=row['plan_name'],
                     daily_limit=row['daily_limit'],
                     monthly_limit=row.get('monthly_limit'),
@@ -196,6 +211,8 @@ class SubscriptionService:
                     is_premium=row['is_premium'],
                     expires_at=row['expires_at']
                 )
+                self._cache_plan(telegram_id, plan)
+                return plan
 
             return self._default_free_plan()
 
@@ -208,6 +225,19 @@ class SubscriptionService:
                 logger.error(f"Error getting user plan: {e}")
             return self._default_free_plan()
 
+    def _cache_plan(self, telegram_id: int, plan: UserPlan):
+        """Положить план в кэш, вытесняя самую старую запись при переполнении"""
+        if len(self._plan_cache) >= self.PLAN_CACHE_MAX_SIZE:
+            self._plan_cache.pop(next(iter(self._plan_cache)))
+        self._plan_cache[telegram_id] = (time.monotonic() + self.PLAN_CACHE_TTL, plan)
+
+    def invalidate_plan(self, telegram_id: Optional[int] = None):
+        """Сбросить кэш плана пользователя (или весь кэш, если telegram_id не указан)"""
+        if telegram_id is None:
+            self._plan_cache.clear()
+        else:
+            self._plan_cache.pop(telegram_id, None)
+
     def _default_free_plan(self) -> UserPlan:
         """Дефолтный Free план"""
         return UserPlan(
@@ -242,14 +272,23 @@ class SubscriptionService:
             if not self.supabase:
                 return 0
 
-            result = self.supabase.rpc(
-                'increment_message_count',
-                {'p_telegram_id': telegram_id}
-            ).execute()
+            result = await asyncio.to_thread(
+                self.supabase.rpc('increment_message_count', {'p_telegram_id': telegram_id}).execute
+            )
+
+            # Обновляем счётчики закэшированного плана вместо повторного запроса
+            cached = self._plan_cache.get(telegram_id)
+            if cached:
+                plan = cached[1]
+                plan.messages_today += 1
+                plan.messages_this_month += 1
+                if plan.messages_remaining is not None:
+                    plan.messages_remaining = max(plan.messages_remaining - 1, 0)
 
             return result.data if result.data else 0
 
         except Exception as e:
+            self.invalidate_plan(telegram_id)
             error_msg = str(e)
             if 'PGRST202' in error_msg or 'does not exist' in error_msg:
                 pass  # Tables not created yet, skip silently
@@ -332,7 +371,11 @@ class SubscriptionService:
             raise
 
     def _get_user_id(self, telegram_id: int) -> Optional[str]:
-        """Получить UUID пользователя по telegram_id"""
+        """Получить UUID пользователя по telegram_id (кэшируется, только найденные)"""
+        user_id = self._user_id_cache.get(telegram_id)
+        if user_id is not None:
+            return user_id
+
         try:
             if not self.supabase:
                 return None
@@ -343,7 +386,11 @@ class SubscriptionService:
                 .execute()
 
             if result.data:
-                return result.data[0]['id']
+                user_id = result.data[0]['id']
+                if len(self._user_id_cache) >= self.PLAN_CACHE_MAX_SIZE:
+                    self._user_id_cache.pop(next(iter(self._user_id_cache)))
+                self._user_id_cache[telegram_id] = user_id
+                return user_id
             return None
 
         except Exception as e:
@@ -388,6 +435,9 @@ class SubscriptionService:
         try:
             event_type = event['type']
 
+            # Подписка могла измениться у любого пользователя
+            self.invalidate_plan()
+
             if event_type == 'checkout.session.completed':
                 await self._handle_checkout_completed(event['data']['object'])
 
@@ -5,10 +5,13 @@ Uses Supabase REST API (PostgREST) instead of direct psycopg2
 
 import logging
 from typing import Optional, Dict, Any, List
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
-from supabase import create_client, Client
+from supabase import Client
 from app.config.settings import settings
+from app.core.base_repository import (
+    get_supabase_client, is_missing_rpc_error, mark_rpc_missing, rpc_available
+)
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +28,7 @@ class SupabaseService:
         try:
             # Prefer service_role key (bypasses RLS)
             key = settings.SUPABASE_SERVICE_KEY or settings.SUPABASE_KEY
-            self.client = create_client(
+            self.client = get_supabase_client(
                 settings.SUPABASE_URL,
                 key
             )
@@ -152,19 +155,18 @@ class SupabaseService:
             if not self.client:
                 return None
 
+            # Idle cutoff is compared by Postgres; no timestamp parsing here
+            cutoff = datetime.now(timezone.utc) - timedelta(hours=max_idle_hours)
             result = self.client.table('dialogue_sessions') \
-                .select('id, updated_at') \
+                .select('id') \
                 .eq('user_id', user_id) \
+                .gt('updated_at', cutoff.isoformat()) \
                 .order('updated_at', desc=True) \
                 .limit(1) \
                 .execute()
 
             if result.data:
-                session = result.data[0]
-                updated = datetime.fromisoformat(session['updated_at'].replace('Z', '+00:00'))
-                now = datetime.utcnow().replace(tzinfo=updated.tzinfo)
-                if (now - updated).total_seconds() / 3600 < max_idle_hours:
-                    return session['id']
+                return result.data[0]['id']
 
             return self.create_dialogue_session(user_id)
         except Exception as e:
@@ -185,6 +187,28 @@ class SupabaseService:
             if not self.client:
                 return False
 
+            # Insert + session touch in one transaction / round-trip (migration 008)
+            if rpc_available('save_message'):
+                try:
+                    self.client.rpc('save_message', {
+                        'p_session_id': session_id,
+                        'p_user_id': user_id,
+                        'p_query_text': query_text,
+                        'p_response_text': response_text,
+                        'p_sources': sources or [],
+                        'p_is_relevant': is_relevant
+                    }).execute()
+                    return True
+                except Exception as e:
+                    # Only a missing function falls back: after a timeout or a
+                    # reset the transaction may have committed, and the
+                    # two-request path would store the message twice
+                    if not is_missing_rpc_error(e):
+                        logger.error("Error saving message: %s", e)
+                        return False
+                    logger.debug("save_message RPC unavailable, using two requests: %s", e)
+                    mark_rpc_missing('save_message', e)
+
             self.client.table('messages').insert({
                 'session_id': session_id,
                 'user_id': user_id,
@@ -210,15 +234,16 @@ class SupabaseService:
         self,
         user_id: str,
         limit: int = 10,
-        session_id: Optional[str] = None
+        session_id: Optional[str] = None,
+        columns: str = '*, dialogue_sessions(created_at)'
     ) -> List[Dict[str, Any]]:
-        """Get user's message history"""
+        """Get user's message history (columns narrows the select for hot paths)"""
         try:
             if not self.client:
                 return []
 
             query = self.client.table('messages') \
-                .select('*, dialogue_sessions(created_at)') \
+                .select(columns) \
                 .eq('user_id', user_id)
 
             if session_id:
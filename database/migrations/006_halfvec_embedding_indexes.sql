@@ -0,0 +1,265 @@
+-- ============================================================
+-- Migration: half-precision (halfvec) HNSW indexes for embeddings
+-- ============================================================
+-- Требует pgvector >= 0.7.0.
+--
+-- HNSW индексы строятся по content_embedding::halfvec (float16 вместо
+-- float32): индекс в 2 раза меньше, обход графа читает в 2 раза меньше
+-- памяти. pgvector не умеет int8 для vector, halfvec - ближайший вариант
+-- скалярного квантования без потери заметной точности.
+--
+-- Поиск ближайших соседей идёт по halfvec индексу, а similarity и ранг
+-- (vector_search CTE) считаются по исходным float32 векторам, то есть
+-- кандидаты переранжируются с полной точностью.
+-- Колонки content_embedding не меняются, вставка данных та же.
+-- ============================================================
+
+CREATE INDEX IF NOT EXISTS idx_telegram_content_embedding_halfvec
+    ON telegram_threads_content
+    USING hnsw ((content_embedding::halfvec(1024)) halfvec_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
+
+CREATE INDEX IF NOT EXISTS idx_pdf_content_embedding_halfvec
+    ON pdf_documents_content
+    USING hnsw ((content_embedding::halfvec(1536)) halfvec_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
+
+CREATE INDEX IF NOT EXISTS idx_news_content_embedding_halfvec
+    ON news_articles_content
+    USING hnsw ((content_embedding::halfvec(1536)) halfvec_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
+
+-- Telegram (1024d)
+CREATE OR REPLACE FUNCTION search_telegram_hybrid(
+    query_text TEXT,
+    query_embedding vector(1024),
+    match_limit INT DEFAULT 10,
+    similarity_threshold FLOAT DEFAULT 0.5
+)
+RETURNS TABLE (
+    id UUID,
+    thread_id BIGINT,
+    group_name TEXT,
+    content TEXT,
+    similarity FLOAT,
+    rank FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH nearest AS (
+        SELECT
+            t.id,
+            t.thread_id,
+            t.group_name,
+            t.content,
+            t.content_embedding <=> query_embedding AS distance
+        FROM telegram_threads_content t
+        ORDER BY t.content_embedding::halfvec(1024) <=> query_embedding::halfvec(1024)
+        LIMIT match_limit * 2
+    ),
+    vector_search AS (
+        SELECT
+            n.id,
+            n.thread_id,
+            n.group_name,
+            n.content,
+            1 - n.distance AS similarity,
+            ROW_NUMBER() OVER (ORDER BY n.distance) AS rank
+        FROM nearest n
+        WHERE 1 - n.distance > similarity_threshold
+    ),
+    keyword_search AS (
+        SELECT
+            t.id,
+            t.thread_id,
+            t.group_name,
+            t.content,
+            ts_rank(to_tsvector('spanish', t.content), plainto_tsquery('spanish', query_text)) AS rank
+        FROM telegram_threads_content t
+        WHERE to_tsvector('spanish', t.content) @@ plainto_tsquery('spanish', query_text)
+        ORDER BY rank DESC
+        LIMIT match_limit * 2
+    )
+    SELECT
+        COALESCE(v.id, k.id) as id,
+        COALESCE(v.thread_id, k.thread_id) as thread_id,
+        COALESCE(v.group_name, k.group_name) as group_name,
+        COALESCE(v.content, k.content) as content,
+        COALESCE(v.similarity, 0) as similarity,
+        (COALESCE(v.rank, 999) + COALESCE(k.rank, 0)) / 2 as rank
+    FROM vector_search v
+    FULL OUTER JOIN keyword_search k ON v.id = k.id
+    ORDER BY rank DESC
+    LIMIT match_limit;
+END;
+$$;
+
+-- PDF (1536d)
+CREATE OR REPLACE FUNCTION search_pdf_hybrid(
+    query_text TEXT,
+    query_embedding vector(1536),
+    match_limit INT DEFAULT 10,
+    similarity_threshold FLOAT DEFAULT 0.5
+)
+RETURNS TABLE (
+    id UUID,
+    document_id TEXT,
+    document_title TEXT,
+    content TEXT,
+    similarity FLOAT,
+    rank FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH nearest AS (
+        SELECT
+            p.id,
+            p.document_id,
+            p.document_title,
+            p.content,
+            p.content_embedding <=> query_embedding AS distance
+        FROM pdf_documents_content p
+        ORDER BY p.content_embedding::halfvec(1536) <=> query_embedding::halfvec(1536)
+        LIMIT match_limit * 2
+    ),
+    vector_search AS (
+        SELECT
+            n.id,
+            n.document_id,
+            n.document_title,
+            n.content,
+            1 - n.distance AS similarity,
+            ROW_NUMBER() OVER (ORDER BY n.distance) AS rank
+        FROM nearest n
+        WHERE 1 - n.distance > similarity_threshold
+    ),
+    keyword_search AS (
+        SELECT
+            p.id,
+            p.document_id,
+            p.document_title,
+            p.content,
+            ts_rank(to_tsvector('spanish', p.content), plainto_tsquery('spanish', query_text)) AS rank
+        FROM pdf_documents_content p
+        WHERE to_tsvector('spanish', p.content) @@ plainto_tsquery('spanish', query_text)
+        ORDER BY rank DESC
+        LIMIT match_limit * 2
+    )
+    SELECT
+        COALESCE(v.id, k.id) as id,
+        COALESCE(v.document_id, k.document_id) as document_id,
+        COALESCE(v.document_title, k.document_title) as document_title,
+        COALESCE(v.content, k.content) as content,
+        COALESCE(v.similarity, 0) as similarity,
+        (COALESCE(v.rank, 999) + COALESCE(k.rank, 0)) / 2 as rank
+    FROM vector_search v
+    FULL OUTER JOIN keyword_search k ON v.id = k.id
+    ORDER BY rank DESC
+    LIMIT match_limit;
+END;
+$$;
+
+-- News (1536d). Фильтры по дате/источнику/категориям остаются внутри
+-- nearest: они не мешают index scan по ORDER BY ... LIMIT
+CREATE OR REPLACE FUNCTION search_news_hybrid(
+    query_text TEXT,
+    query_embedding vector(1536),
+    match_limit INT DEFAULT 10,
+    similarity_threshold FLOAT DEFAULT 0.5,
+    filter_date_from TIMESTAMPTZ DEFAULT NULL,
+    filter_date_to TIMESTAMPTZ DEFAULT NULL,
+    filter_news_source TEXT DEFAULT NULL,
+    filter_categories TEXT[] DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    article_url TEXT,
+    article_title TEXT,
+    content TEXT,
+    published_at TIMESTAMPTZ,
+    news_source TEXT,
+    categories TEXT[],
+    similarity FLOAT,
+    rank FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH nearest AS (
+        SELECT
+            n.id,
+            n.article_url,
+            n.article_title,
+            n.content,
+            n.published_at,
+            n.news_source,
+            n.categories,
+            n.content_embedding <=> query_embedding AS distance
+        FROM news_articles_content n
+        WHERE (filter_date_from IS NULL OR n.published_at >= filter_date_from)
+            AND (filter_date_to IS NULL OR n.published_at <= filter_date_to)
+            AND (filter_news_source IS NULL OR n.news_source = filter_news_source)
+            AND (filter_categories IS NULL OR n.categories && filter_categories)
+        ORDER BY n.content_embedding::halfvec(1536) <=> query_embedding::halfvec(1536)
+        LIMIT match_limit * 2
+    ),
+    vector_search AS (
+        SELECT
+            nn.id,
+            nn.article_url,
+            nn.article_title,
+            nn.content,
+            nn.published_at,
+            nn.news_source,
+            nn.categories,
+            1 - nn.distance AS similarity,
+            ROW_NUMBER() OVER (ORDER BY nn.distance) AS rank
+        FROM nearest nn
+        WHERE 1 - nn.distance > similarity_threshold
+    ),
+    keyword_search AS (
+        SELECT
+            n.id,
+            n.article_url,
+            n.article_title,
+            n.content,
+            n.published_at,
+            n.news_source,
+            n.categories,
+            ts_rank(to_tsvector('spanish', n.content), plainto_tsquery('spanish', query_text)) AS rank
+        FROM news_articles_content n
+        WHERE to_tsvector('spanish', n.content) @@ plainto_tsquery('spanish', query_text)
+            AND (filter_date_from IS NULL OR n.published_at >= filter_date_from)
+            AND (filter_date_to IS NULL OR n.published_at <= filter_date_to)
+            AND (filter_news_source IS NULL OR n.news_source = filter_news_source)
+            AND (filter_categories IS NULL OR n.categories && filter_categories)
+        ORDER BY rank DESC
+        LIMIT match_limit * 2
+    )
+    SELECT
+        COALESCE(v.id, k.id) as id,
+        COALESCE(v.article_url, k.article_url) as article_url,
+        COALESCE(v.article_title, k.article_title) as article_title,
+        COALESCE(v.content, k.content) as content,
+        COALESCE(v.published_at, k.published_at) as published_at,
+        COALESCE(v.news_source, k.news_source) as news_source,
+        COALESCE(v.categories, k.categories) as categories,
+        COALESCE(v.similarity, 0) as similarity,
+        (COALESCE(v.rank, 999) + COALESCE(k.rank, 0)) / 2 as rank
+    FROM vector_search v
+    FULL OUTER JOIN keyword_search k ON v.id = k.id
+    ORDER BY rank DESC
+    LIMIT match_limit;
+END;
+$$;
+
+-- Старые float32 HNSW индексы после этого не используются функциями
+-- поиска; их можно удалить после проверки планов (EXPLAIN):
+--   DROP INDEX IF EXISTS idx_telegram_content_embedding;
+--   DROP INDEX IF EXISTS idx_pdf_content_embedding;
+--   DROP INDEX IF EXISTS idx_news_content_embedding;
@@ -0,0 +1,34 @@
+-- ============================================================
+-- Migration: PDF + News hybrid search in one RPC call
+-- ============================================================
+-- PDF и News ищут по одному и тому же запросу и одному OpenAI
+-- embedding (1536d). Раньше это были два RPC вызова (два HTTP запроса
+-- к PostgREST, каждый со своим 1536d вектором в теле).
+--
+-- search_pdf_news_hybrid вызывает существующие search_pdf_hybrid и
+-- search_news_hybrid внутри одной транзакции и возвращает
+--   {"pdf": [...], "news": [...]}
+-- одним ответом. Ранжирование и лимиты на источник не меняются.
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION search_pdf_news_hybrid(
+    query_text TEXT,
+    query_embedding vector(1536),
+    match_limit INT DEFAULT 10,
+    similarity_threshold FLOAT DEFAULT 0.5
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'pdf', COALESCE(
+            (SELECT jsonb_agg(p) FROM search_pdf_hybrid(query_text, query_embedding, match_limit, similarity_threshold) p),
+            '[]'::jsonb
+        ),
+        'news', COALESCE(
+            (SELECT jsonb_agg(n) FROM search_news_hybrid(query_text, query_embedding, match_limit, similarity_threshold) n),
+            '[]'::jsonb
+        )
+    );
+$$;
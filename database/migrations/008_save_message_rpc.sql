@@ -0,0 +1,26 @@
+-- ============================================================
+-- Migration: save_message RPC (message insert + session touch)
+-- ============================================================
+-- SupabaseService.save_message делал два запроса к PostgREST:
+-- INSERT в messages и UPDATE dialogue_sessions.updated_at.
+-- Функция выполняет оба в одной транзакции за один round-trip.
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION save_message(
+    p_session_id UUID,
+    p_user_id UUID,
+    p_query_text TEXT,
+    p_response_text TEXT DEFAULT NULL,
+    p_sources JSONB DEFAULT '[]'::jsonb,
+    p_is_relevant BOOLEAN DEFAULT true
+)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    INSERT INTO messages (session_id, user_id, query_text, response_text, sources, is_relevant, created_at)
+    VALUES (p_session_id, p_user_id, p_query_text, p_response_text, p_sources, p_is_relevant, NOW());
+
+    UPDATE dialogue_sessions
+    SET updated_at = NOW()
+    WHERE id = p_session_id;
+$$;
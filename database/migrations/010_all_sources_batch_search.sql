@@ -0,0 +1,32 @@
+-- ============================================================
+-- Migration: Telegram + PDF + News hybrid search in one RPC call
+-- ============================================================
+-- Для большинства типов запросов UnifiedSearchService ищет сразу по
+-- Telegram, PDF и News. После 007 это всё ещё два RPC вызова:
+-- search_pdf_news_hybrid и search_telegram_hybrid (своя модель, 1024d).
+--
+-- search_sources_hybrid принимает оба embedding запроса и возвращает
+--   {"telegram": [...], "pdf": [...], "news": [...]}
+-- одним ответом PostgREST. Ранжирование и лимиты на источник не меняются.
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION search_sources_hybrid(
+    query_text TEXT,
+    query_embedding vector(1536),
+    telegram_query_text TEXT,
+    telegram_embedding vector(1024),
+    match_limit INT DEFAULT 10,
+    similarity_threshold FLOAT DEFAULT 0.5
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT search_pdf_news_hybrid(query_text, query_embedding, match_limit, similarity_threshold)
+        || jsonb_build_object(
+            'telegram', COALESCE(
+                (SELECT jsonb_agg(t) FROM search_telegram_hybrid(telegram_query_text, telegram_embedding, match_limit, similarity_threshold) t),
+                '[]'::jsonb
+            )
+        );
+$$;
@@ -0,0 +1,59 @@
+-- ============================================================
+-- Migration: Truncate content in batch hybrid search responses
+-- ============================================================
+-- Потребители search_pdf_news_hybrid / search_sources_hybrid используют
+-- только начало текста: ResponseGenerator.MAX_CHARS_PER_RESULT (500
+-- символов) в prompt, DocumentSearch - 300-400 символов. Полный content
+-- чанков и тредов передавался через PostgREST и разбирался в Python,
+-- чтобы сразу же быть обрезанным.
+--
+-- Обёртки теперь отдают LEFT(content, 500). Ранжирование выполняется во
+-- внутренних search_*_hybrid по полному тексту и не меняется; сигнатуры
+-- те же, поэтому CREATE OR REPLACE.
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION search_pdf_news_hybrid(
+    query_text TEXT,
+    query_embedding vector(1536),
+    match_limit INT DEFAULT 10,
+    similarity_threshold FLOAT DEFAULT 0.5
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'pdf', COALESCE(
+            (SELECT jsonb_agg(to_jsonb(p) || jsonb_build_object('content', LEFT(p.content, 500)))
+             FROM search_pdf_hybrid(query_text, query_embedding, match_limit, similarity_threshold) p),
+            '[]'::jsonb
+        ),
+        'news', COALESCE(
+            (SELECT jsonb_agg(to_jsonb(n) || jsonb_build_object('content', LEFT(n.content, 500)))
+             FROM search_news_hybrid(query_text, query_embedding, match_limit, similarity_threshold) n),
+            '[]'::jsonb
+        )
+    );
+$$;
+
+CREATE OR REPLACE FUNCTION search_sources_hybrid(
+    query_text TEXT,
+    query_embedding vector(1536),
+    telegram_query_text TEXT,
+    telegram_embedding vector(1024),
+    match_limit INT DEFAULT 10,
+    similarity_threshold FLOAT DEFAULT 0.5
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT search_pdf_news_hybrid(query_text, query_embedding, match_limit, similarity_threshold)
+        || jsonb_build_object(
+            'telegram', COALESCE(
+                (SELECT jsonb_agg(to_jsonb(t) || jsonb_build_object('content', LEFT(t.content, 500)))
+                 FROM search_telegram_hybrid(telegram_query_text, telegram_embedding, match_limit, similarity_threshold) t),
+                '[]'::jsonb
+            )
+        );
+$$;
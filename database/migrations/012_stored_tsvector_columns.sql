@@ -0,0 +1,279 @@
+-- ============================================================
+-- Migration: Stored tsvector columns for keyword search
+-- ============================================================
+-- keyword_search CTE в search_*_hybrid вычислял
+--   to_tsvector('spanish', content)
+-- на каждый запрос: GIN индекс по выражению находил строки, но ts_rank
+-- заново разбирал полный текст каждой найденной строки.
+--
+-- Теперь tsvector хранится в сгенерированной колонке content_tsv
+-- (считается один раз при вставке/обновлении) с GIN индексом по ней.
+-- Для PDF и новостей заголовок документа/статьи входит в тот же tsvector
+-- с весом A (текст - B): поиск идёт по одному полю, а совпадение в
+-- заголовке ранжируется выше, как буст поля.
+--
+-- ADD COLUMN ... STORED переписывает таблицу: применять вне пиковой
+-- нагрузки. Старые индексы по выражению больше не используются и удаляются.
+-- Сигнатуры функций не меняются (CREATE OR REPLACE).
+-- ============================================================
+
+ALTER TABLE telegram_threads_content
+    ADD COLUMN IF NOT EXISTS content_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('spanish', COALESCE(content, ''))) STORED;
+
+ALTER TABLE pdf_documents_content
+    ADD COLUMN IF NOT EXISTS content_tsv tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('spanish', COALESCE(document_title, '')), 'A') ||
+        setweight(to_tsvector('spanish', COALESCE(content, '')), 'B')
+    ) STORED;
+
+ALTER TABLE news_articles_content
+    ADD COLUMN IF NOT EXISTS content_tsv tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('spanish', COALESCE(article_title, '')), 'A') ||
+        setweight(to_tsvector('spanish', COALESCE(content, '')), 'B')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_telegram_content_tsv ON telegram_threads_content USING GIN(content_tsv);
+CREATE INDEX IF NOT EXISTS idx_pdf_content_tsv ON pdf_documents_content USING GIN(content_tsv);
+CREATE INDEX IF NOT EXISTS idx_news_content_tsv ON news_articles_content USING GIN(content_tsv);
+
+DROP INDEX IF EXISTS idx_telegram_content_fts;
+DROP INDEX IF EXISTS idx_pdf_content_fts;
+DROP INDEX IF EXISTS idx_news_content_fts;
+
+-- Telegram (1024d)
+CREATE OR REPLACE FUNCTION search_telegram_hybrid(
+    query_text TEXT,
+    query_embedding vector(1024),
+    match_limit INT DEFAULT 10,
+    similarity_threshold FLOAT DEFAULT 0.5
+)
+RETURNS TABLE (
+    id UUID,
+    thread_id BIGINT,
+    group_name TEXT,
+    content TEXT,
+    similarity FLOAT,
+    rank FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH nearest AS (
+        SELECT
+            t.id,
+            t.thread_id,
+            t.group_name,
+            t.content,
+            t.content_embedding <=> query_embedding AS distance
+        FROM telegram_threads_content t
+        ORDER BY t.content_embedding::halfvec(1024) <=> query_embedding::halfvec(1024)
+        LIMIT match_limit * 2
+    ),
+    vector_search AS (
+        SELECT
+            n.id,
+            n.thread_id,
+            n.group_name,
+            n.content,
+            1 - n.distance AS similarity,
+            ROW_NUMBER() OVER (ORDER BY n.distance) AS rank
+        FROM nearest n
+        WHERE 1 - n.distance > similarity_threshold
+    ),
+    keyword_search AS (
+        SELECT
+            t.id,
+            t.thread_id,
+            t.group_name,
+            t.content,
+            ROW_NUMBER() OVER (ORDER BY ts_rank(t.content_tsv, plainto_tsquery('spanish', query_text)) DESC) AS rank
+        FROM telegram_threads_content t
+        WHERE t.content_tsv @@ plainto_tsquery('spanish', query_text)
+        ORDER BY rank
+        LIMIT match_limit * 2
+    )
+    SELECT
+        COALESCE(v.id, k.id) as id,
+        COALESCE(v.thread_id, k.thread_id) as thread_id,
+        COALESCE(v.group_name, k.group_name) as group_name,
+        COALESCE(v.content, k.content) as content,
+        COALESCE(v.similarity, 0) as similarity,
+        (COALESCE(1.0 / (60 + v.rank), 0) + COALESCE(1.0 / (60 + k.rank), 0))::FLOAT as rank
+    FROM vector_search v
+    FULL OUTER JOIN keyword_search k ON v.id = k.id
+    ORDER BY rank DESC
+    LIMIT match_limit;
+END;
+$$;
+
+-- PDF (1536d)
+CREATE OR REPLACE FUNCTION search_pdf_hybrid(
+    query_text TEXT,
+    query_embedding vector(1536),
+    match_limit INT DEFAULT 10,
+    similarity_threshold FLOAT DEFAULT 0.5
+)
+RETURNS TABLE (
+    id UUID,
+    document_id TEXT,
+    document_title TEXT,
+    content TEXT,
+    similarity FLOAT,
+    rank FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH nearest AS (
+        SELECT
+            p.id,
+            p.document_id,
+            p.document_title,
+            p.content,
+            p.content_embedding <=> query_embedding AS distance
+        FROM pdf_documents_content p
+        ORDER BY p.content_embedding::halfvec(1536) <=> query_embedding::halfvec(1536)
+        LIMIT match_limit * 2
+    ),
+    vector_search AS (
+        SELECT
+            n.id,
+            n.document_id,
+            n.document_title,
+            n.content,
+            1 - n.distance AS similarity,
+            ROW_NUMBER() OVER (ORDER BY n.distance) AS rank
+        FROM nearest n
+        WHERE 1 - n.distance > similarity_threshold
+    ),
+    keyword_search AS (
+        SELECT
+            p.id,
+            p.document_id,
+            p.document_title,
+            p.content,
+            ROW_NUMBER() OVER (ORDER BY ts_rank(p.content_tsv, plainto_tsquery('spanish', query_text)) DESC) AS rank
+        FROM pdf_documents_content p
+        WHERE p.content_tsv @@ plainto_tsquery('spanish', query_text)
+        ORDER BY rank
+        LIMIT match_limit * 2
+    )
+    SELECT
+        COALESCE(v.id, k.id) as id,
+        COALESCE(v.document_id, k.document_id) as document_id,
+        COALESCE(v.document_title, k.document_title) as document_title,
+        COALESCE(v.content, k.content) as content,
+        COALESCE(v.similarity, 0) as similarity,
+        (COALESCE(1.0 / (60 + v.rank), 0) + COALESCE(1.0 / (60 + k.rank), 0))::FLOAT as rank
+    FROM vector_search v
+    FULL OUTER JOIN keyword_search k ON v.id = k.id
+    ORDER BY rank DESC
+    LIMIT match_limit;
+END;
+$$;
+
+-- News (1536d). Фильтры по дате/источнику/категориям остаются внутри
+-- nearest: они не мешают index scan по ORDER BY ... LIMIT
+CREATE OR REPLACE FUNCTION search_news_hybrid(
+    query_text TEXT,
+    query_embedding vector(1536),
+    match_limit INT DEFAULT 10,
+    similarity_threshold FLOAT DEFAULT 0.5,
+    filter_date_from TIMESTAMPTZ DEFAULT NULL,
+    filter_date_to TIMESTAMPTZ DEFAULT NULL,
+    filter_news_source TEXT DEFAULT NULL,
+    filter_categories TEXT[] DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    article_url TEXT,
+    article_title TEXT,
+    content TEXT,
+    published_at TIMESTAMPTZ,
+    news_source TEXT,
+    categories TEXT[],
+    similarity FLOAT,
+    rank FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH nearest AS (
+        SELECT
+            n.id,
+            n.article_url,
+            n.article_title,
+            n.content,
+            n.published_at,
+            n.news_source,
+            n.categories,
+            n.content_embedding <=> query_embedding AS distance
+        FROM news_articles_content n
+        WHERE (filter_date_from IS NULL OR n.published_at >= filter_date_from)
+            AND (filter_date_to IS NULL OR n.published_at <= filter_date_to)
+            AND (filter_news_source IS NULL OR n.news_source = filter_news_source)
+            AND (filter_categories IS NULL OR n.categories && filter_categories)
+        ORDER BY n.content_embedding::halfvec(1536) <=> query_embedding::halfvec(1536)
+        LIMIT match_limit * 2
+    ),
+    vector_search AS (
+        SELECT
+            nn.id,
+            nn.article_url,
+            nn.article_title,
+            nn.content,
+            nn.published_at,
+            nn.news_source,
+            nn.categories,
+            1 - nn.distance AS similarity,
+            ROW_NUMBER() OVER (ORDER BY nn.distance) AS rank
+        FROM nearest nn
+        WHERE 1 - nn.distance > similarity_threshold
+    ),
+    keyword_search AS (
+        SELECT
+            n.id,
+            n.article_url,
+            n.article_title,
+            n.content,
+            n.published_at,
+            n.news_source,
+            n.categories,
+            ROW_NUMBER() OVER (ORDER BY ts_rank(n.content_tsv, plainto_tsquery('spanish', query_text)) DESC) AS rank
+        FROM news_articles_content n
+        WHERE n.content_tsv @@ plainto_tsquery('spanish', query_text)
+            AND (filter_date_from IS NULL OR n.published_at >= filter_date_from)
+            AND (filter_date_to IS NULL OR n.published_at <= filter_date_to)
+            AND (filter_news_source IS NULL OR n.news_source = filter_news_source)
+            AND (filter_categories IS NULL OR n.categories && filter_categories)
+        ORDER BY rank
+        LIMIT match_limit * 2
+    )
+    SELECT
+        COALESCE(v.id, k.id) as id,
+        COALESCE(v.article_url, k.article_url) as article_url,
+        COALESCE(v.article_title, k.article_title) as article_title,
+        COALESCE(v.content, k.content) as content,
+        COALESCE(v.published_at, k.published_at) as published_at,
+        COALESCE(v.news_source, k.news_source) as news_source,
+        COALESCE(v.categories, k.categories) as categories,
+        COALESCE(v.similarity, 0) as similarity,
+        (COALESCE(1.0 / (60 + v.rank), 0) + COALESCE(1.0 / (60 + k.rank), 0))::FLOAT as rank
+    FROM vector_search v
+    FULL OUTER JOIN keyword_search k ON v.id = k.id
+    ORDER BY rank DESC
+    LIMIT match_limit;
+END;
+$$;
+
+-- Старые float32 HNSW индексы после этого не используются функциями
+-- поиска; их можно удалить после проверки планов (EXPLAIN):
+--   DROP INDEX IF EXISTS idx_telegram_content_embedding;
+--   DROP INDEX IF EXISTS idx_pdf_content_embedding;
+--   DROP INDEX IF EXISTS idx_news_content_embedding;
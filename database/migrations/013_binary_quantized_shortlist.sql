@@ -0,0 +1,220 @@
+-- ============================================================
+-- Migration: Binary-quantized HNSW shortlist for 1536d embeddings
+-- ============================================================
+-- Требует pgvector >= 0.7.0 (binary_quantize, bit_hamming_ops).
+--
+-- 006 перевёл HNSW индексы на halfvec (2x меньше float32). Для PDF и
+-- новостей (OpenAI text-embedding-3-small, 1536d) индекс строится по
+-- binary_quantize(content_embedding)::bit(1536): 1 бит на измерение,
+-- в 16 раз меньше halfvec, расстояние Хэмминга вместо косинуса.
+--
+-- Поиск в два шага:
+--   shortlist - match_limit * 8 кандидатов по bit индексу (oversampling
+--               компенсирует грубость бинарного расстояния);
+--               hnsw.ef_search (по умолчанию 40) ограничивает число строк
+--               из индекса, поэтому функции выставляют его в 100;
+--   nearest   - точное косинусное расстояние по float32 векторам только
+--               для shortlist, дальше как раньше (порог, RRF).
+--
+-- Telegram (e5, 1024d) остаётся на halfvec: бинарное квантование e5
+-- заметно хуже по полноте, а таблица небольшая.
+-- Сигнатуры функций не меняются (CREATE OR REPLACE).
+-- ============================================================
+
+CREATE INDEX IF NOT EXISTS idx_pdf_content_embedding_bit
+    ON pdf_documents_content
+    USING hnsw ((binary_quantize(content_embedding)::bit(1536)) bit_hamming_ops)
+    WITH (m = 16, ef_construction = 64);
+
+CREATE INDEX IF NOT EXISTS idx_news_content_embedding_bit
+    ON news_articles_content
+    USING hnsw ((binary_quantize(content_embedding)::bit(1536)) bit_hamming_ops)
+    WITH (m = 16, ef_construction = 64);
+
+-- halfvec индексы PDF и новостей больше не используются функциями поиска
+DROP INDEX IF EXISTS idx_pdf_content_embedding_halfvec;
+DROP INDEX IF EXISTS idx_news_content_embedding_halfvec;
+
+-- PDF (1536d)
+CREATE OR REPLACE FUNCTION search_pdf_hybrid(
+    query_text TEXT,
+    query_embedding vector(1536),
+    match_limit INT DEFAULT 10,
+    similarity_threshold FLOAT DEFAULT 0.5
+)
+RETURNS TABLE (
+    id UUID,
+    document_id TEXT,
+    document_title TEXT,
+    content TEXT,
+    similarity FLOAT,
+    rank FLOAT
+)
+LANGUAGE plpgsql
+SET hnsw.ef_search = 100
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH shortlist AS (
+        SELECT p.id
+        FROM pdf_documents_content p
+        ORDER BY binary_quantize(p.content_embedding)::bit(1536) <~> binary_quantize(query_embedding)
+        LIMIT match_limit * 8
+    ),
+    nearest AS (
+        SELECT
+            p.id,
+            p.document_id,
+            p.document_title,
+            p.content,
+            p.content_embedding <=> query_embedding AS distance
+        FROM shortlist s
+        JOIN pdf_documents_content p ON p.id = s.id
+        ORDER BY distance
+        LIMIT match_limit * 2
+    ),
+    vector_search AS (
+        SELECT
+            n.id,
+            n.document_id,
+            n.document_title,
+            n.content,
+            1 - n.distance AS similarity,
+            ROW_NUMBER() OVER (ORDER BY n.distance) AS rank
+        FROM nearest n
+        WHERE 1 - n.distance > similarity_threshold
+    ),
+    keyword_search AS (
+        SELECT
+            p.id,
+            p.document_id,
+            p.document_title,
+            p.content,
+            ROW_NUMBER() OVER (ORDER BY ts_rank(p.content_tsv, plainto_tsquery('spanish', query_text)) DESC) AS rank
+        FROM pdf_documents_content p
+        WHERE p.content_tsv @@ plainto_tsquery('spanish', query_text)
+        ORDER BY rank
+        LIMIT match_limit * 2
+    )
+    SELECT
+        COALESCE(v.id, k.id) as id,
+        COALESCE(v.document_id, k.document_id) as document_id,
+        COALESCE(v.document_title, k.document_title) as document_title,
+        COALESCE(v.content, k.content) as content,
+        COALESCE(v.similarity, 0) as similarity,
+        (COALESCE(1.0 / (60 + v.rank), 0) + COALESCE(1.0 / (60 + k.rank), 0))::FLOAT as rank
+    FROM vector_search v
+    FULL OUTER JOIN keyword_search k ON v.id = k.id
+    ORDER BY rank DESC
+    LIMIT match_limit;
+END;
+$$;
+
+-- News (1536d). Фильтры по дате/источнику/категориям остаются внутри
+-- nearest: они не мешают index scan по ORDER BY ... LIMIT
+CREATE OR REPLACE FUNCTION search_news_hybrid(
+    query_text TEXT,
+    query_embedding vector(1536),
+    match_limit INT DEFAULT 10,
+    similarity_threshold FLOAT DEFAULT 0.5,
+    filter_date_from TIMESTAMPTZ DEFAULT NULL,
+    filter_date_to TIMESTAMPTZ DEFAULT NULL,
+    filter_news_source TEXT DEFAULT NULL,
+    filter_categories TEXT[] DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    article_url TEXT,
+    article_title TEXT,
+    content TEXT,
+    published_at TIMESTAMPTZ,
+    news_source TEXT,
+    categories TEXT[],
+    similarity FLOAT,
+    rank FLOAT
+)
+LANGUAGE plpgsql
+SET hnsw.ef_search = 100
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH shortlist AS (
+        SELECT n.id
+        FROM news_articles_content n
+        WHERE (filter_date_from IS NULL OR n.published_at >= filter_date_from)
+            AND (filter_date_to IS NULL OR n.published_at <= filter_date_to)
+            AND (filter_news_source IS NULL OR n.news_source = filter_news_source)
+            AND (filter_categories IS NULL OR n.categories && filter_categories)
+        ORDER BY binary_quantize(n.content_embedding)::bit(1536) <~> binary_quantize(query_embedding)
+        LIMIT match_limit * 8
+    ),
+    nearest AS (
+        SELECT
+            n.id,
+            n.article_url,
+            n.article_title,
+            n.content,
+            n.published_at,
+            n.news_source,
+            n.categories,
+            n.content_embedding <=> query_embedding AS distance
+        FROM shortlist s
+        JOIN news_articles_content n ON n.id = s.id
+        ORDER BY distance
+        LIMIT match_limit * 2
+    ),
+    vector_search AS (
+        SELECT
+            nn.id,
+            nn.article_url,
+            nn.article_title,
+            nn.content,
+            nn.published_at,
+            nn.news_source,
+            nn.categories,
+            1 - nn.distance AS similarity,
+            ROW_NUMBER() OVER (ORDER BY nn.distance) AS rank
+        FROM nearest nn
+        WHERE 1 - nn.distance > similarity_threshold
+    ),
+    keyword_search AS (
+        SELECT
+            n.id,
+            n.article_url,
+            n.article_title,
+            n.content,
+            n.published_at,
+            n.news_source,
+            n.categories,
+            ROW_NUMBER() OVER (ORDER BY ts_rank(n.content_tsv, plainto_tsquery('spanish', query_text)) DESC) AS rank
+        FROM news_articles_content n
+        WHERE n.content_tsv @@ plainto_tsquery('spanish', query_text)
+            AND (filter_date_from IS NULL OR n.published_at >= filter_date_from)
+            AND (filter_date_to IS NULL OR n.published_at <= filter_date_to)
+            AND (filter_news_source IS NULL OR n.news_source = filter_news_source)
+            AND (filter_categories IS NULL OR n.categories && filter_categories)
+        ORDER BY rank
+        LIMIT match_limit * 2
+    )
+    SELECT
+        COALESCE(v.id, k.id) as id,
+        COALESCE(v.article_url, k.article_url) as article_url,
+        COALESCE(v.article_title, k.article_title) as article_title,
+        COALESCE(v.content, k.content) as content,
+        COALESCE(v.published_at, k.published_at) as published_at,
+        COALESCE(v.news_source, k.news_source) as news_source,
+        COALESCE(v.categories, k.categories) as categories,
+        COALESCE(v.similarity, 0) as similarity,
+        (COALESCE(1.0 / (60 + v.rank), 0) + COALESCE(1.0 / (60 + k.rank), 0))::FLOAT as rank
+    FROM vector_search v
+    FULL OUTER JOIN keyword_search k ON v.id = k.id
+    ORDER BY rank DESC
+    LIMIT match_limit;
+END;
+$$;
+
+-- Старые float32 HNSW индексы после этого не используются функциями
+-- поиска; их можно удалить после проверки планов (EXPLAIN):
+--   DROP INDEX IF EXISTS idx_telegram_content_embedding;
+--   DROP INDEX IF EXISTS idx_pdf_content_embedding;
+--   DROP INDEX IF EXISTS idx_news_content_embedding;
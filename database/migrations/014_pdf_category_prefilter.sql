@@ -0,0 +1,144 @@
+-- ============================================================
+-- Migration: Category pre-filter for PDF hybrid search
+-- ============================================================
+-- Корпус PDF - законы и регламенты, каждый со своей категорией (irpf,
+-- iva, sociedades). Вопрос явно про один налог искал ближайших соседей
+-- по всем законам сразу; теперь UnifiedSearchService передаёт
+-- категорию-подсказку, и кандидаты фильтруются до ранжирования:
+-- bit shortlist и keyword поиск идут только по документам этой категории.
+--
+-- Новый необязательный параметр меняет сигнатуры. CREATE OR REPLACE с
+-- другим набором аргументов создал бы перегрузку и неоднозначный вызов
+-- через PostgREST, поэтому функции пересоздаются (DROP + CREATE).
+-- Без параметра (NULL) поведение прежнее.
+-- ============================================================
+
+DROP FUNCTION IF EXISTS search_sources_hybrid(TEXT, vector, TEXT, vector, INT, FLOAT);
+DROP FUNCTION IF EXISTS search_pdf_news_hybrid(TEXT, vector, INT, FLOAT);
+DROP FUNCTION IF EXISTS search_pdf_hybrid(TEXT, vector, INT, FLOAT);
+
+-- PDF (1536d), фильтр по категориям и в shortlist, и в keyword поиске
+CREATE FUNCTION search_pdf_hybrid(
+    query_text TEXT,
+    query_embedding vector(1536),
+    match_limit INT DEFAULT 10,
+    similarity_threshold FLOAT DEFAULT 0.5,
+    filter_categories TEXT[] DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    document_id TEXT,
+    document_title TEXT,
+    content TEXT,
+    similarity FLOAT,
+    rank FLOAT
+)
+LANGUAGE plpgsql
+SET hnsw.ef_search = 100
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH shortlist AS (
+        SELECT p.id
+        FROM pdf_documents_content p
+        WHERE filter_categories IS NULL OR p.categories && filter_categories
+        ORDER BY binary_quantize(p.content_embedding)::bit(1536) <~> binary_quantize(query_embedding)
+        LIMIT match_limit * 8
+    ),
+    nearest AS (
+        SELECT
+            p.id,
+            p.document_id,
+            p.document_title,
+            p.content,
+            p.content_embedding <=> query_embedding AS distance
+        FROM shortlist s
+        JOIN pdf_documents_content p ON p.id = s.id
+        ORDER BY distance
+        LIMIT match_limit * 2
+    ),
+    vector_search AS (
+        SELECT
+            n.id,
+            n.document_id,
+            n.document_title,
+            n.content,
+            1 - n.distance AS similarity,
+            ROW_NUMBER() OVER (ORDER BY n.distance) AS rank
+        FROM nearest n
+        WHERE 1 - n.distance > similarity_threshold
+    ),
+    keyword_search AS (
+        SELECT
+            p.id,
+            p.document_id,
+            p.document_title,
+            p.content,
+            ROW_NUMBER() OVER (ORDER BY ts_rank(p.content_tsv, plainto_tsquery('spanish', query_text)) DESC) AS rank
+        FROM pdf_documents_content p
+        WHERE p.content_tsv @@ plainto_tsquery('spanish', query_text)
+            AND (filter_categories IS NULL OR p.categories && filter_categories)
+        ORDER BY rank
+        LIMIT match_limit * 2
+    )
+    SELECT
+        COALESCE(v.id, k.id) as id,
+        COALESCE(v.document_id, k.document_id) as document_id,
+        COALESCE(v.document_title, k.document_title) as document_title,
+        COALESCE(v.content, k.content) as content,
+        COALESCE(v.similarity, 0) as similarity,
+        (COALESCE(1.0 / (60 + v.rank), 0) + COALESCE(1.0 / (60 + k.rank), 0))::FLOAT as rank
+    FROM vector_search v
+    FULL OUTER JOIN keyword_search k ON v.id = k.id
+    ORDER BY rank DESC
+    LIMIT match_limit;
+END;
+$$;
+
+CREATE FUNCTION search_pdf_news_hybrid(
+    query_text TEXT,
+    query_embedding vector(1536),
+    match_limit INT DEFAULT 10,
+    similarity_threshold FLOAT DEFAULT 0.5,
+    pdf_categories TEXT[] DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'pdf', COALESCE(
+            (SELECT jsonb_agg(to_jsonb(p) || jsonb_build_object('content', LEFT(p.content, 500)))
+             FROM search_pdf_hybrid(query_text, query_embedding, match_limit, similarity_threshold, pdf_categories) p),
+            '[]'::jsonb
+        ),
+        'news', COALESCE(
+            (SELECT jsonb_agg(to_jsonb(n) || jsonb_build_object('content', LEFT(n.content, 500)))
+             FROM search_news_hybrid(query_text, query_embedding, match_limit, similarity_threshold) n),
+            '[]'::jsonb
+        )
+    );
+$$;
+
+CREATE FUNCTION search_sources_hybrid(
+    query_text TEXT,
+    query_embedding vector(1536),
+    telegram_query_text TEXT,
+    telegram_embedding vector(1024),
+    match_limit INT DEFAULT 10,
+    similarity_threshold FLOAT DEFAULT 0.5,
+    pdf_categories TEXT[] DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT search_pdf_news_hybrid(query_text, query_embedding, match_limit, similarity_threshold, pdf_categories)
+        || jsonb_build_object(
+            'telegram', COALESCE(
+                (SELECT jsonb_agg(to_jsonb(t) || jsonb_build_object('content', LEFT(t.content, 500)))
+                 FROM search_telegram_hybrid(telegram_query_text, telegram_embedding, match_limit, similarity_threshold) t),
+                '[]'::jsonb
+            )
+        );
+$$;
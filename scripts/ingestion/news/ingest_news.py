@@ -19,6 +19,7 @@ import hashlib
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
+from urllib.parse import urlparse
 
 project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
@@ -27,6 +28,7 @@ from dotenv import load_dotenv
 load_dotenv(project_root / ".env")
 
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 from supabase import create_client
 from openai import OpenAI
@@ -75,6 +77,13 @@ SOURCES = [
     },
 ]
 
+# One keep-alive session for every fetch: feeds and their articles mostly
+# live on the same few hosts, so connections (and TLS) are reused
+SESSION = requests.Session()
+SESSION.headers.update({"User-Agent": USER_AGENT})
+SESSION.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=32))
+SESSION.mount("http://", HTTPAdapter(pool_connections=8, pool_maxsize=32))
+
 TAX_KEYWORDS = [
     "irpf", "iva", "impuesto", "hacienda", "tributaria", "fiscal", "renta",
     "autónomo", "autonomo", "declaración", "modelo", "deducción", "exención",
@@ -86,7 +95,7 @@ TAX_KEYWORDS = [
 def fetch_page(url: str) -> Optional[str]:
     """Fetch a web page with proper headers."""
     try:
-        resp = requests.get(url, headers={"User-Agent": USER_AGENT}, timeout=15)
+        resp = SESSION.get(url, timeout=15)
         resp.raise_for_status()
         return resp.text
     except Exception as e:
@@ -144,6 +153,10 @@ def parse_web_articles(html: str, source: Dict, base_url: str) -> List[Dict]:
     soup = BeautifulSoup(html, "html.parser")
     articles = []
 
+    # Origin for relative links, computed once per page instead of per link
+    parsed = urlparse(base_url)
+    origin = parsed.scheme + "://" + parsed.netloc
+
     # Find article links — common patterns
     for link in soup.find_all("a", href=True):
         href = link.get("href", "")
@@ -157,9 +170,7 @@ def parse_web_articles(html: str, source: Dict, base_url: str) -> List[Dict]:
 
         # Build absolute URL
         if href.startswith("/"):
-            from urllib.parse import urlparse
-            parsed = urlparse(base_url)
-            href = f"{parsed.scheme}://{parsed.netloc}{href}"
+            href = origin + href
         elif not href.startswith("http"):
             continue
 
@@ -271,30 +282,34 @@ def main():
 
     print(f"\n📊 Total new articles: {len(all_articles)}")
 
-    # Generate embeddings
-    print("\n🧠 Generating embeddings...")
-    for i in range(0, len(all_articles), 50):
-        batch = all_articles[i:i + 50]
-        texts = [a["content"][:8000] for a in batch]
-        embeddings = generate_embeddings(texts, openai_client)
-        for j, emb in enumerate(embeddings):
-            all_articles[i + j]["content_embedding"] = emb
-        print(f"   Embedded {min(i + 50, len(all_articles))}/{len(all_articles)}")
-
-    # Insert into Supabase
-    print(f"\n💾 Inserting into Supabase...")
+    # Embed and insert batch by batch (one pass over the articles)
+    print("\n🧠 Embedding and inserting into Supabase...")
     inserted = 0
-    for article in all_articles:
+    for i in range(0, len(all_articles), BATCH_SIZE):
+        batch = all_articles[i:i + BATCH_SIZE]
+        embeddings = generate_embeddings([a["content"][:8000] for a in batch], openai_client)
+        for article, emb in zip(batch, embeddings):
+            article["content_embedding"] = emb
+
         try:
-            supabase.table("news_articles_content").insert(article).execute()
-            inserted += 1
+            result = supabase.table("news_articles_content").insert(batch).execute()
+            count = len(result.data) if result.data else 0
+            inserted += count
+            print(f"   ✅ Batch {i // BATCH_SIZE + 1}: {count} articles inserted")
         except Exception as e:
-            if "duplicate" in str(e).lower():
-                pass  # skip duplicates
-            else:
-                print(f"   ❌ Failed: {article['article_title'][:50]}: {e}")
+            print(f"   ⚠️ Batch {i // BATCH_SIZE + 1} failed ({e}), inserting one by one")
+            for article in batch:
+                try:
+                    supabase.table("news_articles_content").insert(article).execute()
+                    inserted += 1
+                except Exception as e2:
+                    if "duplicate" in str(e2).lower():
+                        pass  # skip duplicates
+                    else:
+                        print(f"   ❌ Failed: {article['article_title'][:50]}: {e2}")
 
     print(f"\n🎉 Done! Inserted {inserted}/{len(all_articles)} articles into news_articles_content")
+    SESSION.close()
 
 
 if __name__ == "__main__":
@@ -6,12 +6,13 @@
 - IT Autonomos: все треды с ≥2 сообщениями
 - Nomads: последний год + ≥2 сообщений + налоговые темы
 """
-import json
 import sys
 from pathlib import Path
 from datetime import datetime, timezone
 from typing import List, Dict, Any
 
+import orjson
+
 # Добавляем корень проекта в PYTHONPATH
 project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
@@ -35,9 +36,9 @@ TAX_KEYWORDS = [
 
 
 def load_telegram_data(file_path: str) -> dict:
-    """Загрузка данных из JSON"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    """Загрузка данных из JSON (orjson парсит байты напрямую, без декодирования в str)"""
+    with open(file_path, 'rb') as f:
+        return orjson.loads(f.read())
 
 
 def filter_it_autonomos(threads: List[Dict]) -> List[Dict]:
@@ -68,23 +69,27 @@ def filter_nomads(threads: List[Dict]) -> List[Dict]:
     """
     start_date = datetime(2024, 10, 1, tzinfo=timezone.utc)
     end_date = datetime(2025, 10, 31, tzinfo=timezone.utc)
+    # Ключевые слова приводим к нижнему регистру один раз, а не для каждого треда
+    keywords = tuple(keyword.lower() for keyword in TAX_KEYWORDS)
 
     filtered = []
 
+    # Один проход, дешёвые проверки первыми: сравнение числа,
+    # затем разбор даты, и только потом склейка текста и поиск keywords
     for thread in threads:
         try:
-            # Фильтр по дате
-            thread_date = datetime.fromisoformat(thread['first_message_date'].replace('Z', '+00:00'))
-            if not (start_date <= thread_date <= end_date):
-                continue
-
             # Фильтр по количеству сообщений
             if thread['message_count'] < 2:
                 continue
 
+            # Фильтр по дате (fromisoformat в Python 3.11+ сам понимает суффикс Z)
+            thread_date = datetime.fromisoformat(thread['first_message_date'])
+            if not (start_date <= thread_date <= end_date):
+                continue
+
             # Фильтр по keywords
-            content_text = ' '.join([msg.get('text', '').lower() for msg in thread.get('messages', [])])
-            has_keywords = any(keyword.lower() in content_text for keyword in TAX_KEYWORDS)
+            content_text = ' '.join(msg.get('text', '') for msg in thread.get('messages', [])).lower()
+            has_keywords = any(keyword in content_text for keyword in keywords)
 
             if has_keywords:
                 filtered.append(thread)
@@ -127,7 +132,12 @@ def calculate_quality_score(thread: Dict, content: str) -> float:
     return min(base_score, 1.0)
 
 
-def transform_thread(thread: Dict, group_name: str, embedding: List[float]) -> Dict[str, Any]:
+def transform_thread(
+    thread: Dict,
+    group_name: str,
+    embedding: List[float],
+    content: str
+) -> Dict[str, Any]:
     """
     Преобразование треда в формат БД
 
@@ -135,11 +145,11 @@ def transform_thread(thread: Dict, group_name: str, embedding: List[float]) -> D
         thread: Исходные данные треда
         group_name: Название группы
         embedding: Вектор embedding
+        content: Текст треда (уже собранный extract_content для embeddings)
 
     Returns:
         Запись для БД
     """
-    content = extract_content(thread)
     quality_score = calculate_quality_score(thread, content)
 
     return {
@@ -244,13 +254,13 @@ def migrate_telegram(data_dir: str = 'data'):
     print(f"\n⏳ Подготовка данных для загрузки...")
     transformed_threads = []
 
-    for (thread, group_name), embedding in zip(all_threads, embeddings):
+    for (thread, group_name), embedding, content in zip(all_threads, embeddings, contents):
         if embedding is None:
             print(f"  ⚠️ Пропускаем тред {thread['thread_id']} (нет embedding)")
             continue
 
         try:
-            record = transform_thread(thread, group_name, embedding)
+            record = transform_thread(thread, group_name, embedding, content)
             transformed_threads.append(record)
         except Exception as e:
             print(f"  ⚠️ Ошибка при преобразовании треда {thread['thread_id']}: {e}")
@@ -272,8 +282,8 @@ def migrate_telegram(data_dir: str = 'data'):
 
     # Статистика по группам
     print(f"\n📊 Статистика по группам:")
-    it_count = len([t for t in repo.get_by_group('it_autonomos_spain', limit=10000)])
-    nomads_count = len([t for t in repo.get_by_group('chat_for_nomads', limit=10000)])
+    it_count = repo.count_by_group('it_autonomos_spain')
+    nomads_count = repo.count_by_group('chat_for_nomads')
     print(f"  IT Autonomos: {it_count:,} тредов")
     print(f"  Nomads: {nomads_count:,} тредов")
 
@@ -7,6 +7,7 @@ import sys
 import os
 import json
 import asyncio
+import orjson
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List
 
@@ -35,8 +36,8 @@ class ThreadUpdater:
     def load_existing_threads(self, file_path: str) -> dict:
         """Load existing threads from JSON file"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(file_path, 'rb') as f:
+                return orjson.loads(f.read())
         except FileNotFoundError:
             print(f"⚠️  File {file_path} not found. Run download_full_history.py first!")
             return None
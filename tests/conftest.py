@@ -0,0 +1,14 @@
+"""
+Общие настройки тестов
+
+Модули сервисов создают глобальные экземпляры при импорте (Supabase клиент,
+модель HuggingFace), поэтому до импорта app задаём фиктивное окружение:
+клиент создаётся без запросов к сети, а модель не скачивается (offline),
+и сервис поиска работает без Telegram embeddings
+"""
+import os
+
+os.environ.setdefault("SUPABASE_URL", "https://test.supabase.co")
+os.environ.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.test")
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
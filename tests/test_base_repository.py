@@ -0,0 +1,58 @@
+"""
+Тесты распознавания отсутствующих RPC функций (base_repository)
+"""
+import pytest
+
+from app.core import base_repository
+from app.core.base_repository import is_missing_rpc_error, mark_rpc_missing, rpc_available
+
+
+@pytest.fixture(autouse=True)
+def clear_missing_rpcs(monkeypatch):
+    monkeypatch.setattr(base_repository, "_missing_rpc_until", {})
+
+
+@pytest.mark.parametrize("message", [
+    "{'code': 'PGRST202', 'message': 'Could not find the function public.save_message"
+    "(p_query_text, p_session_id) in the schema cache'}",
+    "function foo(text) does not exist",
+    "{'code': '42883', 'message': 'function public.search_sources_hybrid(text, vector) "
+    "does not exist'}",
+])
+def test_missing_function_errors(message):
+    assert is_missing_rpc_error(Exception(message))
+
+
+@pytest.mark.parametrize("message", [
+    "column p.content_tsv does not exist",
+    # Отсутствующая колонка внутри существующей функции: функция упомянута
+    # только в контексте ошибки
+    "{'code': '42703', 'message': 'column p.content_tsv does not exist', 'details': "
+    "'PL/pgSQL function search_pdf_hybrid(text,vector,integer,double precision) line 3'}",
+    'relation "pdf_documents_content" does not exist',
+    'type "halfvec" does not exist',
+    "The read operation timed out",
+    "[Errno 104] Connection reset by peer",
+])
+def test_other_errors_are_not_missing_function(message):
+    assert not is_missing_rpc_error(Exception(message))
+
+
+def test_mark_rpc_missing_only_for_missing_function():
+    mark_rpc_missing("search_pdf_news_hybrid", Exception("The read operation timed out"))
+    assert rpc_available("search_pdf_news_hybrid")
+
+    mark_rpc_missing("search_pdf_news_hybrid", Exception("PGRST202"))
+    assert not rpc_available("search_pdf_news_hybrid")
+    assert rpc_available("search_sources_hybrid")
+
+
+def test_missing_rpc_is_retried_after_timeout(monkeypatch):
+    now = [1_000.0]
+    monkeypatch.setattr(base_repository.time, "monotonic", lambda: now[0])
+
+    mark_rpc_missing("save_message", Exception("PGRST202"))
+    assert not rpc_available("save_message")
+
+    now[0] += base_repository.MISSING_RPC_RETRY_SECONDS
+    assert rpc_available("save_message")
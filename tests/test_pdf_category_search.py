@@ -0,0 +1,125 @@
+"""
+Тесты фильтра PDF по категориям: определение налога в запросе и повтор
+RPC без фильтра на БД без migration 014
+"""
+import pytest
+
+from app.core import base_repository
+from app.core.base_repository import rpc_available
+from app.repositories.pdf_repository import PDFRepository
+from app.services.search.unified_search_service import pdf_category_hint
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("¿Cuál es el tipo de IVA para restaurantes?", ["iva"]),
+    ("declaración de la renta 2024", ["irpf"]),
+    ("retenciones IRPF autónomos", ["irpf"]),
+    ("impuesto sobre sociedades", ["sociedades"]),
+])
+def test_single_tax_is_detected(query, expected):
+    assert pdf_category_hint(query) == expected
+
+
+@pytest.mark.parametrize("query", [
+    "IVA e IRPF de un autónomo",
+    "renta y sociedades",
+    "cómo presentar el modelo 303",
+])
+def test_several_or_no_taxes_do_not_filter(query):
+    assert pdf_category_hint(query) is None
+
+
+@pytest.mark.parametrize("query", ["cuenta activa", "la deriva fiscal", "inactiva"])
+def test_iva_matches_whole_word_only(query):
+    assert pdf_category_hint(query) is None
+
+
+class FakeRPC:
+    def __init__(self, client, name, params):
+        self.client = client
+        self.name = name
+        self.params = params
+
+    def execute(self):
+        self.client.calls.append((self.name, self.params))
+        error = self.client.errors.pop(0) if self.client.errors else None
+        if error is not None:
+            raise error
+        return "result"
+
+
+class FakeClient:
+    """Supabase клиент: записывает RPC вызовы, ошибки отдаёт по очереди"""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = []
+
+    def rpc(self, name, params):
+        return FakeRPC(self, name, params)
+
+
+@pytest.fixture(autouse=True)
+def clear_missing_rpcs(monkeypatch):
+    monkeypatch.setattr(base_repository, "_missing_rpc_until", {})
+
+
+@pytest.fixture
+def make_repo():
+    def make(*errors):
+        repo = PDFRepository()
+        repo.client = FakeClient(errors)
+        return repo
+    return make
+
+
+async def test_categories_are_sent_when_supported(make_repo):
+    repo = make_repo()
+    result = await repo._rpc_with_categories(
+        'search_pdf_news_hybrid', {'match_limit': 5}, 'pdf_categories', ['iva']
+    )
+
+    assert result == "result"
+    assert repo.client.calls == [
+        ('search_pdf_news_hybrid', {'match_limit': 5, 'pdf_categories': ['iva']})
+    ]
+
+
+async def test_missing_parameter_retries_without_filter(make_repo):
+    repo = make_repo(Exception("{'code': 'PGRST202', 'message': 'Could not find the function'}"))
+    result = await repo._rpc_with_categories(
+        'search_pdf_news_hybrid', {'match_limit': 5}, 'pdf_categories', ['iva']
+    )
+
+    assert result == "result"
+    assert repo.client.calls == [
+        ('search_pdf_news_hybrid', {'match_limit': 5, 'pdf_categories': ['iva']}),
+        ('search_pdf_news_hybrid', {'match_limit': 5}),
+    ]
+    # Отключён только вариант с категориями, сама функция доступна
+    assert not rpc_available('search_pdf_news_hybrid:pdf_categories')
+    assert rpc_available('search_pdf_news_hybrid')
+
+    # Следующий запрос сразу идёт без фильтра
+    await repo._rpc_with_categories(
+        'search_pdf_news_hybrid', {'match_limit': 5}, 'pdf_categories', ['iva']
+    )
+    assert repo.client.calls[-1] == ('search_pdf_news_hybrid', {'match_limit': 5})
+
+
+async def test_other_errors_are_reraised(make_repo):
+    repo = make_repo(TimeoutError("The read operation timed out"))
+    with pytest.raises(TimeoutError):
+        await repo._rpc_with_categories(
+            'search_sources_hybrid', {'match_limit': 5}, 'pdf_categories', ['irpf']
+        )
+
+    assert len(repo.client.calls) == 1
+    assert rpc_available('search_sources_hybrid:pdf_categories')
+
+
+async def test_no_categories_calls_once_without_filter(make_repo):
+    repo = make_repo()
+    await repo._rpc_with_categories('search_pdf_hybrid', {'match_limit': 5}, 'filter_categories', None)
+
+    assert repo.client.calls == [('search_pdf_hybrid', {'match_limit': 5})]
@@ -0,0 +1,137 @@
+"""
+Тесты кэша результатов UnifiedSearchService: попадание, промах, TTL,
+копии Context и отказ от кэширования при сбое источника
+"""
+import sys
+from collections import OrderedDict
+
+import pytest
+
+from app.core.base_repository import report_search_failure
+from app.models.agent import QueryType, SearchSource
+from app.services.search.unified_search_service import unified_search_service as service
+
+# Атрибут пакета закрыт одноимённым глобальным экземпляром сервиса
+search_module = sys.modules["app.services.search.unified_search_service"]
+
+CALENDAR_ROWS = [
+    {'description': 'Modelo 303', 'deadline_date': '2025-04-20', 'tax_type': 'iva'},
+    {'description': 'Modelo 130', 'deadline_date': '2025-04-20', 'tax_type': 'irpf'},
+]
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(service, "_result_cache", OrderedDict())
+    monkeypatch.setattr(service, "_result_cache_hits", 0)
+    monkeypatch.setattr(service, "_result_cache_misses", 0)
+
+
+@pytest.fixture
+def calendar_search(monkeypatch):
+    """Подменяет поиск по календарю; возвращает список вызовов"""
+    calls = []
+
+    def install(rows=CALENDAR_ROWS, fail=False):
+        async def fake_search_calendar(query, limit):
+            calls.append(query)
+            if fail:
+                report_search_failure(SearchSource.CALENDAR.value)
+            return [dict(row) for row in rows]
+
+        monkeypatch.setattr(service, "_search_calendar", fake_search_calendar)
+        return calls
+
+    return install
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000.0]
+    monkeypatch.setattr(search_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+async def search(query="modelo 303"):
+    return await service.search_all(
+        query, QueryType.TAX_CALENDAR, sources=[SearchSource.CALENDAR]
+    )
+
+
+async def test_repeated_query_is_served_from_cache(calendar_search):
+    calls = calendar_search()
+
+    first = await search()
+    # Регистр и лишние пробелы не меняют ключ
+    second = await search("  Modelo   303 ")
+
+    assert calls == ["modelo 303"]
+    assert [r.content for r in second.results] == [r.content for r in first.results]
+    assert second.sources_used == ["calendar"]
+    assert service.cache_stats()["hits"] == 1
+    assert service.cache_stats()["misses"] == 1
+
+
+async def test_different_query_misses(calendar_search):
+    calls = calendar_search()
+
+    await search("modelo 303")
+    await search("modelo 130")
+
+    assert calls == ["modelo 303", "modelo 130"]
+    assert service.cache_stats()["hits"] == 0
+
+
+async def test_cached_context_is_copied(calendar_search):
+    calendar_search()
+
+    first = await search()
+    first.results[0].relevance_score = 0.0
+    first.results.pop()
+    first.total_results = 0
+
+    second = await search()
+    assert len(second.results) == 2
+    assert second.total_results == 2
+    assert second.results[0].relevance_score > 0
+
+    second.results.clear()
+    second.sources_used.clear()
+    third = await search()
+    assert len(third.results) == 2
+    assert third.sources_used == ["calendar"]
+
+
+async def test_expired_entry_is_searched_again(calendar_search, clock):
+    calls = calendar_search()
+
+    await search()
+    clock[0] += service.RESULT_CACHE_TTL - 1
+    await search()
+    assert len(calls) == 1
+
+    clock[0] += 2
+    await search()
+    assert len(calls) == 2
+    assert service.cache_stats()["size"] == 1
+
+
+async def test_result_with_failed_source_is_not_cached(calendar_search):
+    calls = calendar_search(fail=True)
+
+    context = await search()
+    await search()
+
+    assert len(context.results) == 2
+    assert len(calls) == 2
+    assert service.cache_stats()["size"] == 0
+
+
+async def test_empty_result_is_not_cached(calendar_search):
+    calls = calendar_search(rows=[])
+
+    await search()
+    await search()
+
+    assert len(calls) == 2
+    assert service.cache_stats()["size"] == 0
@@ -0,0 +1,82 @@
+"""
+Тесты SemanticCache: порог схожести, TTL, кольцевой буфер
+"""
+import pytest
+
+from app.services.agent import semantic_cache
+from app.services.agent.semantic_cache import SemanticCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Управляемое время для проверки TTL"""
+    now = [1_000.0]
+    monkeypatch.setattr(semantic_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_lookup_on_empty_cache_returns_none():
+    cache = SemanticCache()
+    assert cache.lookup([1.0, 0.0, 0.0]) is None
+
+
+def test_lookup_returns_value_above_threshold():
+    cache = SemanticCache(threshold=0.9)
+    cache.put([1.0, 0.0, 0.0], "answer")
+    # Другой масштаб того же направления: косинус 1.0
+    assert cache.lookup([3.0, 0.0, 0.0]) == "answer"
+    assert cache.lookup([1.0, 0.1, 0.0]) == "answer"
+
+
+def test_lookup_below_threshold_returns_none():
+    cache = SemanticCache(threshold=0.95)
+    cache.put([1.0, 0.0, 0.0], "answer")
+    # cos = 1 / sqrt(2) ~ 0.707
+    assert cache.lookup([1.0, 1.0, 0.0]) is None
+
+
+def test_lookup_returns_closest_entry():
+    cache = SemanticCache(threshold=0.5)
+    cache.put([1.0, 0.0, 0.0], "x")
+    cache.put([0.0, 1.0, 0.0], "y")
+    assert cache.lookup([0.2, 1.0, 0.0]) == "y"
+    assert cache.lookup([1.0, 0.2, 0.0]) == "x"
+
+
+def test_expired_entry_is_ignored(clock):
+    cache = SemanticCache(threshold=0.9, ttl_seconds=60)
+    cache.put([1.0, 0.0], "answer")
+    clock[0] += 59
+    assert cache.lookup([1.0, 0.0]) == "answer"
+    clock[0] += 2
+    assert cache.lookup([1.0, 0.0]) is None
+
+
+def test_ring_buffer_evicts_oldest_entry():
+    cache = SemanticCache(threshold=0.99, max_entries=2)
+    cache.put([1.0, 0.0, 0.0], "first")
+    cache.put([0.0, 1.0, 0.0], "second")
+    cache.put([0.0, 0.0, 1.0], "third")
+    assert cache.lookup([1.0, 0.0, 0.0]) is None
+    assert cache.lookup([0.0, 1.0, 0.0]) == "second"
+    assert cache.lookup([0.0, 0.0, 1.0]) == "third"
+
+
+def test_zero_vector_and_dimension_mismatch_are_ignored():
+    cache = SemanticCache(threshold=0.9)
+    cache.put([0.0, 0.0], "zero")
+    assert cache.lookup([0.0, 0.0]) is None
+
+    cache.put([1.0, 0.0], "answer")
+    cache.put([1.0, 0.0, 0.0], "other dim")
+    assert cache.lookup([1.0, 0.0, 0.0]) is None
+    assert cache.lookup([1.0, 0.0]) == "answer"
+
+
+def test_clear_drops_all_entries():
+    cache = SemanticCache(threshold=0.9)
+    cache.put([1.0, 0.0], "answer")
+    cache.clear()
+    assert cache.lookup([1.0, 0.0]) is None
+    cache.put([0.0, 1.0], "new")
+    assert cache.lookup([0.0, 1.0]) == "new"
@@ -0,0 +1,105 @@
+"""
+Тесты семантического кэша контекста TaxAgentService (запросы с историей):
+совпадение чисел в запросе и отказ от кэша для расчётов и сроков
+"""
+import pytest
+
+from app.models.agent import AgentResponse, ClassificationResult, Context, QueryType, SearchResult
+from app.services.agent import tax_agent_service
+from app.services.agent.tax_agent_service import TaxAgentService
+
+
+class FakeToolExecutor:
+    """Инструменты без DocumentSearch (модель HuggingFace offline недоступна)"""
+
+    async def execute_tools(self, query, query_type):
+        return []
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setattr(tax_agent_service, "ToolExecutor", FakeToolExecutor)
+    agent = TaxAgentService()
+
+    # Все запросы в тестах "почти одинаковые" для семантического кэша
+    async def cache_vector(query):
+        return [1.0, 0.0, 0.0]
+
+    async def session_history(user_id, session_id):
+        return []
+
+    async def generate(query, context, query_type, **kwargs):
+        return AgentResponse(
+            text="answer",
+            query_type=query_type,
+            context=context,
+            confidence=0.9,
+            processing_time_ms=0.0
+        )
+
+    monkeypatch.setattr(agent, "_get_cache_vector", cache_vector)
+    monkeypatch.setattr(agent, "_get_session_history", session_history)
+    monkeypatch.setattr(agent, "_schedule_save_interaction", lambda **kwargs: None)
+    monkeypatch.setattr(agent.generator, "generate", generate)
+    return agent
+
+
+@pytest.fixture
+def retrieve(agent, monkeypatch):
+    """Подменяет поиск контекста; возвращает список запросов, дошедших до поиска"""
+    calls = []
+
+    def install(query_type=QueryType.LEGAL_INTERPRETATION):
+        async def fake_retrieve(query, query_embedding=None, on_classified=None, **kwargs):
+            calls.append(query)
+            classification = ClassificationResult(
+                query_type=query_type, confidence=0.9, classification_time_ms=1.0
+            )
+            if on_classified:
+                on_classified(classification)
+            context = Context(
+                results=[SearchResult(source="pdf", content=query, similarity_score=0.8)],
+                sources_used=["pdf"],
+                confidence_score=0.8,
+                total_results=1
+            )
+            return context, classification
+
+        monkeypatch.setattr(agent.retriever, "retrieve", fake_retrieve)
+        return calls
+
+    return install
+
+
+async def ask(agent, query):
+    return await agent.process_query(query, user_id="1", session_id="session")
+
+
+async def test_similar_query_reuses_context(agent, retrieve):
+    calls = retrieve()
+
+    await ask(agent, "¿Cómo presentar el modelo 303?")
+    response = await ask(agent, "¿Cómo se presenta el modelo 303?")
+
+    assert calls == ["¿Cómo presentar el modelo 303?"]
+    assert response.context.results[0].content == "¿Cómo presentar el modelo 303?"
+
+
+async def test_different_numbers_search_again(agent, retrieve):
+    calls = retrieve()
+
+    await ask(agent, "¿Cómo presentar el modelo 303?")
+    response = await ask(agent, "¿Cómo presentar el modelo 130?")
+
+    assert calls == ["¿Cómo presentar el modelo 303?", "¿Cómo presentar el modelo 130?"]
+    assert response.context.results[0].content == "¿Cómo presentar el modelo 130?"
+
+
+@pytest.mark.parametrize("query_type", sorted(TaxAgentService.UNCACHEABLE_QUERY_TYPES))
+async def test_uncacheable_query_types_are_not_cached(agent, retrieve, query_type):
+    calls = retrieve(query_type)
+
+    await ask(agent, "¿Cuándo vence el modelo 303?")
+    await ask(agent, "¿Cuándo vence el modelo 303?")
+
+    assert len(calls) == 2